@@ -0,0 +1,233 @@
+from __future__ import annotations
+import asyncio, threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Any, Callable, Deque, Dict, FrozenSet, Hashable, Iterable, Iterator, List, Optional, Tuple
+from app.instrumentation import caller_tag
+
+PartitionKey = Callable[[Dict[str, Any]], Tuple[Hashable, Hashable]]
+
+# batch -> statement parameters; the default sends the rows as $rows
+Pack = Callable[[List[Any]], Dict[str, Any]]
+
+def pack_rows(chunk: List[Any]) -> Dict[str, Any]:
+    return {"rows": chunk}
+
+Batch = Tuple[FrozenSet[int], List[Dict[str, Any]]]
+
+def partitioned_batches(rows: Iterable[Dict[str, Any]], batch_size: int, partitions: int,
+                        partition_key: Optional[PartitionKey] = None,
+                        max_buffered: Optional[int] = None) -> Iterator[Batch]:
+    """
+    Yields (partitions, rows) batches. Without `partition_key` every batch has an
+    empty partition set; otherwise rows are bucketed by the unordered pair of
+    partitions their endpoints hash to. There are up to P(P+1)/2 such buckets,
+    so once `max_buffered` rows (default `batch_size * partitions`) wait across
+    all of them, the largest is yielded early.
+    """
+    it = iter(rows)
+    if partition_key is None:
+        while True:
+            chunk = list(islice(it, batch_size))
+            if not chunk:
+                return
+            yield frozenset(), chunk
+    cap = max_buffered if max_buffered is not None else batch_size * partitions
+    buckets: Dict[FrozenSet[int], List[Dict[str, Any]]] = {}
+    buffered = 0
+    for row in it:
+        a, b = partition_key(row)
+        parts = frozenset((hash(a) % partitions, hash(b) % partitions))
+        bucket = buckets.setdefault(parts, [])
+        bucket.append(row)
+        buffered += 1
+        if len(bucket) >= batch_size:
+            del buckets[parts]
+            buffered -= len(bucket)
+            yield parts, bucket
+        elif buffered >= cap:
+            parts = max(buckets, key=lambda p: len(buckets[p]))
+            bucket = buckets.pop(parts)
+            buffered -= len(bucket)
+            yield parts, bucket
+    yield from buckets.items()
+
+class ParallelBatchWriter:
+    """
+    Bounded producer/consumer pipeline for UNWIND batch writes.
+
+    The calling thread builds batches while up to `workers` threads, each with
+    its own session, run them. At most `max_queued` built batches wait for a
+    worker, so memory stays flat regardless of input size.
+
+    Edge writes pass a `partition_key` returning the two endpoint keys of a
+    row. Endpoints are hashed into 2*workers partitions, rows are bucketed by
+    their (unordered) partition pair, and a batch is only dispatched while no
+    in-flight batch holds either of its partitions, so concurrent transactions
+    never lock the same nodes and cannot deadlock each other.
+
+    Transient failures (deadlocks, leader switches, dropped connections) are
+    retried by `execute_write` itself, with backoff, for the driver's
+    `max_transaction_retry_time`; an error that outlasts it fails the run.
+    """
+    def __init__(self, driver: Any, database: str, workers: int = 4, max_queued: Optional[int] = None,
+                 instrumentation: Any = None) -> None:
+        self.driver = driver
+        self.instrumentation = instrumentation
+        self.database = database
+        self.workers = max(1, workers)
+        self.max_queued = max_queued if max_queued is not None else self.workers
+        self.partitions = 2 * self.workers
+
+    def run(self, cypher: str, rows: Iterable[Dict[str, Any]], batch_size: int = 1000,
+            partition_key: Optional[PartitionKey] = None, pack: Pack = pack_rows) -> int:
+        cond = threading.Condition()
+        ready: Deque[Batch] = deque()
+        busy: set = set()
+        state = {"inflight": 0, "total": 0}
+        errors: List[BaseException] = []
+        local = threading.local()
+        sessions: List[Any] = []
+        pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="neo4j-writer")
+        tag = caller_tag() if self.instrumentation is not None else None
+
+        def finished(parts: FrozenSet[int], n: int, fut) -> None:
+            with cond:
+                busy.difference_update(parts)
+                state["inflight"] -= 1
+                exc = fut.exception()
+                if exc is not None:
+                    errors.append(exc)
+                else:
+                    state["total"] += n
+                cond.notify_all()
+
+        def dispatch() -> None:
+            # caller holds `cond`
+            for _ in range(len(ready)):
+                if state["inflight"] >= self.workers:
+                    return
+                parts, chunk = ready.popleft()
+                if busy.isdisjoint(parts):
+                    busy.update(parts)
+                    state["inflight"] += 1
+                    fut = pool.submit(self._execute, local, sessions, cypher, pack(chunk), tag)
+                    fut.add_done_callback(lambda f, p=parts, n=len(chunk): finished(p, n, f))
+                else:
+                    ready.append((parts, chunk))
+
+        def push(parts: FrozenSet[int], chunk: Optional[List[Dict[str, Any]]]) -> None:
+            # chunk=None drains: wait until every queued and in-flight batch is done
+            drain = chunk is None
+            with cond:
+                if chunk is not None:
+                    ready.append((parts, chunk))
+                while True:
+                    dispatch()
+                    if errors:
+                        raise errors[0]
+                    if drain and not ready and state["inflight"] == 0:
+                        return
+                    if not drain and len(ready) <= self.max_queued:
+                        return
+                    cond.wait()
+
+        try:
+            for parts, chunk in partitioned_batches(rows, batch_size, self.partitions, partition_key):
+                push(parts, chunk)
+            push(frozenset(), None)
+        finally:
+            pool.shutdown(wait=True)
+            for s in sessions:
+                s.close()
+        return state["total"]
+
+    def _execute(self, local: threading.local, sessions: List[Any], cypher: str, params: Dict[str, Any],
+                 tag: Optional[str] = None) -> None:
+        def _run(tx):
+            if self.instrumentation is not None:
+                self.instrumentation.observe(tx, cypher, params, tag, profile=False)
+            else:
+                tx.run(cypher, params).consume()
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = self.driver.session(database=self.database)
+            sessions.append(session)
+        session.execute_write(_run)
+
+class AsyncBatchWriter:
+    """
+    asyncio counterpart of ParallelBatchWriter for AsyncNeo4jClient: up to
+    `workers` batches in flight, each on its own session, with the same
+    partition rule for relationship writes; retries are likewise left to
+    `execute_write`.
+    """
+    def __init__(self, driver: Any, database: str, workers: int = 4, instrumentation: Any = None) -> None:
+        self.driver = driver
+        self.instrumentation = instrumentation
+        self.database = database
+        self.workers = max(1, workers)
+        self.partitions = 2 * self.workers
+
+    async def run(self, cypher: str, rows: Iterable[Dict[str, Any]], batch_size: int = 1000,
+                  partition_key: Optional[PartitionKey] = None, pack: Pack = pack_rows) -> int:
+        ready: Deque[Batch] = deque()
+        busy: set = set()
+        tasks: Dict[asyncio.Task, FrozenSet[int]] = {}
+        idle: List[Any] = []
+        total = 0
+        tag = caller_tag() if self.instrumentation is not None else None
+
+        def dispatch() -> None:
+            for _ in range(len(ready)):
+                if len(tasks) >= self.workers:
+                    return
+                parts, chunk = ready.popleft()
+                if busy.isdisjoint(parts):
+                    busy.update(parts)
+                    tasks[asyncio.ensure_future(self._execute(idle, cypher, pack(chunk), len(chunk), tag))] = parts
+                else:
+                    ready.append((parts, chunk))
+
+        async def reap() -> None:
+            nonlocal total
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for t in done:
+                busy.difference_update(tasks.pop(t))
+                total += t.result()
+
+        try:
+            for batch in partitioned_batches(rows, batch_size, self.partitions, partition_key):
+                ready.append(batch)
+                dispatch()
+                while len(ready) > self.workers:
+                    await reap()
+                    dispatch()
+            while ready or tasks:
+                dispatch()
+                await reap()
+        finally:
+            for t in tasks:
+                t.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            for s in idle:
+                await s.close()
+        return total
+
+    async def _execute(self, idle: List[Any], cypher: str, params: Dict[str, Any], n: int,
+                       tag: Optional[str] = None) -> int:
+        async def _run(tx):
+            if self.instrumentation is not None:
+                await self.instrumentation.aobserve(tx, cypher, params, tag, profile=False)
+                return
+            result = await tx.run(cypher, params)
+            await result.consume()
+        session = idle.pop() if idle else self.driver.session(database=self.database)
+        try:
+            await session.execute_write(_run)
+        except BaseException:
+            await session.close()
+            raise
+        idle.append(session)
+        return n
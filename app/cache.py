@@ -0,0 +1,380 @@
+"""
+Read-through cache for Neo4jClient.read.
+
+Reads that pass `cache_tags` are keyed by (query, params) and stored pickled,
+so callers always get a private copy and size accounting is exact. Every entry
+carries its tags plus `user:<username>` for each returned row that has a
+username, and writers invalidate by tag through app.events:
+
+  user_registered  user:<username>
+  profile_updated  user:<username>, popular
+  followed         following:<src>, followers:<dst>, user:<src>, user:<dst>, popular
+  unfollowed       (same as followed)
+
+Backends count invalidations with an epoch and remember, per tag, the epoch
+of its latest one. A result is not stored if any of its own tags was
+invalidated after its read started, so a read racing a write can never
+re-insert what that write just invalidated, while writes to unrelated users
+leave it alone. Only the last TAG_WINDOW invalidations are remembered; a read
+that started before them is not stored.
+
+LocalCache is an in-process LRU with TTL and entry/byte caps. SqliteCache is a
+stand-in shared backend for several processes on one host; anything offering
+the CacheBackend methods (e.g. a Redis adapter) can take its place.
+"""
+from __future__ import annotations
+import hashlib, pickle, sqlite3, threading, time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from app import config, events
+
+Rows = List[Dict[str, Any]]
+
+# invalidations whose tags are remembered for the store check
+TAG_WINDOW = 10_000
+
+class CacheBackend:
+    """Byte-level store shared by ReadCache front ends."""
+    def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: bytes, tags: Iterable[str], ttl: float, epoch: int) -> bool:
+        """Stores unless one of `tags` was invalidated after `epoch`. Returns True if stored."""
+        raise NotImplementedError
+
+    def epoch(self) -> int:
+        raise NotImplementedError
+
+    def invalidate(self, tags: Iterable[str]) -> int:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, int]:
+        raise NotImplementedError
+
+class LocalCache(CacheBackend):
+    def __init__(self, max_entries: int = 10_000, max_bytes: int = 64 * 1024 * 1024) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, Tuple[bytes, float, Tuple[str, ...]]] = OrderedDict()
+        self._by_tag: Dict[str, Set[str]] = {}
+        self._bytes = 0
+        self._epoch = 0
+        self._tag_epochs: OrderedDict[str, int] = OrderedDict()  # oldest invalidation first
+        self._floor = 0  # epochs up to here are forgotten
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def _drop(self, key: str) -> None:
+        value, _, tags = self._entries.pop(key)
+        self._bytes -= len(key) + len(value)
+        for t in tags:
+            keys = self._by_tag.get(t)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_tag[t]
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            e = self._entries.get(key)
+            if e is None:
+                return None
+            if e[1] < time.monotonic():
+                self._drop(key)
+                self.expirations += 1
+                return None
+            self._entries.move_to_end(key)
+            return e[0]
+
+    def set(self, key: str, value: bytes, tags: Iterable[str], ttl: float, epoch: int) -> bool:
+        size = len(key) + len(value)
+        if size > self.max_bytes:
+            return False
+        tags = tuple(set(tags))
+        with self._lock:
+            if epoch < self._floor or any(self._tag_epochs.get(t, 0) > epoch for t in tags):
+                return False
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (value, time.monotonic() + ttl, tags)
+            self._bytes += size
+            for t in tags:
+                self._by_tag.setdefault(t, set()).add(key)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+            return True
+
+    def epoch(self) -> int:
+        return self._epoch
+
+    def invalidate(self, tags: Iterable[str]) -> int:
+        with self._lock:
+            self._epoch += 1
+            keys = set()
+            for t in tags:
+                self._tag_epochs[t] = self._epoch
+                self._tag_epochs.move_to_end(t)
+                keys |= self._by_tag.get(t, set())
+            while self._tag_epochs and next(iter(self._tag_epochs.values())) <= self._epoch - TAG_WINDOW:
+                self._floor = self._tag_epochs.popitem(last=False)[1]
+            for k in keys:
+                self._drop(k)
+            self.invalidations += len(keys)
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._epoch += 1
+            self._floor = self._epoch
+            self._tag_epochs.clear()
+            self._entries.clear()
+            self._by_tag.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "bytes": self._bytes, "evictions": self.evictions,
+                "expirations": self.expirations, "invalidations": self.invalidations}
+
+class SqliteCache(CacheBackend):
+    """
+    Shared cache in one SQLite file (WAL mode), usable by several processes on a
+    host. LRU by last access, capped by entries and bytes like LocalCache.
+    Hits do not write: access times collect in process and are written
+    `touch_batch` at a time, or before a store that may evict, so the order is
+    approximate between flushes.
+    """
+    def __init__(self, path: str, max_entries: int = 100_000, max_bytes: int = 256 * 1024 * 1024,
+                 touch_batch: int = 256) -> None:
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.touch_batch = touch_batch
+        self._touched: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._db.executescript("""
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value BLOB, size INTEGER,
+                                                expires REAL, accessed REAL);
+            CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed);
+            CREATE TABLE IF NOT EXISTS tags (tag TEXT, key TEXT, PRIMARY KEY (tag, key)) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS tags_key ON tags (key);
+            CREATE TABLE IF NOT EXISTS tag_epochs (tag TEXT PRIMARY KEY, epoch INTEGER);
+            CREATE INDEX IF NOT EXISTS tag_epochs_epoch ON tag_epochs (epoch);
+            CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER);
+            INSERT OR IGNORE INTO meta VALUES ('epoch', 0), ('floor', 0), ('evictions', 0), ('expirations', 0),
+                                              ('invalidations', 0);
+        """)
+
+    def _bump(self, name: str, n: int = 1) -> None:
+        self._db.execute("UPDATE meta SET value = value + ? WHERE name = ?", (n, name))
+
+    def _meta(self, name: str) -> int:
+        return self._db.execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()[0]
+
+    def _flush_touched(self) -> None:
+        if self._touched:
+            self._db.executemany("UPDATE entries SET accessed = ? WHERE key = ?",
+                                 [(t, k) for k, t in self._touched.items()])
+            self._touched.clear()
+
+    def _delete(self, keys: List[str]) -> None:
+        for k in keys:
+            self._db.execute("DELETE FROM entries WHERE key = ?", (k,))
+            self._db.execute("DELETE FROM tags WHERE key = ?", (k,))
+
+    def get(self, key: str) -> Optional[bytes]:
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT value, expires FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if row[1] < now:
+                self._db.execute("BEGIN IMMEDIATE")
+                self._delete([key])
+                self._bump("expirations")
+                self._db.execute("COMMIT")
+                return None
+            self._touched[key] = now
+            if len(self._touched) >= self.touch_batch:
+                self._flush_touched()
+            return row[0]
+
+    def set(self, key: str, value: bytes, tags: Iterable[str], ttl: float, epoch: int) -> bool:
+        size = len(key) + len(value)
+        if size > self.max_bytes:
+            return False
+        now = time.time()
+        with self._lock:
+            tags = set(tags)
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                if epoch < self._meta("floor"):
+                    return False
+                for t in tags:
+                    seen = self._db.execute("SELECT epoch FROM tag_epochs WHERE tag = ?", (t,)).fetchone()
+                    if seen is not None and seen[0] > epoch:
+                        return False
+                self._flush_touched()
+                self._delete([key])
+                self._db.execute("INSERT INTO entries VALUES (?, ?, ?, ?, ?)", (key, value, size, now + ttl, now))
+                self._db.executemany("INSERT OR IGNORE INTO tags VALUES (?, ?)", [(t, key) for t in tags])
+                count, total = self._db.execute("SELECT count(*), coalesce(sum(size), 0) FROM entries").fetchone()
+                evicted = 0
+                if count > self.max_entries or total > self.max_bytes:
+                    for k, s in self._db.execute("SELECT key, size FROM entries ORDER BY accessed").fetchall():
+                        if count <= self.max_entries and total <= self.max_bytes:
+                            break
+                        self._delete([k])
+                        count -= 1
+                        total -= s
+                        evicted += 1
+                    self._bump("evictions", evicted)
+                return True
+            finally:
+                self._db.execute("COMMIT")
+
+    def epoch(self) -> int:
+        with self._lock:
+            return self._meta("epoch")
+
+    def invalidate(self, tags: Iterable[str]) -> int:
+        tags = list(tags)
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            self._bump("epoch")
+            epoch = self._meta("epoch")
+            self._db.executemany("INSERT OR REPLACE INTO tag_epochs VALUES (?, ?)", [(t, epoch) for t in tags])
+            if epoch % 1000 == 0 and epoch > TAG_WINDOW:
+                self._db.execute("DELETE FROM tag_epochs WHERE epoch <= ?", (epoch - TAG_WINDOW,))
+                self._db.execute("UPDATE meta SET value = max(value, ?) WHERE name = 'floor'", (epoch - TAG_WINDOW,))
+            keys = {k for t in tags for (k,) in self._db.execute("SELECT key FROM tags WHERE tag = ?", (t,))}
+            self._delete(list(keys))
+            self._bump("invalidations", len(keys))
+            self._db.execute("COMMIT")
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            self._bump("epoch")
+            self._db.execute("UPDATE meta SET value = (SELECT value FROM meta WHERE name = 'epoch') WHERE name = 'floor'")
+            self._db.execute("DELETE FROM entries")
+            self._db.execute("DELETE FROM tags")
+            self._db.execute("DELETE FROM tag_epochs")
+            self._db.execute("COMMIT")
+            self._touched.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            out = dict(self._db.execute("SELECT name, value FROM meta WHERE name NOT IN ('epoch', 'floor')").fetchall())
+            out["entries"], out["bytes"] = self._db.execute("SELECT count(*), coalesce(sum(size), 0) FROM entries").fetchone()
+            return out
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush_touched()
+            self._db.close()
+
+def _key(cypher: str, params: Dict[str, Any]) -> str:
+    h = hashlib.blake2b(cypher.encode("utf-8"), digest_size=16)
+    h.update(pickle.dumps(sorted(params.items()), protocol=pickle.HIGHEST_PROTOCOL))
+    return h.hexdigest()
+
+def _row_tags(rows: Rows) -> Set[str]:
+    # users shown in a result, also one level down (u {...} maps, collected samples)
+    tags = set()
+    for r in rows:
+        items = [r]
+        for v in r.values():
+            if isinstance(v, dict):
+                items.append(v)
+            elif isinstance(v, list):
+                items.extend(x for x in v if isinstance(x, dict))
+        tags.update(f"user:{x['username']}" for x in items if isinstance(x.get("username"), str))
+    return tags
+
+class ReadCache:
+    """
+    Front end used by Neo4jClient.read and AsyncNeo4jClient.read: keys,
+    (de)serialisation, hit/miss counters and the event subscriptions that
+    drive invalidation.
+    """
+    def __init__(self, backend: Optional[CacheBackend] = None, ttl: float = 30.0) -> None:
+        self.backend = backend if backend is not None else LocalCache()
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        for kind in ("user_registered", "profile_updated", "followed", "unfollowed"):
+            events.subscribe(kind, self.on_change)
+
+    def close(self) -> None:
+        for kind in ("user_registered", "profile_updated", "followed", "unfollowed"):
+            events.unsubscribe(kind, self.on_change)
+
+    def _lookup(self, key: str) -> Optional[Rows]:
+        blob = self.backend.get(key)
+        if blob is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return pickle.loads(blob)
+
+    def _store(self, key: str, rows: Rows, tags: Iterable[str], epoch: int) -> None:
+        self.backend.set(key, pickle.dumps(rows, protocol=pickle.HIGHEST_PROTOCOL),
+                         set(tags) | _row_tags(rows), self.ttl, epoch)
+
+    def read(self, fetch: Callable[[], Rows], cypher: str, params: Dict[str, Any], tags: Iterable[str]) -> Rows:
+        key = _key(cypher, params)
+        rows = self._lookup(key)
+        if rows is None:
+            epoch = self.backend.epoch()
+            rows = fetch()
+            self._store(key, rows, tags, epoch)
+        return rows
+
+    async def aread(self, fetch: Callable[[], Awaitable[Rows]], cypher: str, params: Dict[str, Any],
+                    tags: Iterable[str]) -> Rows:
+        # AsyncNeo4jClient; the backend calls themselves are short and stay synchronous
+        key = _key(cypher, params)
+        rows = self._lookup(key)
+        if rows is None:
+            epoch = self.backend.epoch()
+            rows = await fetch()
+            self._store(key, rows, tags, epoch)
+        return rows
+
+    def on_change(self, **payload: Any) -> None:
+        if "src" in payload:
+            src, dst = payload["src"], payload["dst"]
+            self.backend.invalidate([f"following:{src}", f"followers:{dst}", f"user:{src}", f"user:{dst}", "popular"])
+        else:
+            self.backend.invalidate([f"user:{payload['username']}", "popular"])
+
+    def stats(self) -> Dict[str, int]:
+        return dict(self.backend.stats(), hits=self.hits, misses=self.misses)
+
+def from_env() -> Optional[ReadCache]:
+    """
+    APP_CACHE=local (default) | sqlite | off; APP_CACHE_PATH for sqlite,
+    APP_CACHE_TTL in seconds, APP_CACHE_MB as the byte cap.
+    """
+    kind = config.env("APP_CACHE", "local").lower()
+    if kind == "off":
+        return None
+    max_bytes = int(config.env_float("APP_CACHE_MB", 64) * 1024 * 1024)
+    if kind == "sqlite":
+        backend: CacheBackend = SqliteCache(config.env("APP_CACHE_PATH", ".cache.sqlite3"), max_bytes=max_bytes)
+    elif kind == "local":
+        backend = LocalCache(max_bytes=max_bytes)
+    else:
+        raise ValueError(f"Unknown APP_CACHE {kind!r}; choose local, sqlite or off")
+    return ReadCache(backend, ttl=config.env_float("APP_CACHE_TTL", 30))
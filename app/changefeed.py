@@ -0,0 +1,295 @@
+"""
+Append-only change feed of user and FOLLOWS mutations.
+
+ChangeLog subscribes to app.events and appends every user_registered,
+profile_updated, followed and unfollowed event to a local log directory as
+one JSON line `[offset, unix time, kind, payload]`. Offsets are dense and
+monotonic (0, 1, 2, ...). The log is split into segment files named after
+their first offset (`00000000000000000042.log`) and rotated at
+`segment_bytes`, so old segments can be dropped whole once every consumer
+is past them.
+
+Consumers read from an offset with read() or Consumer, which keeps a named
+checkpoint (`consumers/<name>.offset`, replaced atomically) so a job can stop
+and resume where it left off, doing work proportional to the changes since
+its last run:
+
+    consumer = Consumer("changes", "leaderboard")
+    consumer.catch_up({"followed": board.on_change, "unfollowed": board.on_change})
+
+Records are written after the transaction commits (events are published
+post-commit), so a crash in between loses that record. Jobs that must be
+exact still reconcile with a full rescan now and then. One process writes a
+given directory; any number may read it. Bulk loader writes publish no
+events and therefore do not appear in the feed.
+"""
+from __future__ import annotations
+import argparse, bisect, functools, json, os, threading, time
+from typing import Any, Callable, Dict, Iterator, List, Mapping, NamedTuple, Optional
+
+from app import config, events
+
+KINDS = ("user_registered", "profile_updated", "followed", "unfollowed")
+SEGMENT_SUFFIX = ".log"
+
+class Change(NamedTuple):
+    offset: int
+    ts: float
+    kind: str
+    data: Dict[str, Any]
+
+def _segment_name(base: int) -> str:
+    return f"{base:020d}{SEGMENT_SUFFIX}"
+
+def segments(path: str) -> List[int]:
+    """Base offsets of the segment files in `path`, ascending."""
+    try:
+        names = os.listdir(path)
+    except FileNotFoundError:
+        return []
+    return sorted(int(n[:-len(SEGMENT_SUFFIX)]) for n in names
+                  if n.endswith(SEGMENT_SUFFIX) and n[:-len(SEGMENT_SUFFIX)].isdigit())
+
+def _last_line(f: Any, size: int) -> Optional[bytes]:
+    # last newline-terminated line of a file opened in binary mode, scanning backwards
+    end = size
+    tail = b""
+    while end > 0:
+        start = max(0, end - 65536)
+        f.seek(start)
+        tail = f.read(end - start) + tail
+        cut = tail.rfind(b"\n", 0, len(tail) - 1)
+        if cut >= 0 or start == 0:
+            return tail[cut + 1:]
+        end = start
+    return None
+
+class ChangeLog:
+    """
+    Writer side: appends events to the current segment and rotates it. On open
+    a torn last line (a crash mid-write) is cut off and numbering resumes
+    after the last complete record.
+    """
+    def __init__(self, path: str, segment_bytes: int = 64 * 1024 * 1024, fsync: bool = False,
+                 subscribe: bool = True) -> None:
+        self.path = path
+        self.segment_bytes = segment_bytes
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+        bases = segments(path)
+        self.base = bases[-1] if bases else 0
+        self.next_offset = self.base
+        seg = os.path.join(path, _segment_name(self.base))
+        if os.path.exists(seg):
+            with open(seg, "r+b") as f:
+                size = os.fstat(f.fileno()).st_size
+                data_end = size
+                if size:
+                    f.seek(size - 1)
+                    if f.read(1) != b"\n":
+                        # torn write: keep everything up to the last newline
+                        f.seek(0)
+                        data_end = f.read().rfind(b"\n") + 1
+                        f.truncate(data_end)
+                if data_end:
+                    last = _last_line(f, data_end)
+                    self.next_offset = json.loads(last)[0] + 1
+        self._file = open(seg, "ab")
+        # kept so close() unsubscribes the same handler objects
+        self._handlers = {kind: functools.partial(self.append, kind) for kind in KINDS} if subscribe else {}
+        for kind, handler in self._handlers.items():
+            events.subscribe(kind, handler)
+
+    def close(self) -> None:
+        for kind, handler in self._handlers.items():
+            events.unsubscribe(kind, handler)
+        self._handlers = {}
+        with self._lock:
+            if not self._file.closed:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self._file.close()
+
+    def append(self, kind: str, **payload: Any) -> int:
+        """Writes one record and returns its offset."""
+        with self._lock:
+            offset = self.next_offset
+            line = json.dumps([offset, round(time.time(), 3), kind, payload], separators=(",", ":"),
+                              ensure_ascii=False, default=str)
+            self._file.write(line.encode("utf-8") + b"\n")
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            self.next_offset = offset + 1
+            if self._file.tell() >= self.segment_bytes:
+                self._rotate()
+            return offset
+
+    def _rotate(self) -> None:
+        os.fsync(self._file.fileno())
+        self._file.close()
+        self.base = self.next_offset
+        self._file = open(os.path.join(self.path, _segment_name(self.base)), "ab")
+
+# -- reading ----------------------------------------------------------------------
+
+def read(path: str, start: int = 0, end: Optional[int] = None) -> Iterator[Change]:
+    """
+    Streams records with start <= offset < end (end: whatever is complete now),
+    opening only the segments that can hold them.
+    """
+    bases = segments(path)
+    k = max(bisect.bisect_right(bases, start) - 1, 0)
+    for base in bases[k:]:
+        if end is not None and base >= end:
+            return
+        try:
+            f = open(os.path.join(path, _segment_name(base)), "rb")
+        except FileNotFoundError:
+            continue  # pruned while we were reading
+        with f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    return  # being written right now
+                # records open with "[<offset>,": skip earlier ones without decoding them
+                offset = int(line[1:line.index(b",")])
+                if offset < start:
+                    continue
+                if end is not None and offset >= end:
+                    return
+                yield Change(*json.loads(line))
+
+def _checkpoint_path(path: str, name: str) -> str:
+    return os.path.join(path, "consumers", f"{name}.offset")
+
+def checkpoints(path: str) -> Dict[str, int]:
+    """Committed offset of every consumer of the log."""
+    out: Dict[str, int] = {}
+    folder = os.path.join(path, "consumers")
+    for n in (os.listdir(folder) if os.path.isdir(folder) else ()):
+        if n.endswith(".offset"):
+            with open(os.path.join(folder, n)) as f:
+                out[n[:-len(".offset")]] = int(f.read().strip() or 0)
+    return out
+
+class Consumer:
+    """
+    A named reader with a durable checkpoint: `offset` is the next record to
+    read. poll()/stream() advance it in memory; commit() persists it.
+    """
+    def __init__(self, path: str, name: str) -> None:
+        self.path = path
+        self.name = name
+        self.offset = checkpoints(path).get(name, 0)
+
+    def poll(self, max_records: Optional[int] = None) -> List[Change]:
+        out: List[Change] = []
+        for change in read(self.path, self.offset):
+            out.append(change)
+            if max_records is not None and len(out) >= max_records:
+                break
+        if out:
+            self.offset = out[-1].offset + 1
+        return out
+
+    def stream(self, poll_interval: float = 0.5, stop: Optional[threading.Event] = None) -> Iterator[Change]:
+        """Yields records as they are appended, until `stop` is set."""
+        while stop is None or not stop.is_set():
+            batch = self.poll(10_000)
+            yield from batch
+            if not batch:
+                time.sleep(poll_interval)
+
+    def commit(self, offset: Optional[int] = None) -> None:
+        if offset is not None:
+            self.offset = offset
+        target = _checkpoint_path(self.path, self.name)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        tmp = target + ".tmp"
+        with open(tmp, "w") as f:
+            f.write(str(self.offset))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, target)
+
+    def catch_up(self, handlers: Mapping[str, Callable[..., Any]], batch: int = 10_000) -> int:
+        """
+        Replays every record since the checkpoint through handlers[kind](**data)
+        (the same signature as app.events subscribers), committing every
+        `batch` records and at the end. Returns the number of records read.
+        """
+        seen = 0
+        for c in read(self.path, self.offset):
+            handler = handlers.get(c.kind)
+            if handler is not None:
+                handler(**c.data)
+            self.offset = c.offset + 1
+            seen += 1
+            if seen % batch == 0:
+                self.commit()
+        if seen:
+            self.commit()
+        return seen
+
+def prune(path: str, keep_from: Optional[int] = None) -> int:
+    """
+    Deletes segments holding only records below `keep_from` (default: the
+    lowest consumer checkpoint). The current segment is never deleted.
+    Returns the number of segments removed.
+    """
+    if keep_from is None:
+        marks = checkpoints(path)
+        if not marks:
+            return 0
+        keep_from = min(marks.values())
+    bases = segments(path)
+    removed = 0
+    for base, nxt in zip(bases, bases[1:]):
+        if nxt > keep_from:
+            break
+        os.remove(os.path.join(path, _segment_name(base)))
+        removed += 1
+    return removed
+
+def from_env(subscribe: bool = True) -> Optional[ChangeLog]:
+    """APP_CHANGEFEED=<directory> turns the feed on; APP_CHANGEFEED_FSYNC=1 syncs every record."""
+    path = config.env_path("APP_CHANGEFEED")
+    if path is None:
+        return None
+    return ChangeLog(path, fsync=config.env_flag("APP_CHANGEFEED_FSYNC"), subscribe=subscribe)
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect the change feed")
+    parser.add_argument("command", choices=["info", "tail", "prune"])
+    parser.add_argument("path", help="Change feed directory (APP_CHANGEFEED)")
+    parser.add_argument("--from", dest="start", type=int, default=None, help="First offset for tail (default: last 10)")
+    parser.add_argument("--follow", action="store_true", help="Keep printing new records (tail)")
+    args = parser.parse_args()
+
+    bases = segments(args.path)
+    if args.command == "info":
+        last = None
+        if bases:
+            for last in read(args.path, bases[-1]):
+                pass
+        end = last.offset + 1 if last else (bases[-1] if bases else 0)
+        size = sum(os.path.getsize(os.path.join(args.path, _segment_name(b))) for b in bases)
+        print(f"{len(bases)} segment(s), offsets {bases[0] if bases else 0}..{end - 1}, {size / 2 ** 20:.1f} MiB")
+        for name, offset in sorted(checkpoints(args.path).items()):
+            print(f"  consumer {name}: at {offset} ({max(end - offset, 0)} behind)")
+    elif args.command == "tail":
+        start = args.start
+        if start is None:
+            last = [c.offset for c in read(args.path, bases[-1])] if bases else []
+            start = max((last[-1] + 1 if last else 0) - 10, 0)
+        reader = Consumer(args.path, "_tail")
+        reader.offset = start
+        changes = reader.stream() if args.follow else iter(reader.poll())
+        for c in changes:
+            print(c.offset, time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(c.ts)), c.kind, json.dumps(c.data))
+    else:
+        print(f"Removed {prune(args.path)} segment(s).")
+
+if __name__ == "__main__":
+    main()
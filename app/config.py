@@ -0,0 +1,39 @@
+"""
+Settings from the environment. `.env` is read on the first lookup, not at
+import, so importing app modules does no file I/O and settings passed in
+code never touch it. Variables already set in the environment win over
+`.env`.
+"""
+from __future__ import annotations
+import os, threading
+from typing import Optional
+
+_loaded = False
+_lock = threading.Lock()
+
+def load_env() -> None:
+    global _loaded
+    if _loaded:
+        return
+    with _lock:
+        if not _loaded:
+            from dotenv import load_dotenv
+            load_dotenv()
+            _loaded = True
+
+def env(name: str, default: str = "") -> str:
+    load_env()
+    return os.getenv(name, default)
+
+def env_int(name: str, default: int) -> int:
+    return int(env(name, str(default)))
+
+def env_float(name: str, default: float) -> float:
+    return float(env(name, str(default)))
+
+def env_flag(name: str, default: bool = False) -> bool:
+    return env(name, "1" if default else "0").lower() in ("1", "true", "yes", "on")
+
+def env_path(name: str) -> Optional[str]:
+    # empty means unset
+    return env(name) or None
@@ -0,0 +1,155 @@
+from __future__ import annotations
+import csv, gzip, os
+from array import array
+from datetime import datetime, timezone
+from typing import Any, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from app.data.pokec import IdBitmap, iter_edges, iter_profiles, pokec_user_row
+from app.services.auth_service import SYNTHETIC_UID_BASE
+
+USER_HEADER = ["uid:ID(User)", "username", "name", "email", "bio", "followerCount:int", "followingCount:int",
+               "createdAt:datetime", "updatedAt:datetime"]
+FOLLOWS_HEADER = [":START_ID(User)", ":END_ID(User)"]
+
+class CsvPartWriter:
+    """
+    Writes a header-only file plus numbered data parts of at most `rows_per_part`
+    rows each, optionally gzipped, in the layout neo4j-admin import expects.
+    """
+    def __init__(self, out_dir: str, name: str, header: Sequence[str], rows_per_part: int = 5_000_000, compress: bool = False) -> None:
+        self.out_dir = out_dir
+        self.name = name
+        self.rows_per_part = rows_per_part
+        self.compress = compress
+        self.rows = 0
+        self.files: List[str] = []
+        os.makedirs(out_dir, exist_ok=True)
+        self.header_path = os.path.join(out_dir, f"{name}_header.csv")
+        with open(self.header_path, "w", newline="", encoding="utf-8") as f:
+            csv.writer(f).writerow(header)
+        self._fh = None
+        self._writer = None
+        self._in_part = 0
+
+    def _roll(self) -> None:
+        self.close()
+        ext = ".csv.gz" if self.compress else ".csv"
+        path = os.path.join(self.out_dir, f"{self.name}-part{len(self.files) + 1:03d}{ext}")
+        self._fh = gzip.open(path, "wt", newline="", encoding="utf-8", compresslevel=1) if self.compress \
+            else open(path, "w", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._fh)
+        self._in_part = 0
+        self.files.append(path)
+
+    def write(self, row: Sequence[Any]) -> None:
+        if self._writer is None or self._in_part >= self.rows_per_part:
+            self._roll()
+        self._writer.writerow(row)
+        self._in_part += 1
+        self.rows += 1
+
+    def close(self) -> None:
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+            self._writer = None
+
+    def import_arg(self) -> str:
+        return ",".join([self.header_path] + self.files)
+
+def dedupe_edges(edges: Iterable[Tuple[int, int]]) -> Iterator[Tuple[int, int]]:
+    """
+    Drops repeated (src, dst) pairs. Edge lists are grouped by source (as the SNAP
+    files are), so only the targets of the current source are remembered.
+    """
+    current = None
+    seen: set = set()
+    for a, b in edges:
+        if a != current:
+            current = a
+            seen.clear()
+        if b in seen:
+            continue
+        seen.add(b)
+        yield a, b
+
+class DegreeCounts:
+    """Per-id in/out degree counters in two growable uint32 arrays (8 bytes per id)."""
+    def __init__(self) -> None:
+        self.followers = array("I")
+        self.following = array("I")
+
+    @staticmethod
+    def _bump(counts: array, i: int) -> None:
+        if i >= len(counts):
+            counts.frombytes(bytes(counts.itemsize * max(i + 1 - len(counts), len(counts) // 2)))
+        counts[i] += 1
+
+    def add(self, a: int, b: int) -> None:
+        self._bump(self.following, a)
+        self._bump(self.followers, b)
+
+    def get(self, i: int) -> Tuple[int, int]:
+        fr = self.followers[i] if i < len(self.followers) else 0
+        fg = self.following[i] if i < len(self.following) else 0
+        return fr, fg
+
+def _user_csv_row(row: dict, uid: int, degrees: DegreeCounts, now: str) -> List[Any]:
+    return [uid, row["username"], row["name"], row["email"], row["bio"], *degrees.get(uid), now, now]
+
+def export_pokec_csv(relationships_path: str, profiles_path: Optional[str], out_dir: str,
+                     rows_per_part: int = 5_000_000, compress: bool = False) -> Tuple[CsvPartWriter, CsvPartWriter]:
+    """
+    Streams the full SNAP Pokec dump into neo4j-admin import CSVs.
+    Memory is bounded by the id bitmap (one byte per user id) and the targets of one source.
+    """
+    now = datetime.now(timezone.utc).isoformat()
+    ids = IdBitmap()
+    degrees = DegreeCounts()
+    follows = CsvPartWriter(out_dir, "follows", FOLLOWS_HEADER, rows_per_part, compress)
+    for a, b in dedupe_edges(iter_edges(relationships_path)):
+        ids.add(a)
+        ids.add(b)
+        degrees.add(a, b)
+        follows.write((a, b))
+    follows.close()
+
+    users = CsvPartWriter(out_dir, "users", USER_HEADER, rows_per_part, compress)
+    if profiles_path and os.path.exists(profiles_path):
+        for uid, profile in iter_profiles(profiles_path):
+            ids.add(uid)
+            if ids.mark_written(uid):
+                users.write(_user_csv_row(pokec_user_row(uid, profile), uid, degrees, now))
+    for uid in ids.pending():
+        users.write(_user_csv_row(pokec_user_row(uid), uid, degrees, now))
+    users.close()
+    return users, follows
+
+def export_synthetic_csv(edges: Iterable[Tuple[int, int]], users: int, out_dir: str,
+                         rows_per_part: int = 5_000_000, compress: bool = False) -> Tuple[CsvPartWriter, CsvPartWriter]:
+    """
+    Writes `users` synthetic accounts (ids 1..users, uid SYNTHETIC_UID_BASE + id)
+    and the given edge stream.
+    """
+    now = datetime.now(timezone.utc).isoformat()
+    degrees = DegreeCounts()
+    follows = CsvPartWriter(out_dir, "follows", FOLLOWS_HEADER, rows_per_part, compress)
+    for a, b in dedupe_edges(edges):
+        degrees.add(a, b)
+        follows.write((SYNTHETIC_UID_BASE + a, SYNTHETIC_UID_BASE + b))
+    follows.close()
+    user_w = CsvPartWriter(out_dir, "users", USER_HEADER, rows_per_part, compress)
+    for i in range(1, users + 1):
+        user_w.write([SYNTHETIC_UID_BASE + i, f"s{i}", f"Synthetic User {i}", f"s{i}@example.com", "Synthetic account (demo)",
+                      *degrees.get(i), now, now])
+    user_w.close()
+    return user_w, follows
+
+def admin_import_command(users: CsvPartWriter, follows: CsvPartWriter, database: str = "neo4j") -> str:
+    return (
+        "neo4j-admin database import full"
+        f" --nodes=User={users.import_arg()}"
+        f" --relationships=FOLLOWS={follows.import_arg()}"
+        " --id-type=integer --skip-duplicate-nodes=true --skip-bad-relationships=true"
+        f" --overwrite-destination=true {database}"
+    )
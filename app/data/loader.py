@@ -1,29 +1,104 @@
 from __future__ import annotations
-import argparse, os, gzip, random
-from typing import Dict, Any, Iterable, List, Tuple, Set
+import argparse, os, sys, time
+from collections import deque
+from typing import Deque, Dict, Any, Iterable, Iterator, List, Optional, Tuple
+from app import schema
 from app.neo4j_client import Neo4jClient
-from app.utils.hashing import hash_password
+from app.services.auth_service import REGISTERED_UID_BASE, SYNTHETIC_UID_BASE
+from app.utils.hashing import bcrypt_rounds, hash_many, hash_password
+from app.data.pokec import IdBitmap, iter_edges, iter_profiles, open_maybe_gz, pokec_user_row
+from app.data import csv_export, snapshot, synthetic
 
-SCHEMA_QUERIES = [
-    # uniqueness
-    """
-    CREATE CONSTRAINT user_username_unique IF NOT EXISTS
-    FOR (u:User) REQUIRE u.username IS UNIQUE
-    """,
-    """
-    CREATE CONSTRAINT user_email_unique IF NOT EXISTS
-    FOR (u:User) REQUIRE u.email IS UNIQUE
-    """,
-    # useful index
-    """
-    CREATE FULLTEXT INDEX user_fulltext IF NOT EXISTS
-    FOR (u:User) ON EACH [u.username, u.name, u.email]
-    """
-]
+# Imports write through the unique indexes, so new ones must be online first.
+SCHEMA_WAIT = 300.0
+
+# Bulk-import statements. Counters start at 0 and are bumped only when the
+# relationship is actually created, so re-running an import keeps them exact.
+# An existing user takes the source uid too, so edges matched on it find them.
+USER_CYPHER = """
+UNWIND $rows AS row
+MERGE (u:User {username: row.username})
+ON CREATE SET u.uid = row.uid, u.name = row.name, u.email = row.email, u.bio = row.bio,
+              u.followerCount = 0, u.followingCount = 0,
+              u.createdAt = datetime(), u.updatedAt = datetime()
+ON MATCH SET u.uid = coalesce(row.uid, u.uid)
+"""
+
+FOLLOWS_CYPHER = """
+UNWIND $rows AS row
+MATCH (a:User {username: row.src}), (b:User {username: row.dst})
+MERGE (a)-[:FOLLOWS]->(b)
+ON CREATE SET a.followingCount = coalesce(a.followingCount, 0) + 1,
+              a.followsUpdatedAt = datetime(),
+              b.followerCount = coalesce(b.followerCount, 0) + 1
+"""
+
+# Edges as two parallel integer lists ($src[i] follows $dst[i]) matched on
+# the uid constraint: no per-row maps and no username strings on the wire.
+FOLLOWS_UID_CYPHER = """
+UNWIND range(0, size($src) - 1) AS i
+MATCH (a:User {uid: $src[i]}), (b:User {uid: $dst[i]})
+MERGE (a)-[:FOLLOWS]->(b)
+ON CREATE SET a.followingCount = coalesce(a.followingCount, 0) + 1,
+              a.followsUpdatedAt = datetime(),
+              b.followerCount = coalesce(b.followerCount, 0) + 1
+"""
 
-def ensure_schema(client: Neo4jClient) -> None:
-    for q in SCHEMA_QUERIES:
-        client.write(q)
+# count store lookup: edges created by an import are the difference
+EDGE_COUNT_CYPHER = """
+MATCH ()-[r:FOLLOWS]->()
+RETURN count(r) AS edges
+"""
+
+# seed users have no source id: each batch reserves a block of uids from the
+# registration sequence (rows that already exist leave a gap, which is fine)
+SEED_USER_CYPHER = """
+MERGE (seq:Sequence {name: 'uid'})
+SET seq.next = coalesce(seq.next, $uid_base) + size($rows)
+WITH seq.next - size($rows) AS first
+UNWIND range(0, size($rows) - 1) AS i
+WITH first + i AS uid, $rows[i] AS row
+MERGE (u:User {username: row.username})
+ON CREATE SET u.uid = uid, u.name = row.name, u.email = row.email, u.bio = row.bio,
+              u.passwordHash = row.pw, u.salt = row.salt,
+              u.followerCount = 0, u.followingCount = 0,
+              u.createdAt = datetime(), u.updatedAt = datetime()
+"""
+
+# --mode accounts: users without a password, paged by username so that
+# setting passwords while paging does not shift the remaining pages
+PASSWORDLESS_PAGE_CYPHER = """
+MATCH (u:User)
+WHERE u.username > $after AND u.passwordHash IS NULL
+RETURN u.username AS username
+ORDER BY u.username ASC
+LIMIT $limit
+"""
+
+SET_PASSWORD_CYPHER = """
+UNWIND $rows AS row
+MATCH (u:User {username: row.username})
+SET u.passwordHash = row.pw, u.salt = row.salt, u.updatedAt = datetime()
+"""
+
+REPAIR_COUNTERS_CYPHER = """
+MATCH (u:User)
+CALL {
+  WITH u
+  SET u.followerCount = COUNT { (u)<-[:FOLLOWS]-() },
+      u.followingCount = COUNT { (u)-[:FOLLOWS]->() }
+} IN TRANSACTIONS OF $batch_size ROWS
+"""
+
+CHECK_COUNTERS_CYPHER = """
+MATCH (u:User)
+WITH u, COUNT { (u)<-[:FOLLOWS]-() } AS followers, COUNT { (u)-[:FOLLOWS]->() } AS following
+WHERE u.followerCount IS NULL OR u.followerCount <> followers
+   OR u.followingCount IS NULL OR u.followingCount <> following
+WITH collect(u { .username, storedFollowers: u.followerCount, followers: followers,
+                 storedFollowing: u.followingCount, following: following }) AS bad
+RETURN size(bad) AS mismatches, bad[0..$limit] AS sample
+"""
 
 def seed_four_users(client: Neo4jClient) -> None:
     users = [
@@ -36,165 +111,306 @@ def seed_four_users(client: Neo4jClient) -> None:
     for u, n, e, p, b in users:
         h, s = hash_password(p)
         rows.append({"username": u, "name": n, "email": e, "bio": b, "pw": h, "salt": s})
-    cypher = """
-    UNWIND $rows AS row
-    MERGE (u:User {username: row.username})
-    ON CREATE SET u.name = row.name, u.email = row.email, u.bio = row.bio,
-                  u.passwordHash = row.pw, u.salt = row.salt,
-                  u.createdAt = datetime(), u.updatedAt = datetime()
-    """
-    client.write_many(cypher, rows, batch_size=50)
+    client.write_many(SEED_USER_CYPHER, rows, batch_size=50,
+                      pack=lambda chunk: {"rows": chunk, "uid_base": REGISTERED_UID_BASE})
     # small starter graph
-    client.write("""
-        MATCH (a:User {username:'alice'}), (b:User {username:'bob'}),
-              (c:User {username:'carol'}), (d:User {username:'dave'})
-        MERGE (a)-[:FOLLOWS]->(b)
-        MERGE (a)-[:FOLLOWS]->(c)
-        MERGE (b)-[:FOLLOWS]->(c)
-        MERGE (c)-[:FOLLOWS]->(d)
-        MERGE (d)-[:FOLLOWS]->(a)
-    """)
+    edges = [("alice", "bob"), ("alice", "carol"), ("bob", "carol"), ("carol", "dave"), ("dave", "alice")]
+    client.write_many(FOLLOWS_CYPHER, ({"src": a, "dst": b} for a, b in edges), batch_size=50)
 
-def _open_maybe_gz(path: str):
-    return gzip.open(path, "rt", encoding="utf-8") if path.endswith(".gz") else open(path, "r", encoding="utf-8")
+def iter_account_file(path: str) -> Iterator[Tuple[str, str]]:
+    """
+    (username, password) pairs from a `username,password` file (.gz allowed).
+    Only the first comma splits, so passwords may contain commas.
+    """
+    with open_maybe_gz(path) as f:
+        for line in f:
+            line = line.rstrip("\r\n")
+            if not line or line.startswith("#"):
+                continue
+            username, _, password = line.partition(",")
+            yield username, password
 
-def import_pokec_subset(client: Neo4jClient, relationships_path: str, profiles_path: str, min_nodes: int, min_edges: int, max_nodes: int = 20000) -> Tuple[int, int]:
+def iter_passwordless(client: Neo4jClient, password: str, page: int = 10_000) -> Iterator[Tuple[str, str]]:
+    after = ""
+    while True:
+        rows = client.read(PASSWORDLESS_PAGE_CYPHER, {"after": after, "limit": page})
+        for r in rows:
+            yield r["username"], password
+        if len(rows) < page:
+            return
+        after = rows[-1]["username"]
+
+def provision_accounts(client: Neo4jClient, accounts: Iterable[Tuple[str, str]], hash_workers: int = 1,
+                       rounds: Optional[int] = None, batch_size: int = 1000, workers: int = 1) -> int:
     """
-    Imports a small, connected-ish subset: collects nodes until min_nodes,
-    then keeps edges where both endpoints are in the collected set until min_edges.
+    Sets passwordHash/salt on existing users from (username, password) pairs;
+    usernames not in the graph are skipped.
+    Hashing runs on `hash_workers` processes (hash_many) while the finished
+    hashes are written in batches, so the writes overlap the hashing.
+    Returns the number of rows written.
     """
-    ensure_schema(client)
+    names: Deque[str] = deque()
+    def passwords() -> Iterator[str]:
+        for username, password in accounts:
+            names.append(username)
+            yield password
+    # hash_many preserves order, so each hash belongs to the oldest queued name
+    rows = ({"username": names.popleft(), "pw": h, "salt": s}
+            for h, s in hash_many(passwords(), workers=hash_workers, rounds=rounds))
+    return client.write_many(SET_PASSWORD_CYPHER, rows, batch_size=batch_size, workers=workers)
 
-    # Step 1: collect edges and a superset of node ids
-    selected_nodes: Set[str] = set()
-    edges: List[Tuple[str, str]] = []
-    with _open_maybe_gz(relationships_path) as f:
+def repair_counters(client: Neo4jClient, batch_size: int = 10000) -> None:
+    """
+    Backfills/repairs followerCount and followingCount from the actual FOLLOWS
+    degrees, committing every `batch_size` users.
+    """
+    client.run(REPAIR_COUNTERS_CYPHER, {"batch_size": batch_size})
+
+def check_counters(client: Neo4jClient, limit: int = 20) -> Tuple[int, List[Dict[str, Any]]]:
+    """
+    Compares stored counters with the real degrees.
+    Returns (number of inconsistent users, up to `limit` examples).
+    """
+    recs = client.read(CHECK_COUNTERS_CYPHER, {"limit": limit})
+    return recs[0]["mismatches"], recs[0]["sample"]
+
+def select_pokec_subset(relationships_path: str, min_nodes: int, min_edges: int, max_nodes: int = 20000) -> Tuple[IdBitmap, int, int]:
+    """
+    First pass over the relationships file: collects node ids until max_nodes and
+    counts edges with both endpoints selected until min_nodes/min_edges are met.
+    Returns (selected ids, raw lines consumed, edges kept) so a second pass can replay exactly that prefix.
+    """
+    selected = IdBitmap()
+    lines = 0
+    kept = 0
+    with open_maybe_gz(relationships_path) as f:
         for line in f:
+            lines += 1
             if not line.strip() or line.startswith("#"):
                 continue
-            a, b = line.strip().split()
-            if len(selected_nodes) < max_nodes:
-                selected_nodes.add(a)
-                selected_nodes.add(b)
+            a, b = (int(x) for x in line.split())
+            if len(selected) < max_nodes:
+                selected.add(a)
+                selected.add(b)
             # Keep edge only if both endpoints are within picked set
-            if a in selected_nodes and b in selected_nodes:
-                edges.append((a, b))
-            if len(selected_nodes) >= min_nodes and len(edges) >= min_edges:
+            if a in selected and b in selected:
+                kept += 1
+            if len(selected) >= min_nodes and kept >= min_edges:
                 break
+    return selected, lines, kept
 
-    # Step 2: build user rows using profiles for optional name/region/age
-    profiles: Dict[str, Dict[str, Any]] = {}
-    if os.path.exists(profiles_path):
-        with _open_maybe_gz(profiles_path) as pf:
-            header = None
-            for line in pf:
-                if not line.strip(): continue
-                if header is None:
-                    header = line.strip().split("\t")
-                    continue
-                parts = line.rstrip("\n").split("\t")
-                if not parts or len(parts) < 2: continue
-                uid = parts[0]
-                d = {header[i]: (parts[i] if i < len(parts) else "") for i in range(len(header))}
-                profiles[uid] = d
-
-    user_rows = []
-    for uid in selected_nodes:
-        p = profiles.get(uid, {})
-        name = p.get("region", "") or f"User {uid}"
-        user_rows.append({
-            "username": f"u{uid}",
-            "name": name if isinstance(name, str) else f"User {uid}",
-            "email": f"u{uid}@pokec.sk",
-            "bio": f"Pokec user {uid}",
-        })
+def edge_endpoints(row: Dict[str, Any]) -> Tuple[Any, Any]:
+    # partition key for parallel edge writes
+    return row["src"], row["dst"]
+
+def pair_endpoints(pair: Tuple[int, int]) -> Tuple[int, int]:
+    # partition key for (src uid, dst uid) edge rows
+    return pair
+
+def edge_columns(chunk: List[Tuple[int, int]]) -> Dict[str, List[int]]:
+    # FOLLOWS_UID_CYPHER parameters for a batch of (src uid, dst uid) pairs
+    return {"src": [a for a, _ in chunk], "dst": [b for _, b in chunk]}
+
+def edge_count(client: Neo4jClient) -> int:
+    return client.read(EDGE_COUNT_CYPHER)[0]["edges"]
+
+def load_edges(client: Neo4jClient, pairs: Iterable[Tuple[int, int]], batch_size: int = 10000,
+               workers: int = 1) -> Tuple[int, int]:
+    """
+    Writes (src uid, dst uid) pairs with FOLLOWS_UID_CYPHER. Returns (pairs
+    sent, relationships created); a pair whose uids match no users, or that
+    already exists, creates nothing.
+    """
+    before = edge_count(client)
+    sent = client.write_many(FOLLOWS_UID_CYPHER, pairs, batch_size=batch_size, workers=workers,
+                             partition_key=pair_endpoints, pack=edge_columns)
+    return sent, edge_count(client) - before
+
+def report_edges(sent: int, created: int) -> None:
+    if created < sent:
+        print(f"Warning: {sent - created:,} of {sent:,} edge rows created no FOLLOWS relationship "
+              f"(unknown uid or already present).")
+
+def import_pokec_subset(client: Neo4jClient, relationships_path: str, profiles_path: str, min_nodes: int, min_edges: int, max_nodes: int = 20000, workers: int = 1) -> Tuple[int, int]:
+    """
+    Imports a small, connected-ish subset: collects nodes until min_nodes,
+    then keeps edges where both endpoints are in the collected set until min_edges.
+
+    Everything is streamed: the relationships file is read twice (select, then
+    write edges) and the profiles file once, joined against the selected id set,
+    so memory is bounded by the id bitmap plus one write batch.
+    """
+    schema.ensure(client, wait=SCHEMA_WAIT)
+
+    # Step 1: pick node ids and remember how much of the file we consumed
+    selected, lines, _ = select_pokec_subset(relationships_path, min_nodes, min_edges, max_nodes)
+
+    # Step 2: user rows, joining profiles for selected ids only (optional name/region)
+    def user_rows() -> Iterator[Dict[str, Any]]:
+        if os.path.exists(profiles_path):
+            for uid, profile in iter_profiles(profiles_path):
+                if selected.mark_written(uid):
+                    yield pokec_user_row(uid, profile)
+        for uid in selected.pending():
+            yield pokec_user_row(uid)
 
     # Step 3: write users
-    user_cypher = """
-    UNWIND $rows AS row
-    MERGE (u:User {username: row.username})
-    ON CREATE SET u.name = row.name, u.email = row.email, u.bio = row.bio,
-                  u.createdAt = datetime(), u.updatedAt = datetime()
-    """
-    client.write_many(user_cypher, user_rows, batch_size=2000)
-
-    # Step 4: write edges (directed)
-    edge_rows = [{"src": f"u{a}", "dst": f"u{b}"} for a, b in edges]
-    edge_cypher = """
-    UNWIND $rows AS row
-    MATCH (a:User {username: row.src}), (b:User {username: row.dst})
-    MERGE (a)-[:FOLLOWS]->(b)
-    """
-    client.write_many(edge_cypher, edge_rows, batch_size=5000)
-
-    return len(selected_nodes), len(edges)
-
-def import_synthetic(client: Neo4jClient, users: int = 1500, avg_degree: int = 6) -> Tuple[int, int]:
-    ensure_schema(client)
-    # users
-    user_rows = []
-    for i in range(users):
-        uid = f"s{i+1}"
-        user_rows.append({
-            "username": uid,
-            "name": f"Synthetic User {i+1}",
-            "email": f"{uid}@example.com",
+    n = client.write_many(USER_CYPHER, user_rows(), batch_size=2000, workers=workers)
+
+    # Step 4: write edges (directed), replaying the same prefix of the file
+    edge_rows = ((a, b) for a, b in iter_edges(relationships_path, limit=lines) if a in selected and b in selected)
+    sent, m = load_edges(client, edge_rows, batch_size=5000, workers=workers)
+    report_edges(sent, m)
+    return n, m
+
+def synthetic_user_rows(users: int) -> Iterator[Dict[str, Any]]:
+    for i in range(1, users + 1):
+        yield {
+            "uid": SYNTHETIC_UID_BASE + i,
+            "username": f"s{i}",
+            "name": f"Synthetic User {i}",
+            "email": f"s{i}@example.com",
             "bio": "Synthetic account (demo)"
-        })
-    user_cypher = """
-    UNWIND $rows AS row
-    MERGE (u:User {username: row.username})
-    ON CREATE SET u.name = row.name, u.email = row.email, u.bio = row.bio,
-                  u.createdAt = datetime(), u.updatedAt = datetime()
-    """
-    client.write_many(user_cypher, user_rows, batch_size=5000)
-
-    # edges
-    edges = set()
-    rnd = random.Random(42)
-    for i in range(users):
-        src = f"s{i+1}"
-        # each user follows ~avg_degree distinct others
-        targets = set()
-        while len(targets) < avg_degree:
-            j = rnd.randint(1, users)
-            if j == (i+1): continue
-            targets.add(f"s{j}")
-        for dst in targets:
-            edges.add((src, dst))
-    edge_rows = [{"src": a, "dst": b} for a, b in edges]
-    edge_cypher = """
-    UNWIND $rows AS row
-    MATCH (a:User {username: row.src}), (b:User {username: row.dst})
-    MERGE (a)-[:FOLLOWS]->(b)
-    """
-    client.write_many(edge_cypher, edge_rows, batch_size=10000)
-    return users, len(edges)
+        }
+
+def synthetic_edge_pairs(users: int, avg_degree: int, **kwargs: Any) -> Iterator[Tuple[int, int]]:
+    """synthetic.generate_edges as (src uid, dst uid) pairs in the synthetic uid range."""
+    for arr in synthetic.generate_edges(users, avg_degree, **kwargs):
+        yield from map(tuple, (arr + SYNTHETIC_UID_BASE).tolist())
+
+def synthetic_edge_rows(users: int, avg_degree: int, **kwargs: Any) -> Iterator[Dict[str, Any]]:
+    return ({"src": f"s{a}", "dst": f"s{b}"} for a, b in synthetic.edge_pairs(users, avg_degree, **kwargs))
+
+def import_synthetic(client: Neo4jClient, users: int = 1500, avg_degree: int = 6, workers: int = 1,
+                     model: str = "uniform", seed: int = 42, **model_opts: Any) -> Tuple[int, int]:
+    """
+    Generates a synthetic graph with app.data.synthetic (see MODELS there) and
+    streams it into the batch writer; nothing is materialised beyond one block of edges.
+    """
+    schema.ensure(client, wait=SCHEMA_WAIT)
+    client.write_many(USER_CYPHER, synthetic_user_rows(users), batch_size=5000, workers=workers)
+    pairs = synthetic_edge_pairs(users, avg_degree, model=model, seed=seed, **model_opts)
+    sent, m = load_edges(client, pairs, batch_size=10000, workers=workers)
+    report_edges(sent, m)
+    return users, m
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MiB (None where unsupported)."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and KiB on Linux
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def report_run(rows: int, started: float) -> None:
+    elapsed = max(time.perf_counter() - started, 1e-9)
+    rss = peak_rss_mb()
+    rss_txt = f"{rss:.1f} MiB" if rss is not None else "n/a"
+    print(f"Wrote {rows} rows in {elapsed:.1f}s ({rows / elapsed:,.0f} rows/sec), peak RSS {rss_txt}.")
+
+def synthetic_options(args: argparse.Namespace) -> Dict[str, Any]:
+    return {"model": args.model, "seed": args.seed, "gamma": args.gamma,
+            "communities": args.communities, "mixing": args.mixing}
 
 def main():
     parser = argparse.ArgumentParser(description="Neo4j schema + data loader")
-    parser.add_argument("--mode", choices=["pokec", "synthetic", "seed"], required=True)
+    parser.add_argument("--mode", choices=["pokec", "synthetic", "seed", "pokec-csv", "synthetic-csv", "pokec-snapshot", "synthetic-snapshot", "accounts", "counters", "check-counters"], required=True)
     parser.add_argument("--relationships", help="Path to soc-pokec-relationships.txt(.gz)")
     parser.add_argument("--profiles", help="Path to soc-pokec-profiles.txt(.gz)")
     parser.add_argument("--min_nodes", type=int, default=1500)
     parser.add_argument("--min_edges", type=int, default=6000)
+    parser.add_argument("--max_nodes", type=int, default=20000)
     parser.add_argument("--users", type=int, default=1500)
     parser.add_argument("--avg_degree", type=int, default=6)
+    parser.add_argument("--model", choices=synthetic.MODELS, default="uniform", help="Synthetic degree model")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--gamma", type=float, default=2.5, help="Power-law exponent (--model powerlaw)")
+    parser.add_argument("--communities", type=int, default=20, help="Number of blocks (--model sbm)")
+    parser.add_argument("--mixing", type=float, default=0.1, help="Share of cross-community edges (--model sbm)")
+    parser.add_argument("--workers", type=int, default=1, help="Concurrent write sessions for user/edge batches")
+    parser.add_argument("--out_dir", default="import", help="Output directory for *-csv modes")
+    parser.add_argument("--gzip", action="store_true", help="Gzip CSV parts (*-csv modes)")
+    parser.add_argument("--rows_per_part", type=int, default=5_000_000, help="Rows per CSV part file (*-csv modes)")
+    parser.add_argument("--snapshot", default=os.path.join("import", "graph.snap"), help="Output file (*-snapshot modes)")
+    parser.add_argument("--accounts", help="username,password file (--mode accounts); without it, --password is set on every user that has none")
+    parser.add_argument("--password", help="Password for users without one (--mode accounts)")
+    parser.add_argument("--hash_workers", type=int, default=os.cpu_count() or 1, help="Hashing processes (--mode accounts)")
+    parser.add_argument("--rounds", type=int, default=None, help="bcrypt cost factor (--mode accounts, default BCRYPT_ROUNDS)")
     args = parser.parse_args()
+    if not args.gamma > 1:
+        parser.error(f"--gamma must be greater than 1, got {args.gamma}")
+
+    started = time.perf_counter()
+    if args.mode in ("pokec-csv", "synthetic-csv"):
+        # offline path: no database connection, files for neo4j-admin import
+        if args.mode == "pokec-csv":
+            if not args.relationships:
+                raise SystemExit("Please provide --relationships (and optionally --profiles) for Pokec CSV export.")
+            users, follows = csv_export.export_pokec_csv(args.relationships, args.profiles, args.out_dir, args.rows_per_part, args.gzip)
+        else:
+            pairs = synthetic.edge_pairs(args.users, args.avg_degree, **synthetic_options(args))
+            users, follows = csv_export.export_synthetic_csv(pairs, args.users, args.out_dir, args.rows_per_part, args.gzip)
+        print(f"Wrote {users.rows} users and {follows.rows} FOLLOWS edges to {args.out_dir}/.")
+        report_run(users.rows + follows.rows, started)
+        print("Stop the database, then run:")
+        print("  " + csv_export.admin_import_command(users, follows))
+        print("Start it again and run any loader mode (e.g. --mode seed) to create constraints and indexes.")
+        return
+
+    if args.mode in ("pokec-snapshot", "synthetic-snapshot"):
+        # offline path: binary graph snapshot for analytics (app/data/snapshot.py)
+        if args.mode == "pokec-snapshot":
+            if not args.relationships:
+                raise SystemExit("Please provide --relationships (and optionally --profiles) for a Pokec snapshot.")
+            n, m = snapshot.from_pokec(args.relationships, args.profiles, args.snapshot)
+        else:
+            blocks = synthetic.generate_edges(args.users, args.avg_degree, **synthetic_options(args))
+            n, m = snapshot.from_synthetic(blocks, args.users, args.snapshot)
+        print(f"Wrote {n} users and {m} FOLLOWS edges to {args.snapshot}.")
+        report_run(n + m, started)
+        return
 
     client = Neo4jClient()
     if args.mode == "seed":
-        ensure_schema(client)
+        schema.ensure(client, wait=SCHEMA_WAIT)
         seed_four_users(client)
         print("Seeded 4 test users (alice, bob, carol, dave) with password 'password123'.")
+    elif args.mode == "accounts":
+        if not args.accounts and not args.password:
+            raise SystemExit("Please provide --accounts FILE or --password for --mode accounts.")
+        accounts = iter_account_file(args.accounts) if args.accounts else iter_passwordless(client, args.password)
+        rounds = args.rounds or bcrypt_rounds()
+        n = provision_accounts(client, accounts, args.hash_workers, rounds, workers=args.workers)
+        elapsed = max(time.perf_counter() - started, 1e-9)
+        cores = min(args.hash_workers, os.cpu_count() or 1)
+        print(f"Hashed and wrote {n} passwords in {elapsed:.1f}s: {n / elapsed:,.1f} hashes/sec, "
+              f"{n / elapsed / cores:,.1f} per core ({cores} core(s), cost {rounds}).")
+    elif args.mode == "counters":
+        schema.ensure(client, wait=SCHEMA_WAIT)
+        repair_counters(client)
+        print(f"Recomputed followerCount/followingCount for all users in {time.perf_counter() - started:.1f}s.")
+    elif args.mode == "check-counters":
+        bad, sample = check_counters(client)
+        if not bad:
+            print("Counters are consistent.")
+        else:
+            print(f"{bad} user(s) have stale counters, e.g.:")
+            for r in sample:
+                print(f" - {r['username']}: followers {r['storedFollowers']} (actual {r['followers']}), "
+                      f"following {r['storedFollowing']} (actual {r['following']})")
+            print("Run --mode counters to repair.")
     elif args.mode == "pokec":
         if not args.relationships or not args.profiles:
             raise SystemExit("Please provide --relationships and --profiles paths for Pokec import.")
-        n, m = import_pokec_subset(client, args.relationships, args.profiles, args.min_nodes, args.min_edges)
+        n, m = import_pokec_subset(client, args.relationships, args.profiles, args.min_nodes, args.min_edges, args.max_nodes, args.workers)
         print(f"Imported Pokec subset: {n} users, {m} FOLLOWS edges.")
+        report_run(n + m, started)
     else:
-        n, m = import_synthetic(client, args.users, args.avg_degree)
+        n, m = import_synthetic(client, args.users, args.avg_degree, args.workers, **synthetic_options(args))
         print(f"Imported synthetic graph: {n} users, {m} FOLLOWS edges.")
+        report_run(n + m, started)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,96 @@
+from __future__ import annotations
+import gzip
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+def open_maybe_gz(path: str):
+    return gzip.open(path, "rt", encoding="utf-8") if path.endswith(".gz") else open(path, "r", encoding="utf-8")
+
+# soc-pokec-profiles.txt ships without a header line; these are the leading
+# columns from the SNAP readme (only the ones we may use are listed).
+POKEC_PROFILE_COLUMNS = ["user_id", "public", "completion_percentage", "gender", "region", "last_login", "registration", "AGE"]
+
+class IdBitmap:
+    """
+    Compact set of non-negative integer ids (one byte per id up to the max id seen).
+    Values: 0 = absent, 1 = selected, 2 = selected and already written.
+    """
+    def __init__(self) -> None:
+        self.flags = bytearray()
+        self.count = 0
+
+    def add(self, i: int) -> None:
+        if i >= len(self.flags):
+            self.flags.extend(bytes(max(i + 1 - len(self.flags), len(self.flags) // 2)))
+        if not self.flags[i]:
+            self.flags[i] = 1
+            self.count += 1
+
+    def __contains__(self, i: int) -> bool:
+        return i < len(self.flags) and self.flags[i] != 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def mark_written(self, i: int) -> bool:
+        """Marks a selected id as written; returns False if it was not pending."""
+        if i < len(self.flags) and self.flags[i] == 1:
+            self.flags[i] = 2
+            return True
+        return False
+
+    def pending(self) -> Iterator[int]:
+        i = 0
+        find = self.flags.find
+        while True:
+            i = find(1, i)
+            if i < 0:
+                return
+            yield i
+            i += 1
+
+def iter_edges(path: str, limit: Optional[int] = None) -> Iterator[Tuple[int, int]]:
+    """
+    Streams (src, dst) integer pairs from a SNAP edge list, skipping comments.
+    `limit` caps the number of raw lines read.
+    """
+    with open_maybe_gz(path) as f:
+        for n, line in enumerate(f):
+            if limit is not None and n >= limit:
+                break
+            if not line.strip() or line.startswith("#"):
+                continue
+            a, b = line.split()
+            yield int(a), int(b)
+
+def iter_profiles(path: str, columns: Iterable[str] = ("region",)) -> Iterator[Tuple[int, Dict[str, str]]]:
+    """
+    Streams (user_id, {column: value}) from the Pokec profiles file, splitting
+    only as far as the requested columns. Accepts files with or without a header line.
+    """
+    with open_maybe_gz(path) as pf:
+        header: Optional[List[str]] = None
+        wanted: List[Tuple[str, int]] = []
+        for line in pf:
+            if not line.strip():
+                continue
+            if header is None:
+                first = line.split("\t", 1)[0].strip()
+                header = POKEC_PROFILE_COLUMNS if first.isdigit() else line.rstrip("\n").split("\t")
+                wanted = [(c, header.index(c)) for c in columns if c in header]
+                if not first.isdigit():
+                    continue
+            last = max((i for _, i in wanted), default=0)
+            parts = line.rstrip("\n").split("\t", last + 1)
+            if len(parts) < 2:
+                continue
+            yield int(parts[0]), {c: (parts[i] if i < len(parts) else "") for c, i in wanted}
+
+def pokec_user_row(uid: int, profile: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    name = (profile or {}).get("region", "") or f"User {uid}"
+    return {
+        "uid": uid,
+        "username": f"u{uid}",
+        "name": name,
+        "email": f"u{uid}@pokec.sk",
+        "bio": f"Pokec user {uid}",
+    }
@@ -0,0 +1,289 @@
+"""
+Compact binary snapshot of the User/FOLLOWS graph for analytics.
+
+    python -m app.data.snapshot export --out import/graph.snap   # from Neo4j (.env settings)
+    python -m app.data.snapshot info import/graph.snap
+    python -m app.data.loader --mode pokec-snapshot --relationships soc-pokec-relationships.txt.gz
+
+Node ids are dense (0..n-1). A file is a 64-byte header followed by these
+sections, little-endian, each starting on a 64-byte boundary:
+
+    name_off  int64[n + 1]   byte offsets of each username in `names`
+    order     int32[n]       ids sorted by username, for lookups
+    out_off   int64[n + 1]   CSR offsets of the out-edges (who i follows)
+    out_dst   int32[m]       followees, ascending within each row
+    in_off    int64[n + 1]   CSR offsets of the in-edges (who follows i)
+    in_src    int32[m]       followers, ascending within each row
+    names     uint8[...]     UTF-8 usernames, concatenated
+    uid       int64[n]       each user's uid, -1 if it has none (version 2)
+
+Version 1 files, which have no uid section, still open; their `uid` is None.
+Snapshot() maps the file read-only and exposes every section as a NumPy view
+of the mapping, so opening costs a header read and only the pages a tool
+touches are loaded.
+"""
+from __future__ import annotations
+import argparse, mmap, os, struct, time
+from array import array
+from typing import Any, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+from app.data.pokec import iter_profiles
+from app.services.auth_service import SYNTHETIC_UID_BASE
+
+MAGIC = b"SOCGRAPH"
+VERSION = 2
+NO_UID = -1
+# magic, version, flags (unused), users, edges, username bytes
+HEADER = struct.Struct("<8sIIQQQ")
+ALIGN = 64
+
+SNAPSHOT_USERS_CYPHER = """
+MATCH (u:User)
+RETURN u.username AS username, u.uid AS uid
+"""
+
+SNAPSHOT_FOLLOWS_CYPHER = """
+MATCH (a:User)-[:FOLLOWS]->(b:User)
+RETURN a.username AS src, b.username AS dst
+"""
+
+def _layout(n: int, m: int, names_bytes: int, version: int = VERSION) -> List[Tuple[str, Any, int, int]]:
+    """(section, dtype, count, byte offset) for every section, in file order."""
+    sections = [("name_off", np.int64, n + 1), ("order", np.int32, n),
+                ("out_off", np.int64, n + 1), ("out_dst", np.int32, m),
+                ("in_off", np.int64, n + 1), ("in_src", np.int32, m),
+                ("names", np.uint8, names_bytes)]
+    if version >= 2:
+        sections.append(("uid", np.int64, n))
+    out, pos = [], ALIGN
+    for name, dtype, count in sections:
+        out.append((name, dtype, count, pos))
+        pos += -(-count * np.dtype(dtype).itemsize // ALIGN) * ALIGN
+    return out
+
+SECTIONS = [s[0] for s in _layout(0, 0, 0)]
+
+def _pad(off: np.ndarray, n: int) -> np.ndarray:
+    # a CSR built before the last users were added has a short offset array
+    if len(off) >= n + 1:
+        return off[:n + 1]
+    return np.concatenate((off, np.full(n + 1 - len(off), off[-1], dtype=np.int64)))
+
+def _uids(uids: Optional[Sequence[Optional[int]]], n: int) -> np.ndarray:
+    if uids is None:
+        return np.full(n, NO_UID, dtype=np.int64)
+    if isinstance(uids, np.ndarray):
+        return uids.astype(np.int64, copy=False)
+    return np.fromiter((NO_UID if u is None else u for u in uids), dtype=np.int64, count=n)
+
+def write_csr(path: str, usernames: Sequence[str], out_off: np.ndarray, out_dst: np.ndarray,
+              in_off: np.ndarray, in_src: np.ndarray, uids: Optional[Sequence[Optional[int]]] = None) -> Tuple[int, int]:
+    """
+    Writes a snapshot from ready-made CSR arrays (rows sorted). `uids` runs
+    parallel to `usernames` (None: nobody has one). The file is written next
+    to `path` and renamed over it, so readers never see half a file.
+    """
+    n, m = len(usernames), len(out_dst)
+    if n >= 2 ** 31:
+        raise ValueError("Snapshots hold at most 2**31 - 1 users")
+    encoded = [u.encode("utf-8") for u in usernames]
+    name_off = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.fromiter(map(len, encoded), dtype=np.int64, count=n), out=name_off[1:])
+    order = np.array(sorted(range(n), key=encoded.__getitem__), dtype=np.int32)
+    arrays = {"name_off": name_off, "order": order,
+              "out_off": _pad(out_off, n), "out_dst": out_dst, "in_off": _pad(in_off, n), "in_src": in_src,
+              "names": np.frombuffer(b"".join(encoded), dtype=np.uint8), "uid": _uids(uids, n)}
+    tmp = f"{path}.tmp"
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, n, m, int(name_off[-1])))
+        for name, dtype, count, offset in _layout(n, m, int(name_off[-1])):
+            f.write(bytes(offset - f.tell()))
+            np.ascontiguousarray(arrays[name], dtype=np.dtype(dtype).newbyteorder("<")).tofile(f)
+        f.write(bytes(-f.tell() % ALIGN))
+    os.replace(tmp, path)
+    return n, m
+
+def csr(rows: np.ndarray, cols: np.ndarray, n: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Offsets and column ids of the distinct (row, col) pairs, columns ascending per row."""
+    off = np.zeros(n + 1, dtype=np.int64)
+    if not len(rows):
+        return off, np.zeros(0, dtype=np.int32)
+    keys = np.unique(rows.astype(np.int64) * n + cols.astype(np.int64))
+    np.cumsum(np.bincount(keys // n, minlength=n), out=off[1:])
+    return off, (keys % n).astype(np.int32)
+
+def write(path: str, usernames: Sequence[str], src: np.ndarray, dst: np.ndarray,
+          uids: Optional[Sequence[Optional[int]]] = None) -> Tuple[int, int]:
+    """Writes a snapshot from an edge list of ids into `usernames` (duplicates dropped)."""
+    n = len(usernames)
+    out_off, out_dst = csr(src, dst, n)
+    # rebuilt from the de-duplicated rows so both directions hold the same edges
+    in_off, in_src = csr(out_dst, np.repeat(np.arange(n, dtype=np.int64), np.diff(out_off)), n)
+    return write_csr(path, usernames, out_off, out_dst, in_off, in_src, uids)
+
+def export_client(client: Any, path: str, fetch_size: int = 10_000) -> Tuple[int, int]:
+    """Streams User and FOLLOWS out of a live database with read_iter and writes a snapshot."""
+    usernames: List[str] = []
+    uids: List[Optional[int]] = []
+    ids = {}
+    for r in client.read_iter(SNAPSHOT_USERS_CYPHER, fetch_size=fetch_size):
+        ids[r["username"]] = len(usernames)
+        usernames.append(r["username"])
+        uids.append(r["uid"])
+    # 4 bytes per endpoint instead of a Python int each
+    src, dst = array("i"), array("i")
+    for r in client.read_iter(SNAPSHOT_FOLLOWS_CYPHER, fetch_size=fetch_size):
+        src.append(ids[r["src"]])
+        dst.append(ids[r["dst"]])
+    return write(path, usernames, np.frombuffer(src, dtype=np.int32), np.frombuffer(dst, dtype=np.int32), uids)
+
+def export_graph(graph: Any, path: str) -> Tuple[int, int]:
+    """Writes the current state of an app.memory.MemoryGraph, folding its pending deltas first."""
+    with graph._lock:
+        if graph.pending:
+            graph.compact()
+        return write_csr(path, list(graph.username), graph.out_off, graph.out_dst, graph.in_off, graph.in_src,
+                         list(graph.uid))
+
+def read_edges(path: str) -> np.ndarray:
+    """(m, 2) int64 array of a SNAP edge list (plain or .gz), parsed in C rather than line by line."""
+    return np.loadtxt(path, dtype=np.int64, comments="#", ndmin=2)
+
+def from_pokec(relationships_path: str, profiles_path: Optional[str], path: str) -> Tuple[int, int]:
+    """
+    Builds a snapshot straight from the SNAP Pokec files, with the same usernames
+    (u<id>) and uids (the Pokec id) as the other loader modes. Users that only
+    appear in the profiles file are included as nodes without edges.
+    """
+    edges = read_edges(relationships_path)
+    uids = edges.ravel()
+    if profiles_path and os.path.exists(profiles_path):
+        extra = array("q", (uid for uid, _ in iter_profiles(profiles_path, ())))
+        uids = np.concatenate((uids, np.frombuffer(extra, dtype=np.int64)))
+    uids, dense = np.unique(uids, return_inverse=True)
+    dense = dense[:edges.size].reshape(-1, 2)
+    return write(path, [f"u{u}" for u in uids.tolist()], dense[:, 0], dense[:, 1], uids)
+
+def from_synthetic(edge_blocks: Iterator[np.ndarray], users: int, path: str) -> Tuple[int, int]:
+    """Snapshot of a synthetic graph (app.data.synthetic.generate_edges, ids 1..users as s<id> with uid SYNTHETIC_UID_BASE + <id>)."""
+    blocks = list(edge_blocks)
+    edges = np.concatenate(blocks) if blocks else np.zeros((0, 2), dtype=np.int64)
+    return write(path, [f"s{i}" for i in range(1, users + 1)], edges[:, 0] - 1, edges[:, 1] - 1,
+                 np.arange(SYNTHETIC_UID_BASE + 1, SYNTHETIC_UID_BASE + users + 1, dtype=np.int64))
+
+class Snapshot:
+    """
+    Read-only, memory-mapped snapshot. Section arrays (see the module docstring)
+    are attributes; they stay valid until close().
+    """
+    name_off: np.ndarray
+    order: np.ndarray
+    out_off: np.ndarray
+    out_dst: np.ndarray
+    in_off: np.ndarray
+    in_src: np.ndarray
+    names: np.ndarray
+    uid: Optional[np.ndarray]
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mm) < HEADER.size:
+            raise ValueError(f"{path} is not a graph snapshot")
+        magic, version, _, self.n, self.m, names_bytes = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a graph snapshot")
+        if version not in (1, VERSION):
+            raise ValueError(f"{path} has snapshot version {version}, expected {VERSION}")
+        self.version = version
+        self.uid = None
+        for name, dtype, count, offset in _layout(self.n, self.m, names_bytes, version):
+            if offset + count * np.dtype(dtype).itemsize > len(self._mm):
+                raise ValueError(f"{path} is truncated")
+            setattr(self, name, np.frombuffer(self._mm, dtype=np.dtype(dtype).newbyteorder("<"), count=count, offset=offset))
+
+    def __len__(self) -> int:
+        return self.n
+
+    def __enter__(self) -> "Snapshot":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        for name in SECTIONS:
+            self.__dict__.pop(name, None)
+        try:
+            self._mm.close()
+        except BufferError:
+            # views handed out by the accessors still point into the mapping;
+            # it is unmapped when the last of them is garbage collected
+            pass
+
+    def _name(self, i: int) -> bytes:
+        return self.names[self.name_off[i]:self.name_off[i + 1]].tobytes()
+
+    def username(self, i: int) -> str:
+        return self._name(i).decode("utf-8")
+
+    def usernames(self) -> Iterator[str]:
+        for i in range(self.n):
+            yield self.username(i)
+
+    def id(self, username: str) -> Optional[int]:
+        """Dense id of `username` (binary search over `order`), or None."""
+        key = username.encode("utf-8")
+        lo, hi = 0, self.n
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._name(int(self.order[mid])) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.n and self._name(int(self.order[lo])) == key:
+            return int(self.order[lo])
+        return None
+
+    def following(self, i: int) -> np.ndarray:
+        return self.out_dst[self.out_off[i]:self.out_off[i + 1]]
+
+    def followers(self, i: int) -> np.ndarray:
+        return self.in_src[self.in_off[i]:self.in_off[i + 1]]
+
+    def out_degrees(self) -> np.ndarray:
+        return np.diff(self.out_off)
+
+    def in_degrees(self) -> np.ndarray:
+        return np.diff(self.in_off)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Graph snapshot export and inspection")
+    sub = parser.add_subparsers(dest="command", required=True)
+    e = sub.add_parser("export", help="Dump User/FOLLOWS from Neo4j into a snapshot")
+    e.add_argument("--out", default=os.path.join("import", "graph.snap"))
+    e.add_argument("--fetch_size", type=int, default=10_000)
+    i = sub.add_parser("info", help="Open a snapshot and print its size")
+    i.add_argument("path")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        from app.neo4j_client import Neo4jClient
+        started = time.perf_counter()
+        client = Neo4jClient()
+        try:
+            n, m = export_client(client, args.out, args.fetch_size)
+        finally:
+            client.close()
+        print(f"Wrote {n} users and {m} FOLLOWS edges to {args.out} in {time.perf_counter() - started:.1f}s.")
+    else:
+        started = time.perf_counter()
+        with Snapshot(args.path) as snap:
+            opened = (time.perf_counter() - started) * 1000
+            print(f"{args.path}: {len(snap)} users, {snap.m} FOLLOWS edges, "
+                  f"{os.path.getsize(args.path) / 2 ** 20:.1f} MiB, opened in {opened:.2f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+from __future__ import annotations
+from typing import Iterator, Optional, Tuple
+import numpy as np
+
+MODELS = ("uniform", "powerlaw", "sbm")
+
+def _check_gamma(gamma: float) -> None:
+    # the weights below use the exponent -1 / (gamma - 1)
+    if not gamma > 1:
+        raise ValueError(f"gamma must be greater than 1, got {gamma}")
+
+def _zipf_weights(n: int, gamma: float, rng: np.random.Generator) -> np.ndarray:
+    """
+    Chung-Lu weights giving a power-law degree tail with exponent `gamma`,
+    assigned to a random permutation of ids so hubs are spread over the id space.
+    """
+    ranks = np.arange(1, n + 1, dtype=np.float64)
+    w = ranks ** (-1.0 / (gamma - 1.0))
+    out = np.empty(n, dtype=np.float64)
+    out[rng.permutation(n)] = w
+    return out / w.sum()
+
+def _sorted_unique(a: np.ndarray) -> np.ndarray:
+    # sort-based; np.unique's hash path is much slower on large int64 arrays
+    a = np.sort(a)
+    if len(a) < 2:
+        return a
+    keep = np.empty(len(a), dtype=bool)
+    keep[0] = True
+    np.not_equal(a[1:], a[:-1], out=keep[1:])
+    return a[keep]
+
+def out_degrees(users: int, avg_degree: int, model: str = "uniform", seed: int = 42, gamma: float = 2.5) -> np.ndarray:
+    """
+    Per-user out-degrees summing to exactly users * avg_degree (each capped at users - 1).
+    Uniform gives every user avg_degree; the skewed models draw from a heavy tail.
+    """
+    _check_gamma(gamma)
+    cap = users - 1
+    d = min(avg_degree, cap)
+    if model == "uniform" or d == cap:
+        return np.full(users, d, dtype=np.int64)
+    rng = np.random.default_rng([seed, 1])
+    total = users * d
+    deg = rng.multinomial(total, _zipf_weights(users, gamma, rng)).astype(np.int64)
+    # fold overflow from capped users back onto the rest, which keeps the total exact
+    while True:
+        over = np.clip(deg - cap, 0, None)
+        spill = int(over.sum())
+        if spill == 0:
+            return deg
+        deg -= over
+        room = np.flatnonzero(deg < cap)
+        np.add.at(deg, rng.choice(room, size=spill), 1)
+
+class EdgeSampler:
+    """
+    Vectorized target sampler for one model. Targets are 0-based; callers shift to ids.
+      uniform   every user equally likely
+      powerlaw  preferential attachment (Chung-Lu): P(target) ~ power-law weight
+      sbm       stochastic block model: `communities` contiguous blocks, a
+                fraction `mixing` of edges leaves the source's block
+    """
+    def __init__(self, users: int, model: str = "uniform", seed: int = 42, gamma: float = 2.5,
+                 communities: int = 20, mixing: float = 0.1) -> None:
+        if model not in MODELS:
+            raise ValueError(f"Unknown model {model!r}; choose from {', '.join(MODELS)}")
+        _check_gamma(gamma)
+        self.n = users
+        self.model = model
+        self.mixing = mixing
+        self.k = max(1, min(communities, users))
+        if model == "powerlaw":
+            self.cdf = np.cumsum(_zipf_weights(users, gamma, np.random.default_rng([seed, 2])))
+            self.cdf[-1] = 1.0
+
+    def community(self, nodes: np.ndarray) -> np.ndarray:
+        return nodes * self.k // self.n
+
+    def block(self, nodes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        # [lo, hi) of each node's community
+        c = self.community(nodes)
+        return -(-c * self.n // self.k), -(-(c + 1) * self.n // self.k)
+
+    def sample(self, src: np.ndarray, rng: np.random.Generator, full: Optional[np.ndarray] = None) -> np.ndarray:
+        """`full` (sbm): per source, True once every other member of its block is a target already."""
+        k = len(src)
+        if self.model == "powerlaw":
+            return np.searchsorted(self.cdf, rng.random(k), side="right")
+        if self.model == "sbm":
+            lo, hi = self.block(src)
+            inside = lo + (rng.random(k) * (hi - lo)).astype(np.int64)
+            outside = rng.integers(0, self.n, size=k)
+            leave = rng.random(k) < self.mixing
+            if full is not None:
+                leave |= full
+            return np.where(leave, outside, inside)
+        return rng.integers(0, self.n, size=k)
+
+def generate_edges(users: int, avg_degree: int, model: str = "uniform", seed: int = 42,
+                   block: int = 65536, gamma: float = 2.5, communities: int = 20,
+                   mixing: float = 0.1) -> Iterator[np.ndarray]:
+    """
+    Yields (k, 2) int64 arrays of distinct (src, dst) ids in 1..users, one block
+    of sources at a time, with no self-loops and exactly users * min(avg_degree,
+    users - 1) edges in total. Output depends only on the arguments.
+    """
+    if users < 2:
+        return
+    sampler = EdgeSampler(users, model, seed, gamma, communities, mixing)
+    deg = out_degrees(users, avg_degree, model if model == "powerlaw" else "uniform", seed)
+    n = np.int64(users)
+    for b, start in enumerate(range(0, users, block)):
+        rng = np.random.default_rng([seed, 3, b])
+        ids = np.arange(start, min(start + block, users), dtype=np.int64)
+        need = deg[ids]
+        have = np.zeros(len(ids), dtype=np.int64)
+        keys = np.empty(0, dtype=np.int64)
+        src = np.repeat(ids, need)
+        # sbm: a block can hold fewer targets than a source needs; once a
+        # source has all of them, its remaining edges leave the block
+        full = inner = room = None
+        if model == "sbm":
+            lo, hi = sampler.block(ids)
+            room = hi - lo - 1
+            inner = np.zeros(len(ids), dtype=np.int64)
+            full = room <= 0
+        while len(src):
+            dst = sampler.sample(src, rng, None if full is None else full[src - start])
+            ok = dst != src
+            cand = _sorted_unique(src[ok] * n + dst[ok])
+            if len(keys):
+                pos = np.minimum(np.searchsorted(keys, cand), len(keys) - 1)
+                cand = cand[keys[pos] != cand]
+                # two sorted runs: the stable sort degenerates to a linear merge
+                keys = np.sort(np.concatenate((keys, cand)), kind="stable")
+            else:
+                keys = cand
+            # resample whatever was lost to self-loops and duplicates
+            have += np.bincount(cand // n - start, minlength=len(ids))
+            if inner is not None:
+                s, d = cand // n, cand % n
+                lo, hi = sampler.block(s)
+                inner += np.bincount(s[(d >= lo) & (d < hi)] - start, minlength=len(ids))
+                full = inner >= room
+            src = np.repeat(ids, need - have)
+        yield np.stack((keys // n + 1, keys % n + 1), axis=1)
+
+def edge_pairs(users: int, avg_degree: int, **kwargs) -> Iterator[Tuple[int, int]]:
+    """Row-at-a-time view of generate_edges for the Cypher and CSV sinks."""
+    for arr in generate_edges(users, avg_degree, **kwargs):
+        yield from map(tuple, arr.tolist())
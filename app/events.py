@@ -0,0 +1,37 @@
+"""
+In-process notifications for user and graph mutations, so derived structures
+(leaderboards, caches, indexes) can update incrementally instead of rescanning.
+app.changefeed persists them for consumers in other processes.
+
+Events published by the services:
+  user_registered  username, name, email
+  profile_updated  username, name, email
+  followed         src, dst, name (of dst), followerCount (of dst, after the change)
+  unfollowed       src, dst, name (of dst), followerCount (of dst, after the change)
+"""
+from __future__ import annotations
+import logging
+from collections import defaultdict
+from typing import Any, Callable, DefaultDict, List
+
+log = logging.getLogger(__name__)
+
+Handler = Callable[..., Any]
+
+_subscribers: DefaultDict[str, List[Handler]] = defaultdict(list)
+
+def subscribe(kind: str, handler: Handler) -> None:
+    if handler not in _subscribers[kind]:
+        _subscribers[kind].append(handler)
+
+def unsubscribe(kind: str, handler: Handler) -> None:
+    if handler in _subscribers[kind]:
+        _subscribers[kind].remove(handler)
+
+def publish(kind: str, **payload: Any) -> None:
+    # The write has already committed; a failing subscriber must not fail the caller.
+    for handler in list(_subscribers.get(kind, ())):
+        try:
+            handler(**payload)
+        except Exception:
+            log.exception("event handler %r failed for %s", handler, kind)
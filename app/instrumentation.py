@@ -0,0 +1,263 @@
+"""
+Per-query instrumentation for Neo4jClient / AsyncNeo4jClient.
+
+Attach an Instrumentation as `client.instrumentation` (None, the default,
+skips all of this). Every query is then timed and tagged with the service
+function that issued it (e.g. `user_service.get_profile`, UC-3), and the
+driver's ResultSummary supplies server time (available + consumed after). A
+sampled fraction of reads runs under PROFILE to collect db hits.
+
+Per tag it keeps log-bucketed histograms of wall and server time (p50/p95/
+p99), row and db-hit totals and error counts, exported with to_json() or
+to_prometheus(). Queries slower than `slow_ms` go to the `app.slow_queries`
+logger with their Cypher, parameter shape (types and sizes, never values)
+and plan.
+"""
+from __future__ import annotations
+import bisect, json, logging, random, sys, threading, time
+from typing import Any, Dict, List, Optional, Tuple
+from app import config
+
+slow_log = logging.getLogger("app.slow_queries")
+
+# UC label per service function name; the same names are used by the sync and async services
+UC_BY_FUNCTION = {
+    "register_user": "UC-1", "login_user": "UC-2", "get_profile": "UC-3", "update_profile": "UC-4",
+    "follow_user": "UC-5", "unfollow_user": "UC-6", "list_following": "UC-7", "list_followers": "UC-7",
+    "mutual_connections": "UC-8", "mutual_count": "UC-8", "mutual_sample": "UC-8", "load_following": "UC-8",
+    "recommend_connections": "UC-9", "recommend": "UC-9", "precomputed": "UC-9",
+    "search_users": "UC-10", "popular_users": "UC-11", "refresh": "UC-11",
+}
+
+# frames in these modules are plumbing, not the caller we want to tag with
+_PLUMBING = ("app.neo4j_client", "app.instrumentation", "app.cache", "app.bulk", "app.standin", "neo4j", "contextlib",
+             "asyncio")
+
+def caller_tag(depth: int = 2) -> str:
+    f = sys._getframe(depth)
+    while f is not None:
+        mod = f.f_globals.get("__name__", "")
+        name = f.f_code.co_name
+        if not mod.startswith(_PLUMBING) and not name.startswith(("_", "<")):
+            return f"{mod.rsplit('.', 1)[-1]}.{name}"
+        f = f.f_back
+    return "unknown"
+
+def params_shape(params: Dict[str, Any]) -> Dict[str, str]:
+    out = {}
+    for k, v in params.items():
+        if isinstance(v, (list, tuple)):
+            out[k] = f"list[{len(v)}]"
+        elif isinstance(v, dict):
+            out[k] = f"map[{len(v)}]"
+        else:
+            out[k] = type(v).__name__
+    return out
+
+def db_hits(plan: Optional[Dict[str, Any]]) -> int:
+    if not plan:
+        return 0
+    return plan.get("dbHits", 0) + sum(db_hits(c) for c in plan.get("children", ()))
+
+def plan_text(plan: Optional[Dict[str, Any]], indent: int = 0) -> str:
+    if not plan:
+        return ""
+    line = "  " * indent + plan.get("operatorType", "?")
+    if "rows" in plan:
+        line += f" rows={plan['rows']}"
+    if "dbHits" in plan:
+        line += f" dbHits={plan['dbHits']}"
+    return "\n".join([line] + [plan_text(c, indent + 1) for c in plan.get("children", ())])
+
+class Histogram:
+    """Log-bucketed (x1.25) latency histogram in milliseconds; quantiles are interpolated."""
+    BOUNDS = [0.05 * 1.25 ** i for i in range(64)]  # 0.05 ms .. ~55 s
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(self.BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, ms: float) -> None:
+        self.counts[bisect.bisect_left(self.BOUNDS, ms)] += 1
+        self.count += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            if c and seen + c >= rank:
+                lo = self.BOUNDS[i - 1] if i > 0 else 0.0
+                hi = self.BOUNDS[i] if i < len(self.BOUNDS) else self.max
+                return min(lo + (hi - lo) * (rank - seen) / c, self.max)
+            seen += c
+        return self.max
+
+    def snapshot(self) -> Dict[str, float]:
+        return {"count": self.count, "sum": round(self.total, 3), "p50": round(self.quantile(0.5), 3),
+                "p95": round(self.quantile(0.95), 3), "p99": round(self.quantile(0.99), 3), "max": round(self.max, 3)}
+
+class QueryStats:
+    def __init__(self) -> None:
+        self.wall = Histogram()
+        self.server = Histogram()
+        self.rows = 0
+        self.db_hits = 0
+        self.profiled = 0
+        self.errors = 0
+
+class Instrumentation:
+    def __init__(self, slow_ms: Optional[float] = 200.0, profile_sample: float = 0.0) -> None:
+        self.slow_ms = slow_ms
+        self.profile_sample = profile_sample
+        self.stats: Dict[str, QueryStats] = {}
+        self._lock = threading.Lock()
+
+    # -- hooks used by the clients ------------------------------------------
+
+    def prepare(self, cypher: str, profile: bool = True) -> Tuple[str, bool]:
+        # statements that already start with a query option are left alone
+        if profile and self.profile_sample and random.random() < self.profile_sample \
+                and not cypher.lstrip().upper().startswith(("PROFILE", "EXPLAIN", "CYPHER", "USING")):
+            return "PROFILE " + cypher, True
+        return cypher, False
+
+    def observe(self, runner: Any, cypher: str, params: Dict[str, Any], tag: Optional[str] = None,
+                profile: bool = True) -> List[Dict[str, Any]]:
+        """Runs `cypher` on a session or transaction and records it."""
+        tag = tag or caller_tag()
+        query, profiled = self.prepare(cypher, profile)
+        t0 = time.perf_counter()
+        try:
+            result = runner.run(query, params)
+            rows = result.data()
+            summary = result.consume()
+        except Exception:
+            self.error(tag)
+            raise
+        self.record(tag, cypher, params, (time.perf_counter() - t0) * 1000, summary, len(rows), profiled)
+        return rows
+
+    async def aobserve(self, runner: Any, cypher: str, params: Dict[str, Any], tag: str,
+                       profile: bool = True) -> List[Dict[str, Any]]:
+        # the tag must be taken before the first await, while the caller is still on the stack
+        query, profiled = self.prepare(cypher, profile)
+        t0 = time.perf_counter()
+        try:
+            result = await runner.run(query, params)
+            rows = await result.data()
+            summary = await result.consume()
+        except Exception:
+            self.error(tag)
+            raise
+        self.record(tag, cypher, params, (time.perf_counter() - t0) * 1000, summary, len(rows), profiled)
+        return rows
+
+    def error(self, tag: str) -> None:
+        with self._lock:
+            self.stats.setdefault(tag, QueryStats()).errors += 1
+
+    def record(self, tag: str, cypher: str, params: Dict[str, Any], wall_ms: float, summary: Any,
+               rows: int, profiled: bool = False) -> None:
+        server_ms = None
+        profile = None
+        if summary is not None:
+            avail = getattr(summary, "result_available_after", None)
+            consumed = getattr(summary, "result_consumed_after", None)
+            if avail is not None:
+                server_ms = avail + (consumed or 0)
+            profile = getattr(summary, "profile", None) if profiled else None
+        hits = db_hits(profile)
+        with self._lock:
+            s = self.stats.get(tag)
+            if s is None:
+                s = self.stats[tag] = QueryStats()
+            s.wall.add(wall_ms)
+            if server_ms is not None:
+                s.server.add(server_ms)
+            s.rows += rows
+            if profiled:
+                s.profiled += 1
+                s.db_hits += hits
+        if self.slow_ms is not None and wall_ms >= self.slow_ms:
+            self._log_slow(tag, cypher, params, wall_ms, server_ms, rows, summary, profile)
+
+    def _log_slow(self, tag: str, cypher: str, params: Dict[str, Any], wall_ms: float, server_ms: Optional[float],
+                  rows: int, summary: Any, profile: Optional[Dict[str, Any]]) -> None:
+        plan = profile or getattr(summary, "plan", None)
+        counters = getattr(summary, "counters", None)
+        entry = {
+            "tag": tag, "uc": UC_BY_FUNCTION.get(tag.rsplit(".", 1)[-1]), "wall_ms": round(wall_ms, 2),
+            "server_ms": server_ms, "rows": rows, "params": params_shape(params),
+            "cypher": " ".join(cypher.split()),
+        }
+        if profile:
+            entry["db_hits"] = db_hits(profile)
+        if counters is not None and getattr(counters, "contains_updates", False):
+            entry["counters"] = {k: v for k, v in vars(counters).items() if isinstance(v, int) and v and not k.startswith("_")}
+        if plan:
+            entry["plan"] = plan_text(plan)
+        slow_log.warning(json.dumps(entry, default=str))
+
+    # -- export ----------------------------------------------------------------
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {tag: {
+                "uc": UC_BY_FUNCTION.get(tag.rsplit(".", 1)[-1]),
+                "wall_ms": s.wall.snapshot(), "server_ms": s.server.snapshot(),
+                "rows": s.rows, "db_hits": s.db_hits, "profiled": s.profiled, "errors": s.errors,
+            } for tag, s in sorted(self.stats.items())}
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self) -> str:
+        lines = [
+            "# HELP app_query_seconds Client-side query wall time.",
+            "# TYPE app_query_seconds summary",
+            "# HELP app_query_server_seconds Server time (result available + consumed after).",
+            "# TYPE app_query_server_seconds summary",
+            "# HELP app_query_rows_total Rows returned.",
+            "# TYPE app_query_rows_total counter",
+            "# HELP app_query_db_hits_total Database hits of profiled queries.",
+            "# TYPE app_query_db_hits_total counter",
+            "# HELP app_query_errors_total Failed queries.",
+            "# TYPE app_query_errors_total counter",
+        ]
+        for tag, s in self.snapshot().items():
+            labels = f'tag="{tag}",uc="{s["uc"] or ""}"'
+            for metric, key in (("app_query_seconds", "wall_ms"), ("app_query_server_seconds", "server_ms")):
+                h = s[key]
+                for q in ("p50", "p95", "p99"):
+                    lines.append(f'{metric}{{{labels},quantile="0.{q[1:]}"}} {h[q] / 1000:.6f}')
+                lines.append(f"{metric}_sum{{{labels}}} {h['sum'] / 1000:.6f}")
+                lines.append(f"{metric}_count{{{labels}}} {h['count']}")
+            lines.append(f"app_query_rows_total{{{labels}}} {s['rows']}")
+            lines.append(f"app_query_db_hits_total{{{labels}}} {s['db_hits']}")
+            lines.append(f"app_query_errors_total{{{labels}}} {s['errors']}")
+        return "\n".join(lines) + "\n"
+
+    def report(self) -> str:
+        rows = [f"{'tag':<40} {'uc':<6} {'count':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'rows':>9} {'dbHits':>9}"]
+        for tag, s in self.snapshot().items():
+            w = s["wall_ms"]
+            rows.append(f"{tag:<40} {s['uc'] or '':<6} {w['count']:>7} {w['p50']:>8.2f} {w['p95']:>8.2f} "
+                        f"{w['p99']:>8.2f} {s['rows']:>9} {s['db_hits']:>9}")
+        return "\n".join(rows)
+
+def from_env() -> Optional[Instrumentation]:
+    """
+    APP_INSTRUMENT=1 turns it on; APP_SLOW_MS (default 200, empty disables the
+    slow log) and APP_PROFILE_SAMPLE (share of reads run under PROFILE, default 0).
+    """
+    if not config.env_flag("APP_INSTRUMENT"):
+        return None
+    slow = config.env("APP_SLOW_MS", "200")
+    sample = config.env_float("APP_PROFILE_SAMPLE", 0)
+    return Instrumentation(slow_ms=float(slow) if slow else None, profile_sample=sample)
@@ -0,0 +1,363 @@
+"""
+Graph analytics over a CSR snapshot (app/data/snapshot.py): PageRank and
+personalized PageRank, in/out-degree distributions, weakly connected
+components and label-propagation communities. Each pass is whole-array
+NumPy work (SciPy's sparse kernels when SciPy is installed), with no per-user
+Cypher. Results are written back in bulk as `User.pagerank` (scaled so the
+average user has 1.0) and `User.community` (0 = largest). Those feed UC-11
+(`popular_users(rank_by="pagerank")`) and the UC-9 `pagerank` and
+`community` scorers.
+
+    python -m app.jobs.analytics --snapshot import/graph.snap --write --workers 4
+    python -m app.jobs.analytics --export --write          # refresh the snapshot from Neo4j first
+    python -m app.jobs.analytics --algorithms pagerank --ppr u1234
+
+PageRank and label propagation split the users into contiguous blocks of
+about equal edge count and run one block per thread. NumPy releases the GIL
+inside these kernels, so the blocks run on separate cores.
+"""
+from __future__ import annotations
+import argparse, json, os, time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+from app.data import snapshot
+from app.data.snapshot import Snapshot
+from app.neo4j_client import Neo4jClient
+
+try:
+    import scipy.sparse as sp
+    from scipy.sparse import csgraph
+except ImportError:  # optional: the NumPy kernels below are used instead
+    sp = csgraph = None
+
+ALGORITHMS = ("degrees", "pagerank", "components", "communities")
+
+# `props` holds only the results that were computed, so a partial run keeps the others
+WRITE_CYPHER = """
+UNWIND $rows AS row
+MATCH (u:User {username: row.username})
+SET u += row.props
+"""
+
+def _blocks(off: np.ndarray, parts: int) -> List[Tuple[int, int]]:
+    """Contiguous row ranges holding about the same number of edges each."""
+    n = len(off) - 1
+    cuts = np.unique(np.concatenate(([0, n], np.searchsorted(off, np.linspace(0, off[-1], parts + 1)[1:-1]))))
+    return [(int(a), int(b)) for a, b in zip(cuts[:-1], cuts[1:]) if b > a]
+
+class _Blocks:
+    """Runs fn(a, b) over the row blocks, on a thread pool when workers > 1."""
+    def __init__(self, off: np.ndarray, workers: int) -> None:
+        self.ranges = _blocks(off, max(workers, 1))
+        self._pool = ThreadPoolExecutor(max_workers=workers) if workers > 1 and len(self.ranges) > 1 else None
+
+    def map(self, fn: Callable[[int, int], Any]) -> List[Any]:
+        if self._pool is None:
+            return [fn(a, b) for a, b in self.ranges]
+        return list(self._pool.map(lambda r: fn(*r), self.ranges))
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+
+class PullOperator(_Blocks):
+    """y[v] = sum of x[u] over the in-edges u -> v (a sparse matrix-vector product over the in-CSR)."""
+    def __init__(self, off: np.ndarray, idx: np.ndarray, workers: int = 1) -> None:
+        super().__init__(off, workers)
+        self.off, self.idx, self.n = off, idx, len(off) - 1
+        self._matrices = None
+        if sp is not None:
+            self._matrices = {(a, b): sp.csr_matrix((np.ones(int(off[b] - off[a])), idx[off[a]:off[b]], off[a:b + 1] - off[a]),
+                                                    shape=(b - a, self.n)) for a, b in self.ranges}
+
+    def _rows(self, x: np.ndarray, y: np.ndarray, a: int, b: int) -> None:
+        if self._matrices is not None:
+            y[a:b] = self._matrices[(a, b)] @ x
+            return
+        lo, hi = int(self.off[a]), int(self.off[b])
+        if hi == lo:
+            y[a:b] = 0.0
+            return
+        starts = self.off[a:b] - lo
+        sums = np.add.reduceat(x[self.idx[lo:hi]], np.minimum(starts, hi - lo - 1))
+        # reduceat yields one element, not 0, for an empty row
+        sums[self.off[a + 1:b + 1] == self.off[a:b]] = 0.0
+        y[a:b] = sums
+
+    def __call__(self, x: np.ndarray) -> np.ndarray:
+        y = np.empty(self.n)
+        self.map(lambda a, b: self._rows(x, y, a, b))
+        return y
+
+def pagerank(graph: Snapshot, damping: float = 0.85, tol: float = 1e-6, max_iter: int = 100,
+             personalization: Optional[np.ndarray] = None, workers: int = 1) -> Tuple[np.ndarray, int]:
+    """
+    Power iteration over the in-CSR; scores sum to 1. Dangling users' rank is
+    spread like the teleport vector, which `personalization` (non-negative,
+    any scale) can bias towards some users. Stops when the L1 change between
+    iterations drops below `tol`. Returns (scores, iterations).
+    """
+    n = len(graph)
+    if n == 0:
+        return np.zeros(0), 0
+    out_deg = np.diff(graph.out_off)
+    dangling = out_deg == 0
+    inv = np.divide(1.0, out_deg, out=np.zeros(n), where=~dangling)
+    v = np.full(n, 1.0 / n) if personalization is None else personalization / personalization.sum()
+    x = v.copy()
+    it = 0
+    pull = PullOperator(graph.in_off, graph.in_src, workers)
+    try:
+        for it in range(1, max_iter + 1):
+            y = pull(x * inv)
+            y *= damping
+            y += (damping * x[dangling].sum() + 1.0 - damping) * v
+            err = np.abs(y - x).sum()
+            x = y
+            if err < tol:
+                break
+    finally:
+        pull.close()
+    return x, it
+
+def personalized_pagerank(graph: Snapshot, seeds: Sequence[int], **kwargs: Any) -> Tuple[np.ndarray, int]:
+    """PageRank whose random jumps all land on `seeds` (ids): relevance to those users."""
+    p = np.zeros(len(graph))
+    p[np.asarray(seeds, dtype=np.int64)] = 1.0
+    return pagerank(graph, personalization=p, **kwargs)
+
+def degree_distribution(degrees: np.ndarray) -> Dict[str, Any]:
+    """Summary statistics plus counts in power-of-two bins ("0", "1", "2-3", "4-7", ...)."""
+    if not len(degrees):
+        return {"users": 0}
+    counts = np.bincount(degrees)
+    hist: Dict[str, int] = {"0": int(counts[0])}
+    lo = 1
+    while lo < len(counts):
+        hi = 2 * lo - 1
+        hist[str(lo) if lo == hi else f"{lo}-{hi}"] = int(counts[lo:hi + 1].sum())
+        lo *= 2
+    p50, p90, p99 = np.percentile(degrees, [50, 90, 99])
+    return {"users": len(degrees), "mean": float(degrees.mean()), "median": float(p50), "p90": float(p90),
+            "p99": float(p99), "max": int(degrees.max()), "histogram": hist}
+
+def _by_size(labels: np.ndarray) -> Tuple[np.ndarray, int]:
+    # renumbers labels so 0 is the largest group; returns (labels, groups)
+    _, inv, sizes = np.unique(labels, return_inverse=True, return_counts=True)
+    rank = np.empty(len(sizes), dtype=np.int32)
+    rank[np.argsort(-sizes, kind="stable")] = np.arange(len(sizes), dtype=np.int32)
+    return rank[inv.ravel()], len(sizes)
+
+def weak_components(graph: Snapshot) -> Tuple[np.ndarray, int, int]:
+    """
+    Weakly connected component of every user, numbered by size (0 = largest).
+    Without SciPy: hook each edge's larger root onto the smaller one, then
+    pointer-jump until every label is a root, repeated until no edge joins two
+    roots. Returns (labels, components, rounds).
+    """
+    n = len(graph)
+    if n == 0:
+        return np.zeros(0, dtype=np.int32), 0, 0
+    if csgraph is not None:
+        m = sp.csr_matrix((np.ones(len(graph.out_dst), dtype=np.int8), graph.out_dst, graph.out_off), shape=(n, n))
+        labels = csgraph.connected_components(m, directed=True, connection="weak")[1]
+        return (*_by_size(labels), 1)
+    src = np.repeat(np.arange(n, dtype=np.int32), np.diff(graph.out_off))
+    dst = graph.out_dst
+    labels = np.arange(n, dtype=np.int32)
+    rounds = 0
+    while True:
+        lu, lv = labels[src], labels[dst]
+        cross = lu != lv
+        if not cross.any():
+            break
+        rounds += 1
+        lu, lv = lu[cross], lv[cross]
+        # labels only ever point to smaller ids, so no cycles can form
+        labels[np.maximum(lu, lv)] = np.minimum(lu, lv)
+        while True:
+            jumped = labels[labels]
+            if np.array_equal(jumped, labels):
+                break
+            labels = jumped
+        # edges already inside one component stay that way
+        src, dst = src[cross], dst[cross]
+    return (*_by_size(labels), rounds)
+
+def _undirected(graph: Snapshot) -> Tuple[np.ndarray, np.ndarray]:
+    """CSR of followees and followers together: row u holds u's out-row, then its in-row."""
+    out_off, in_off = graph.out_off, graph.in_off
+    m = len(graph.out_dst)
+    off = out_off + in_off
+    nbr = np.empty(2 * m, dtype=np.int32)
+    edge = np.arange(m, dtype=np.int64)
+    nbr[edge + np.repeat(in_off[:-1], np.diff(out_off))] = graph.out_dst
+    nbr[edge + np.repeat(out_off[1:], np.diff(in_off))] = graph.in_src
+    return off, nbr
+
+def _adopt(off: np.ndarray, nbr: np.ndarray, labels: np.ndarray, active: np.ndarray, a: int, b: int) -> Tuple[np.ndarray, np.ndarray]:
+    # most common neighbour label for the active users in rows a..b; own label wins ties
+    n = np.int64(len(labels))
+    row = np.repeat(np.arange(a, b, dtype=np.int64), np.diff(off[a:b + 1]))
+    sel = active[row]
+    row, lab = row[sel], labels[nbr[off[a]:off[b]][sel]]
+    if not len(row):
+        return row, lab
+    key = np.sort((row - a) * n + lab)
+    first = np.flatnonzero(np.concatenate(([True], key[1:] != key[:-1])))
+    count = np.diff(np.append(first, len(key)))
+    users, cand = key[first] // n + a, (key[first] % n).astype(labels.dtype)
+    score = 2 * count + (cand == labels[users])
+    starts = np.flatnonzero(np.concatenate(([True], users[1:] != users[:-1])))
+    best = np.repeat(np.maximum.reduceat(score, starts), np.diff(np.append(starts, len(score))))
+    win = np.flatnonzero(score == best)
+    win = win[np.concatenate(([True], users[win][1:] != users[win][:-1]))]
+    return users[win], cand[win]
+
+def label_propagation(graph: Snapshot, max_iter: int = 20, tol: float = 1e-3, seed: int = 42,
+                      workers: int = 1) -> Tuple[np.ndarray, int, int]:
+    """
+    Communities by semi-synchronous label propagation on the undirected graph.
+    Each round, a random half of the users take the label most common among
+    their neighbours. A user's own label wins ties, then the smallest one.
+    Updating only half the users stops two-colourable parts from oscillating.
+    Stops when fewer than `tol` of the users change.
+    Returns (labels numbered by size, communities, rounds).
+    """
+    n = len(graph)
+    if n == 0:
+        return np.zeros(0, dtype=np.int32), 0, 0
+    off, nbr = _undirected(graph)
+    labels = np.arange(n, dtype=np.int32)
+    rng = np.random.default_rng(seed)
+    blocks = _Blocks(off, workers)
+    try:
+        for it in range(1, max_iter + 1):
+            active = rng.random(n) < 0.5
+            changed = 0
+            for users, new in blocks.map(lambda a, b: _adopt(off, nbr, labels, active, a, b)):
+                changed += int(np.count_nonzero(labels[users] != new))
+                labels[users] = new
+            if changed < tol * n:
+                break
+    finally:
+        blocks.close()
+    return (*_by_size(labels), it)
+
+def _timed(report: Dict[str, Any], name: str, fn: Callable[[], Any], iterations: Optional[Callable[[Any], int]] = None) -> Any:
+    t0 = time.perf_counter()
+    out = fn()
+    seconds = time.perf_counter() - t0
+    entry: Dict[str, Any] = {"seconds": round(seconds, 3)}
+    if iterations is not None:
+        entry["iterations"] = iterations(out)
+        entry["iterations_per_sec"] = round(entry["iterations"] / max(seconds, 1e-9), 2)
+    report[name] = entry
+    return out
+
+def run(graph: Snapshot, algorithms: Sequence[str] = ALGORITHMS, workers: int = 1, damping: float = 0.85,
+        max_iter: int = 100, lpa_rounds: int = 20) -> Tuple[Dict[str, np.ndarray], Dict[str, Any]]:
+    """
+    Runs the chosen passes. Returns per-user result arrays ("pagerank",
+    "component", "community") and a report of timings, iterations and summaries.
+    """
+    unknown = [a for a in algorithms if a not in ALGORITHMS]
+    if unknown:
+        raise ValueError(f"Unknown algorithm(s) {', '.join(unknown)}; choose from {', '.join(ALGORITHMS)}")
+    t0 = time.perf_counter()
+    out: Dict[str, np.ndarray] = {}
+    report: Dict[str, Any] = {"users": len(graph), "edges": int(graph.m), "workers": workers,
+                              "scipy": sp is not None, "steps": {}}
+    steps = report["steps"]
+    if "degrees" in algorithms:
+        report["in_degree"], report["out_degree"] = _timed(
+            steps, "degrees", lambda: (degree_distribution(graph.in_degrees()), degree_distribution(graph.out_degrees())))
+    if "pagerank" in algorithms:
+        out["pagerank"], _ = _timed(steps, "pagerank", lambda: pagerank(graph, damping, max_iter=max_iter, workers=workers),
+                                    lambda r: r[1])
+    if "components" in algorithms:
+        out["component"], count, _ = _timed(steps, "components", lambda: weak_components(graph), lambda r: r[2])
+        sizes = np.bincount(out["component"]) if count else np.zeros(0, dtype=np.int64)
+        report["components"] = {"count": count, "largest": int(sizes[0]) if count else 0,
+                                "singletons": int(np.count_nonzero(sizes == 1))}
+    if "communities" in algorithms:
+        out["community"], count, _ = _timed(steps, "communities",
+                                            lambda: label_propagation(graph, lpa_rounds, workers=workers), lambda r: r[2])
+        sizes = np.bincount(out["community"]) if count else np.zeros(0, dtype=np.int64)
+        report["communities"] = {"count": count, "largest": int(sizes[0]) if count else 0,
+                                 "of_10_or_more": int(np.count_nonzero(sizes >= 10))}
+    report["seconds"] = round(time.perf_counter() - t0, 3)
+    return out, report
+
+def _rows(graph: Snapshot, results: Dict[str, np.ndarray]) -> Iterator[Dict[str, Any]]:
+    n = len(graph)
+    pr = results.get("pagerank")
+    community = results.get("community")
+    for i in range(n):
+        props: Dict[str, Any] = {}
+        if pr is not None:
+            props["pagerank"] = float(pr[i]) * n
+        if community is not None:
+            props["community"] = int(community[i])
+        yield {"username": graph.username(i), "props": props}
+
+def write_back(client: Neo4jClient, graph: Snapshot, results: Dict[str, np.ndarray], batch_size: int = 10_000,
+               workers: int = 1) -> int:
+    """Stores pagerank and community on every User in UNWIND batches; returns the rows written."""
+    if "pagerank" not in results and "community" not in results:
+        return 0
+    n = client.write_many(WRITE_CYPHER, _rows(graph, results), batch_size=batch_size, workers=workers)
+    if client.cache is not None:
+        client.cache.backend.invalidate(["popular"])
+    return n
+
+def main():
+    parser = argparse.ArgumentParser(description="PageRank, degree stats, components and communities over a snapshot")
+    parser.add_argument("--snapshot", default=os.path.join("import", "graph.snap"))
+    parser.add_argument("--export", action="store_true", help="Export the snapshot from the database first")
+    parser.add_argument("--algorithms", nargs="*", choices=ALGORITHMS, default=list(ALGORITHMS))
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Threads for PageRank and communities")
+    parser.add_argument("--damping", type=float, default=0.85)
+    parser.add_argument("--max_iter", type=int, default=100, help="PageRank iteration cap")
+    parser.add_argument("--lpa_rounds", type=int, default=20, help="Label propagation round cap")
+    parser.add_argument("--ppr", help="Also print the personalized PageRank top 10 for this username")
+    parser.add_argument("--write", action="store_true", help="Store pagerank/community on the User nodes")
+    parser.add_argument("--batch_size", type=int, default=10_000)
+    parser.add_argument("--json", help="Also write the report to this file")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    client = Neo4jClient() if args.export or args.write else None
+    try:
+        if args.export:
+            n, m = snapshot.export_client(client, args.snapshot)
+            print(f"Exported {n} users and {m} FOLLOWS edges to {args.snapshot}.")
+        graph = Snapshot(args.snapshot)
+        results, report = run(graph, args.algorithms, args.workers, args.damping, args.max_iter, args.lpa_rounds)
+        print(json.dumps(report, indent=2))
+        if args.ppr:
+            me = graph.id(args.ppr)
+            if me is None:
+                raise SystemExit(f"No user {args.ppr!r} in {args.snapshot}.")
+            scores, _ = personalized_pagerank(graph, [me], damping=args.damping, max_iter=args.max_iter, workers=args.workers)
+            scores[me] = 0.0
+            print(f"Personalized PageRank for {args.ppr}:")
+            for i in np.argsort(-scores)[:10].tolist():
+                print(f" - {graph.username(i)} {scores[i]:.6f}")
+        if args.write:
+            t0 = time.perf_counter()
+            written = write_back(client, graph, results, args.batch_size, args.workers)
+            report["write"] = {"rows": written, "seconds": round(time.perf_counter() - t0, 3)}
+            print(f"Wrote pagerank/community for {written} users in {report['write']['seconds']:.1f}s.")
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+                f.write("\n")
+    finally:
+        if client is not None:
+            client.close()
+    print(f"Done in {time.perf_counter() - started:.1f}s.")
+
+if __name__ == "__main__":
+    main()
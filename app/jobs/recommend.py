@@ -0,0 +1,173 @@
+"""
+UC-9 batch precompute: stores each user's top-N recommendations as scored
+`(:User)-[:RECOMMENDED {rank, score, mutuals}]->(:User)` relationships, which
+graph_service.recommend_connections serves while they are fresh.
+
+    python -m app.jobs.recommend --full --workers 8
+    python -m app.jobs.recommend            # only users whose 2-hop neighbourhood changed
+
+Usernames are paged from the unique index and handed out in chunks to a
+process pool; every worker process opens its own driver with the parent
+client's connection settings and writes a chunk's results in one UNWIND. The run's start time (server clock) is kept on a
+`:JobState` node, and the next incremental run recomputes only users who
+changed their follows since then or who follow such a user.
+"""
+from __future__ import annotations
+import argparse, atexit, os, time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from app.neo4j_client import Neo4jClient
+from app.services import recommendation_service as rs
+
+JOB_NAME = "recommend"
+
+USERS_PAGE_CYPHER = """
+MATCH (u:User)
+WHERE u.username > $after
+RETURN u.username AS username
+ORDER BY u.username ASC
+LIMIT $limit
+"""
+
+# A user's candidates are the follows of their followees, so a change in c's
+# follows affects c itself and everyone following c.
+CHANGED_USERS_CYPHER = """
+MATCH (c:User)
+WHERE c.followsUpdatedAt >= $since
+CALL {
+  WITH c
+  RETURN c AS u
+  UNION
+  WITH c
+  MATCH (u:User)-[:FOLLOWS]->(c)
+  RETURN u
+}
+RETURN DISTINCT u.username AS username
+"""
+
+NOW_CYPHER = "RETURN datetime() AS now"
+
+LAST_RUN_CYPHER = """
+MATCH (j:JobState {name: $name})
+RETURN j.lastRunAt AS lastRunAt
+"""
+
+SAVE_RUN_CYPHER = """
+MERGE (j:JobState {name: $name})
+SET j.lastRunAt = $startedAt, j.users = $users, j.seconds = $seconds, j.scorer = $scorer
+"""
+
+_worker_client: Optional[Neo4jClient] = None
+
+def _init_worker(settings: Dict[str, Any]) -> None:
+    global _worker_client
+    _worker_client = Neo4jClient(**settings)
+    atexit.register(_worker_client.close)
+
+def compute_chunk(usernames: List[str], scorer: str, top: int, budget: Optional[float], computed_at: Any,
+                  client: Optional[Neo4jClient] = None) -> Tuple[int, int]:
+    """
+    Recommends for each user in the chunk and stores the results in one write.
+    Returns (users, recommendations written).
+    """
+    client = client or _worker_client
+    results = [{"username": u, "recs": rs.recommend(client, u, limit=top, scorer=scorer, budget=budget)}
+               for u in usernames]
+    rs.store(client, results, scorer, top, computed_at)
+    return len(results), sum(len(r["recs"]) for r in results)
+
+def iter_all_users(client: Neo4jClient, page: int = 10_000) -> Iterator[str]:
+    after = ""
+    while True:
+        rows = client.read(USERS_PAGE_CYPHER, {"after": after, "limit": page})
+        for r in rows:
+            yield r["username"]
+        if len(rows) < page:
+            return
+        after = rows[-1]["username"]
+
+def iter_changed_users(client: Neo4jClient, since: Any) -> Iterator[str]:
+    for r in client.read(CHANGED_USERS_CYPHER, {"since": since}):
+        yield r["username"]
+
+def _chunks(names: Iterator[str], size: int) -> Iterator[List[str]]:
+    chunk: List[str] = []
+    for n in names:
+        chunk.append(n)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def run(client: Neo4jClient, full: bool = False, workers: int = 4, chunk_size: int = 200, top: int = 20,
+        scorer: str = "mutuals", budget: Optional[float] = 2.0) -> Dict[str, Any]:
+    """
+    Runs one precompute pass and returns its stats. Without a previous run
+    (or with `full=True`) every user is recomputed.
+    """
+    if scorer not in rs.SCORERS:
+        raise ValueError(f"Unknown scorer {scorer!r}; choose from {', '.join(rs.SCORERS)}")
+    # server clock, so freshness compares against followsUpdatedAt consistently
+    started_at = client.read(NOW_CYPHER)[0]["now"]
+    last = None if full else client.read(LAST_RUN_CYPHER, {"name": JOB_NAME})
+    since = last[0]["lastRunAt"] if last else None
+    names = iter_all_users(client) if since is None else iter_changed_users(client, since)
+    computed_at = started_at.to_native()
+
+    t0 = time.perf_counter()
+    users = recs = 0
+    # worker processes would each open their own, empty in-process graph
+    if getattr(client.driver, "in_process", False):
+        workers = 1
+    if workers <= 1:
+        for chunk in _chunks(names, chunk_size):
+            u, r = compute_chunk(chunk, scorer, top, budget, computed_at, client)
+            users += u
+            recs += r
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(client.settings,)) as pool:
+            pending: Set[Future] = set()
+            for chunk in _chunks(names, chunk_size):
+                # keep a bounded number of chunks in flight
+                if len(pending) >= 2 * workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for f in done:
+                        u, r = f.result()
+                        users += u
+                        recs += r
+                pending.add(pool.submit(compute_chunk, chunk, scorer, top, budget, computed_at))
+            for f in pending:
+                u, r = f.result()
+                users += u
+                recs += r
+    elapsed = time.perf_counter() - t0
+
+    client.write(SAVE_RUN_CYPHER, {"name": JOB_NAME, "startedAt": started_at, "users": users,
+                                   "seconds": elapsed, "scorer": scorer})
+    return {"mode": "full" if since is None else "incremental", "users": users, "recommendations": recs,
+            "seconds": elapsed, "users_per_sec": users / max(elapsed, 1e-9)}
+
+def main():
+    parser = argparse.ArgumentParser(description="UC-9 batch recommendation precompute")
+    parser.add_argument("--full", action="store_true", help="Recompute every user, not only changed ones")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument("--chunk", type=int, default=200, help="Users per task / per result write")
+    parser.add_argument("--top", type=int, default=20, help="Recommendations stored per user")
+    parser.add_argument("--scorer", choices=sorted(rs.SCORERS), default="mutuals")
+    parser.add_argument("--budget", type=float, default=2.0, help="Per-user time budget in seconds")
+    args = parser.parse_args()
+
+    client = Neo4jClient()
+    try:
+        stats = run(client, full=args.full, workers=args.workers, chunk_size=args.chunk, top=args.top,
+                    scorer=args.scorer, budget=args.budget)
+        print(f"{stats['mode']} run: {stats['users']} users, {stats['recommendations']} recommendations "
+              f"in {stats['seconds']:.1f}s ({stats['users_per_sec']:,.0f} users/sec).")
+    finally:
+        client.close()
+
+if __name__ == "__main__":
+    main()
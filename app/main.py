@@ -1,10 +1,20 @@
 from __future__ import annotations
 import sys
 from getpass import getpass
+from app import cache, changefeed, instrumentation, schema
 from app.neo4j_client import Neo4jClient
 from app.services import auth_service, user_service, graph_service, search_service
+from app.services.leaderboard import Leaderboard
+from app.services.search_index import PrefixIndex
 from app.utils.validators import is_valid_username, is_valid_email, is_strong_password
 
+# UC-11 top list, created at startup and kept fresh by follow/unfollow events
+LEADERBOARD = None
+# UC-10 typeahead index, built on the first search and kept fresh by events
+SEARCH_INDEX = None
+# append-only log of mutations for downstream jobs (APP_CHANGEFEED)
+FEED = None
+
 def pause():
     input("\n[Enter] to continue...")
 
@@ -41,6 +51,28 @@ def edit_profile(client: Neo4jClient, username: str):
     except Exception as e:
         print("Update failed:", e)
 
+def browse_connections(client: Neo4jClient, me: str, page_size: int = 20):
+    print_header("UC-7 View Friends/Connections")
+    which = input("1) Following  2) Followers: ").strip()
+    title, lister = ("Followers", graph_service.list_followers) if which == "2" else ("Following", graph_service.list_following)
+    cursor = None
+    page = 1
+    while True:
+        rows, next_cursor, prev_cursor = lister(client, me, limit=page_size, cursor=cursor)
+        print(f"\n{title} (page {page}):")
+        if not rows:
+            print(" (none)")
+        for row in rows:
+            print(f" - {row['username']} ({row['name']})")
+        options = (["n) next"] if next_cursor else []) + (["p) prev"] if prev_cursor else []) + ["0) back"]
+        choice = input("  ".join(options) + ": ").strip().lower()
+        if choice == "n" and next_cursor:
+            cursor, page = next_cursor, page + 1
+        elif choice == "p" and prev_cursor:
+            cursor, page = prev_cursor, page - 1
+        elif choice in ("0", ""):
+            return
+
 def login_menu(client: Neo4jClient):
     while True:
         print_header("Welcome to Social Graph (Python + Neo4j)")
@@ -83,7 +115,9 @@ def login_menu(client: Neo4jClient):
             if prof:
                 print(f"Login OK. Welcome, {prof['name']}!")
                 pause()
-                home_menu(client, username)
+                # one session for everything the user does until logout
+                with client.unit_of_work():
+                    home_menu(client, username)
             else:
                 print(f"Login failed. {err}")
                 pause()
@@ -104,6 +138,7 @@ def home_menu(client: Neo4jClient, me: str):
         print("9) UC-9 Friend Recommendations")
         print("10) UC-10 Search Users")
         print("11) UC-11 Explore Popular Users")
+        print("12) UC-12 Degrees of Separation")
         print("99) Log out")
         choice = input("Choose: ").strip()
         if choice == "3":
@@ -123,22 +158,16 @@ def home_menu(client: Neo4jClient, me: str):
             print(f"Removed {removed} relationship(s).")
             pause()
         elif choice == "7":
-            print_header("UC-7 View Friends/Connections")
-            print("\nFollowing:")
-            for row in graph_service.list_following(client, me, limit=20):
-                print(f" - {row['username']} ({row['name']})")
-            print("\nFollowers:")
-            for row in graph_service.list_followers(client, me, limit=20):
-                print(f" - {row['username']} ({row['name']})")
-            pause()
+            browse_connections(client, me)
         elif choice == "8":
             print_header("UC-8 Mutual Connections")
             other = input("Other username: ").strip()
-            rows = graph_service.mutual_connections(client, me, other, limit=50)
-            if not rows:
+            total, rows = graph_service.mutual_sample(client, me, other, limit=50)
+            if not total:
                 print("No mutuals.")
             else:
-                for r in rows:
+                print(f"{total} mutual(s){f', showing {len(rows)}' if total > len(rows) else ''}:")
+                for r in sorted(rows, key=lambda r: r["username"]):
                     print(f" - {r['username']} ({r['name']})")
             pause()
         elif choice == "9":
@@ -149,17 +178,32 @@ def home_menu(client: Neo4jClient, me: str):
         elif choice == "10":
             print_header("UC-10 Search Users")
             q = input("Search term: ").strip()
-            for r in search_service.search_users(client, q, limit=20):
-                if "score" in r:
+            for r in search_service.search_users(client, q, limit=20, index=SEARCH_INDEX):
+                if "followerCount" in r:
+                    print(f" - {r['username']} ({r['name']}), followers={r['followerCount']}")
+                elif "score" in r:
                     print(f" - {r['username']} ({r['name']}) score={round(r['score'],2)}")
                 else:
                     print(f" - {r['username']} ({r['name']})")
             pause()
         elif choice == "11":
             print_header("UC-11 Explore Popular Users")
-            for r in search_service.popular_users(client, limit=15):
+            for r in search_service.popular_users(client, limit=15, leaderboard=LEADERBOARD):
                 print(f" - {r['username']} ({r['name']}), followers={r['followerCount']}")
             pause()
+        elif choice == "12":
+            print_header("UC-12 Degrees of Separation")
+            other = input("Other username: ").strip()
+            result = graph_service.degrees_of_separation(client, me, other, k=3)
+            if result.distance is not None:
+                print(f"{other} is {result.distance} hop(s) away:")
+                for path in result.paths:
+                    print(" - " + " -> ".join(u["username"] for u in path))
+            elif result.complete:
+                print("No follow-chain connects you.")
+            else:
+                print("Not connected within the search limits.")
+            pause()
         elif choice == "99":
             break
         else:
@@ -168,8 +212,17 @@ def home_menu(client: Neo4jClient, me: str):
 if __name__ == "__main__":
     client = Neo4jClient()
     try:
-        # Make sure schema exists before first use
-        auth_service.create_schema(client)
+        # one version read when the schema is current; pending migrations otherwise
+        schema.ensure(client)
+        LEADERBOARD = Leaderboard(client, k=15)
+        SEARCH_INDEX = PrefixIndex(client)
+        FEED = changefeed.from_env()
+        client.cache = cache.from_env()
+        client.instrumentation = instrumentation.from_env()
         login_menu(client)
     finally:
+        if client.instrumentation is not None:
+            print(client.instrumentation.report())
+        if FEED is not None:
+            FEED.close()
         client.close()
@@ -0,0 +1,958 @@
+"""
+In-process graph backend: a driver-compatible object that Neo4jClient can
+use instead of `neo4j.Driver` (APP_BACKEND=memory). Load tests, benchmarks
+and offline development then run the real service code with no Neo4j, and
+`replicate()` copies a live database into one as a read replica
+(`from_snapshot()` loads one from a snapshot file).
+
+Users are integer ids with column-stored properties and hash indexes on
+username and email (uniqueness raises ConstraintError like the constraints
+do). FOLLOWS is held as two CSR arrays, out-edges and in-edges, sorted per
+row. Follows and unfollows go into small per-node delta sets, and the CSR is
+rebuilt with NumPy once the deltas grow past a quarter of it. Follower and
+following counts are the CSR degrees, so they are always exact.
+
+There is no Cypher engine. Each statement the app sends (the service, loader,
+job and leaderboard constants plus the schema DDL) is matched against a table
+of handlers, keyed by the statement text with whitespace collapsed. Anything
+else raises NotImplementedError. tests/test_memory_backend.py checks that
+every *_CYPHER constant in app/ has a handler. Every statement applies at
+once under one lock: there are no transactions and no rollback.
+"""
+from __future__ import annotations
+import asyncio, bisect, heapq, math, re, threading, time
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+import numpy as np
+from neo4j.exceptions import ConstraintError
+from neo4j.time import DateTime
+from app import config, schema
+from app.standin import AsyncStandInResult, StandInResult, StandInRow
+from app.data import loader
+from app.data import snapshot
+from app.data.snapshot import NO_UID, Snapshot
+from app.jobs import analytics, recommend as job
+from app.services import (auth_service, graph_service as gs, leaderboard, path_service, recommendation_service as rs,
+                          search_index, search_service, user_service)
+
+Rows = List[Dict[str, Any]]
+
+# DDL is accepted and ignored: the hash indexes always exist
+_SCHEMA = re.compile(r"^\s*(CREATE|DROP)\s+(CONSTRAINT|INDEX|FULLTEXT\s+INDEX|RANGE\s+INDEX)\b", re.I)
+_TOKEN = re.compile(r"\w+")
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+def _native(v: Any) -> Any:
+    # neo4j.time values handed back as parameters
+    return v.to_native() if hasattr(v, "to_native") else v
+
+def _text(v: Optional[datetime]) -> Optional[str]:
+    # what toString(datetime) returns
+    return v.isoformat().replace("+00:00", "Z") if v is not None else None
+
+def _norm(cypher: str) -> str:
+    return " ".join(cypher.split())
+
+class MemoryGraph:
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self.clear()
+        self._handlers: Dict[str, Callable[[Dict[str, Any]], Rows]] = {_norm(k): v for k, v in self._table().items()}
+        self._resolved: Dict[str, Optional[Callable[[Dict[str, Any]], Rows]]] = {}
+
+    def clear(self) -> None:
+        # node columns, indexed by id
+        self.username: List[str] = []
+        self.uid: List[Optional[int]] = []
+        self.name: List[Optional[str]] = []
+        self.email: List[Optional[str]] = []
+        self.bio: List[Optional[str]] = []
+        self.pw_hash: List[Optional[str]] = []
+        self.salt: List[Optional[str]] = []
+        self.created: List[Optional[datetime]] = []
+        self.updated: List[Optional[datetime]] = []
+        self.follows_updated: List[Optional[datetime]] = []
+        # written by app/jobs/analytics.py
+        self.pagerank: List[Optional[float]] = []
+        self.community: List[Optional[int]] = []
+        self.by_username: Dict[str, int] = {}
+        self.by_email: Dict[str, int] = {}
+        self.by_uid: Dict[int, int] = {}
+        # the :Sequence {name: 'uid'} counter
+        self.next_uid = auth_service.REGISTERED_UID_BASE
+        # id -> (computedAt, scorer, top, [(rec id, rank, score, mutuals)])
+        self.recs: Dict[int, Tuple[datetime, str, int, List[Tuple[int, int, float, int]]]] = {}
+        # (label, name) -> properties, for :Leaderboard and :JobState
+        self.singletons: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        # CSR over ids < len(out_off) - 1, plus per-node deltas
+        self.out_off = np.zeros(1, dtype=np.int64)
+        self.out_dst = np.zeros(0, dtype=np.int32)
+        self.in_off = np.zeros(1, dtype=np.int64)
+        self.in_src = np.zeros(0, dtype=np.int32)
+        self.out_add: Dict[int, Set[int]] = {}
+        self.out_del: Dict[int, Set[int]] = {}
+        self.in_add: Dict[int, Set[int]] = {}
+        self.in_del: Dict[int, Set[int]] = {}
+        self.pending = 0
+        # degrees kept up to date on every change; capacity grows by doubling
+        self.out_deg = np.zeros(1024, dtype=np.int64)
+        self.in_deg = np.zeros(1024, dtype=np.int64)
+        self._sorted: Optional[List[str]] = None
+        self._tokens: Optional[Dict[str, Set[int]]] = None
+        self._vocab: Optional[List[str]] = None
+        self._by_pagerank: Optional[List[int]] = None
+
+    def __len__(self) -> int:
+        return len(self.username)
+
+    @property
+    def edges(self) -> int:
+        return len(self.out_dst) + sum(map(len, self.out_add.values())) - sum(map(len, self.out_del.values()))
+
+    # -- dispatch -----------------------------------------------------------------
+
+    def handles(self, cypher: str) -> bool:
+        text = _norm(cypher)
+        return text in self._handlers or bool(_SCHEMA.match(text))
+
+    def execute(self, cypher: str, params: Dict[str, Any]) -> Rows:
+        handler = self._resolved.get(cypher)
+        if handler is None:
+            text = _norm(cypher)
+            handler = self._handlers.get(text)
+            if handler is None and _SCHEMA.match(text):
+                handler = self._noop
+            if handler is None:
+                raise NotImplementedError(f"memory backend has no handler for: {text[:80]}")
+            self._resolved[cypher] = handler
+        with self._lock:
+            rows = handler(params)
+            if self.pending > max(65536, len(self.out_dst) // 4):
+                self.compact()
+            return rows
+
+    def _table(self) -> Dict[str, Callable[[Dict[str, Any]], Rows]]:
+        return {
+            auth_service.REGISTER_CYPHER: self._register,
+            auth_service.LOGIN_CYPHER: self._login,
+            user_service.PROFILE_CYPHER: self._profile,
+            user_service.UPDATE_PROFILE_CYPHER: self._update_profile,
+            gs.FOLLOW_CYPHER: self._follow,
+            gs.UNFOLLOW_CYPHER: self._unfollow,
+            gs.FOLLOW_MANY_CYPHER: self._follow_many,
+            gs.UNFOLLOW_MANY_CYPHER: self._unfollow_many,
+            gs.FOLLOW_MANY_UID_CYPHER: lambda p: self._follow_many(p, by_uid=True),
+            gs.UNFOLLOW_MANY_UID_CYPHER: lambda p: self._unfollow_many(p, by_uid=True),
+            path_service.ENDPOINTS_CYPHER: self._path_endpoints,
+            path_service.FOLLOWING_LEVEL_CYPHER: lambda p: self._level(p, out=True),
+            path_service.FOLLOWERS_LEVEL_CYPHER: lambda p: self._level(p, out=False),
+            path_service.PATH_USERS_CYPHER: lambda p: [{"uid": u, "username": self.username[i], "name": self.name[i]}
+                                                       for u, i in ((u, self.by_uid.get(u)) for u in p["ids"])
+                                                       if i is not None],
+            user_service.UIDS_CYPHER: lambda p: [{"username": u, "uid": self.uid[self.by_username[u]]}
+                                                 for u in p["usernames"] if u in self.by_username],
+            gs.FOLLOWING_AFTER_CYPHER: lambda p: self._page(p, True, True),
+            gs.FOLLOWING_BEFORE_CYPHER: lambda p: self._page(p, True, False),
+            gs.FOLLOWERS_AFTER_CYPHER: lambda p: self._page(p, False, True),
+            gs.FOLLOWERS_BEFORE_CYPHER: lambda p: self._page(p, False, False),
+            gs.FOLLOWING_ALL_CYPHER: self._following_all,
+            gs.MUTUALS_CYPHER: self._mutuals,
+            gs.MUTUALS_COUNT_CYPHER: self._mutuals_count,
+            gs.MUTUALS_SAMPLE_CYPHER: self._mutuals_sample,
+            rs.CANDIDATES_CYPHER: self._candidates,
+            rs.PRECOMPUTED_CYPHER: self._precomputed,
+            rs.STORE_CYPHER: self._store_recs,
+            search_service.SEARCH_FULLTEXT_CYPHER: self._search_fulltext,
+            search_service.SEARCH_CONTAINS_CYPHER: self._search_contains,
+            search_service.POPULAR_CYPHER: self._popular,
+            search_service.POPULAR_PAGERANK_CYPHER: self._popular_pagerank,
+            search_index.INDEX_USERS_CYPHER: lambda p: [
+                {"username": u, "name": self.name[i], "followerCount": self.degree(i, out=False)}
+                for i, u in enumerate(self.username)],
+            analytics.WRITE_CYPHER: self._set_analytics,
+            snapshot.SNAPSHOT_USERS_CYPHER: lambda p: [{"username": u, "uid": uid} for u, uid in zip(self.username, self.uid)],
+            snapshot.SNAPSHOT_FOLLOWS_CYPHER: self._all_follows,
+            leaderboard.LOAD_CYPHER: lambda p: self._load_singleton("Leaderboard", p["name"], "usernames"),
+            leaderboard.SAVE_CYPHER: lambda p: self._save_singleton("Leaderboard", p),
+            loader.USER_CYPHER: self._merge_users,
+            loader.SEED_USER_CYPHER: lambda p: self._merge_users(p, sequence=True),
+            loader.FOLLOWS_CYPHER: self._merge_follows,
+            loader.FOLLOWS_UID_CYPHER: self._merge_follows_uid,
+            loader.PASSWORDLESS_PAGE_CYPHER: self._passwordless_page,
+            loader.SET_PASSWORD_CYPHER: self._set_passwords,
+            loader.REPAIR_COUNTERS_CYPHER: self._noop,
+            loader.CHECK_COUNTERS_CYPHER: lambda p: [{"mismatches": 0, "sample": []}],
+            job.USERS_PAGE_CYPHER: self._users_page,
+            job.CHANGED_USERS_CYPHER: self._changed_users,
+            job.NOW_CYPHER: lambda p: [{"now": DateTime.from_native(_now())}],
+            job.LAST_RUN_CYPHER: lambda p: self._load_singleton("JobState", p["name"], "lastRunAt"),
+            job.SAVE_RUN_CYPHER: lambda p: self._save_singleton("JobState", p),
+            schema.VERSION_CYPHER: lambda p: [{"version": self.singletons.get(("SchemaVersion", "app"), {}).get("version")}],
+            schema.RECORD_CYPHER: self._record_schema,
+            schema.AWAIT_INDEXES_CYPHER: self._noop,
+            schema.INDEXES_CYPHER: self._noop,
+            schema.UID_BACKFILL_CYPHER: self._backfill_uids,
+            loader.EDGE_COUNT_CYPHER: lambda p: [{"edges": self.edges}],
+            "MATCH (n) DETACH DELETE n": lambda p: self.clear() or [],
+        }
+
+    def _noop(self, p: Dict[str, Any]) -> Rows:
+        return []
+
+    # -- nodes --------------------------------------------------------------------
+
+    def _create(self, username: str, name: Any, email: Any, bio: Any, pw_hash: Any = None, salt: Any = None,
+                uid: Optional[int] = None) -> int:
+        if username in self.by_username:
+            raise ConstraintError(f"Node already exists with label `User` and property `username` = '{username}'")
+        if email is not None and email in self.by_email:
+            raise ConstraintError(f"Node already exists with label `User` and property `email` = '{email}'")
+        if uid is not None and uid in self.by_uid:
+            raise ConstraintError(f"Node already exists with label `User` and property `uid` = {uid}")
+        i = len(self.username)
+        now = _now()
+        for col, v in ((self.username, username), (self.uid, uid), (self.name, name), (self.email, email), (self.bio, bio),
+                       (self.pw_hash, pw_hash), (self.salt, salt), (self.created, now), (self.updated, now),
+                       (self.follows_updated, None), (self.pagerank, None), (self.community, None)):
+            col.append(v)
+        if i == len(self.out_deg):
+            self.out_deg = np.concatenate((self.out_deg, np.zeros(i, dtype=np.int64)))
+            self.in_deg = np.concatenate((self.in_deg, np.zeros(i, dtype=np.int64)))
+        self.by_username[username] = i
+        if email is not None:
+            self.by_email[email] = i
+        if uid is not None:
+            self.by_uid[uid] = i
+        self._sorted = None
+        self._index_text(i)
+        return i
+
+    def _user_map(self, i: int) -> Dict[str, Any]:
+        return {"username": self.username[i], "name": self.name[i], "email": self.email[i], "bio": self.bio[i]}
+
+    def _register(self, p: Dict[str, Any]) -> Rows:
+        if p["username"] in self.by_username:
+            self._create(p["username"], None, None, None)  # raises ConstraintError
+        uid = self._next_uid(p["uid_base"])
+        i = self._create(p["username"], p["name"], p["email"], p["bio"], p["pw_hash"], p["salt"], uid)
+        user = dict(self._user_map(i), uid=uid, passwordHash=p["pw_hash"], salt=p["salt"], followerCount=0, followingCount=0,
+                    createdAt=self.created[i], updatedAt=self.updated[i])
+        return [{"user": user}]
+
+    def _login(self, p: Dict[str, Any]) -> Rows:
+        i = self.by_username.get(p["username"])
+        if i is None:
+            return []
+        return [{"passwordHash": self.pw_hash[i], "salt": self.salt[i], "profile": self._user_map(i)}]
+
+    def _profile(self, p: Dict[str, Any]) -> Rows:
+        i = self.by_username.get(p["username"])
+        if i is None:
+            return []
+        return [{"user": dict(self._user_map(i), createdAt=_text(self.created[i]), updatedAt=_text(self.updated[i]))}]
+
+    def _update_profile(self, p: Dict[str, Any]) -> Rows:
+        i = self.by_username.get(p["username"])
+        if i is None:
+            return []
+        email = p.get("email")
+        if email is not None and email != self.email[i] and email in self.by_email:
+            raise ConstraintError(f"Node already exists with label `User` and property `email` = '{email}'")
+        # drop the old words before any field changes
+        self._unindex_text(i)
+        if email is not None and email != self.email[i]:
+            self.by_email.pop(self.email[i], None)
+            self.by_email[email] = i
+            self.email[i] = email
+        if p.get("name") is not None:
+            self.name[i] = p["name"]
+        if p.get("bio") is not None:
+            self.bio[i] = p["bio"]
+        self.updated[i] = _now()
+        self._index_text(i)
+        return [{"user": dict(self._user_map(i), updatedAt=_text(self.updated[i]))}]
+
+    def _next_uid(self, base: int) -> int:
+        self.next_uid = max(self.next_uid, base)
+        self.next_uid += 1
+        return self.next_uid - 1
+
+    def _set_uid(self, i: int, uid: int) -> None:
+        if self.by_uid.get(uid, i) != i:
+            raise ConstraintError(f"Node already exists with label `User` and property `uid` = {uid}")
+        if self.uid[i] is not None:
+            del self.by_uid[self.uid[i]]
+        self.uid[i] = uid
+        self.by_uid[uid] = i
+
+    def _merge_users(self, p: Dict[str, Any], sequence: bool = False) -> Rows:
+        if sequence:
+            first = self._next_uid(p["uid_base"])
+            self.next_uid = first + len(p["rows"])
+        for k, row in enumerate(p["rows"]):
+            i = self.by_username.get(row["username"])
+            if i is None:
+                uid = first + k if sequence else row.get("uid")
+                self._create(row["username"], row.get("name"), row.get("email"), row.get("bio"),
+                             row.get("pw"), row.get("salt"), uid)
+            elif not sequence and row.get("uid") is not None:
+                self._set_uid(i, row["uid"])
+        return []
+
+    def _set_passwords(self, p: Dict[str, Any]) -> Rows:
+        now = _now()
+        for row in p["rows"]:
+            i = self.by_username.get(row["username"])
+            if i is not None:
+                self.pw_hash[i], self.salt[i], self.updated[i] = row["pw"], row["salt"], now
+        return []
+
+    # -- adjacency ----------------------------------------------------------------
+
+    def _base(self, off: np.ndarray, arr: np.ndarray, u: int) -> np.ndarray:
+        if u + 1 >= len(off):
+            return arr[:0]
+        return arr[off[u]:off[u + 1]]
+
+    def _adjacent(self, u: int, out: bool) -> np.ndarray:
+        """Neighbour ids in storage order: CSR row without deletions, then additions."""
+        if out:
+            base, dels, adds = self._base(self.out_off, self.out_dst, u), self.out_del.get(u), self.out_add.get(u)
+        else:
+            base, dels, adds = self._base(self.in_off, self.in_src, u), self.in_del.get(u), self.in_add.get(u)
+        if dels:
+            base = base[~np.isin(base, np.fromiter(dels, dtype=np.int64, count=len(dels)))]
+        if adds:
+            base = np.concatenate((base, np.fromiter(adds, dtype=np.int32, count=len(adds))))
+        return base
+
+    def degree(self, u: int, out: bool = True) -> int:
+        return int((self.out_deg if out else self.in_deg)[u])
+
+    def degrees(self, out: bool = True) -> np.ndarray:
+        return (self.out_deg if out else self.in_deg)[:len(self.username)]
+
+    def has_edge(self, a: int, b: int) -> bool:
+        if b in self.out_add.get(a, ()):
+            return True
+        if b in self.out_del.get(a, ()):
+            return False
+        row = self._base(self.out_off, self.out_dst, a)
+        k = int(np.searchsorted(row, b))
+        return k < len(row) and row[k] == b
+
+    def add_edge(self, a: int, b: int) -> bool:
+        if self.has_edge(a, b):
+            return False
+        if b in self.out_del.get(a, ()):
+            self.out_del[a].discard(b)
+            self.in_del[b].discard(a)
+        else:
+            self.out_add.setdefault(a, set()).add(b)
+            self.in_add.setdefault(b, set()).add(a)
+        self.out_deg[a] += 1
+        self.in_deg[b] += 1
+        self.pending += 1
+        return True
+
+    def remove_edge(self, a: int, b: int) -> bool:
+        if not self.has_edge(a, b):
+            return False
+        if b in self.out_add.get(a, ()):
+            self.out_add[a].discard(b)
+            self.in_add[b].discard(a)
+        else:
+            self.out_del.setdefault(a, set()).add(b)
+            self.in_del.setdefault(b, set()).add(a)
+        self.out_deg[a] -= 1
+        self.in_deg[b] -= 1
+        self.pending += 1
+        return True
+
+    def compact(self) -> None:
+        """Folds the deltas into fresh CSR arrays."""
+        n = len(self.username)
+        nb = len(self.out_off) - 1
+        src = np.repeat(np.arange(nb, dtype=np.int64), np.diff(self.out_off))
+        dst = self.out_dst.astype(np.int64)
+        dels = [(a, b) for a, s in self.out_del.items() for b in s]
+        if dels:
+            gone = np.array(dels, dtype=np.int64)
+            keep = ~np.isin(src * n + dst, gone[:, 0] * n + gone[:, 1])
+            src, dst = src[keep], dst[keep]
+        adds = [(a, b) for a, s in self.out_add.items() for b in s]
+        if adds:
+            extra = np.array(adds, dtype=np.int64)
+            src, dst = np.concatenate((src, extra[:, 0])), np.concatenate((dst, extra[:, 1]))
+        self.out_off, self.out_dst = self._csr(src, dst, n)
+        self.in_off, self.in_src = self._csr(dst, src, n)
+        self.out_add, self.out_del, self.in_add, self.in_del = {}, {}, {}, {}
+        self.pending = 0
+
+    @staticmethod
+    def _csr(rows: np.ndarray, cols: np.ndarray, n: int) -> Tuple[np.ndarray, np.ndarray]:
+        order = np.lexsort((cols, rows))
+        off = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n), out=off[1:])
+        return off, cols[order].astype(np.int32)
+
+    def load_edges(self, src: np.ndarray, dst: np.ndarray) -> None:
+        """Bulk edge load by id (duplicates dropped); replaces all existing FOLLOWS."""
+        n = len(self.username)
+        keys = np.unique(src.astype(np.int64) * n + dst.astype(np.int64))
+        src, dst = keys // n, keys % n
+        with self._lock:
+            self.out_add, self.out_del, self.in_add, self.in_del = {}, {}, {}, {}
+            self.out_off, self.out_dst = self._csr(src, dst, n)
+            self.in_off, self.in_src = self._csr(dst, src, n)
+            self.out_deg[:n] = np.diff(self.out_off)
+            self.in_deg[:n] = np.diff(self.in_off)
+            self.pending = 0
+
+    def _ids(self, p: Dict[str, Any], *keys: str) -> Optional[List[int]]:
+        ids = [self.by_username.get(p[k]) for k in keys]
+        return None if None in ids else ids
+
+    def _follow(self, p: Dict[str, Any]) -> Rows:
+        ids = self._ids(p, "src", "dst")
+        if ids is None:
+            return []
+        a, b = ids
+        created = self.add_edge(a, b)
+        if created:
+            self.follows_updated[a] = _now()
+        return [{"created": created, "name": self.name[b], "followerCount": self.degree(b, out=False)}]
+
+    def _unfollow(self, p: Dict[str, Any]) -> Rows:
+        ids = self._ids(p, "src", "dst")
+        if ids is None or not self.remove_edge(*ids):
+            return []
+        a, b = ids
+        self.follows_updated[a] = _now()
+        return [{"removed": 1, "name": self.name[b], "followerCount": self.degree(b, out=False)}]
+
+    def _pairs(self, p: Dict[str, Any], index: Dict[Any, int]) -> Iterable[Tuple[int, int]]:
+        for row in p["rows"]:
+            a = index.get(row["src"])
+            if a is None:
+                continue
+            for dst in row["dsts"]:
+                b = index.get(dst)
+                if b is not None:
+                    yield a, b
+
+    def _pair_row(self, a: int, b: int, by_uid: bool) -> Dict[str, Any]:
+        row = {"src": self.username[a], "dst": self.username[b], "name": self.name[b],
+               "followerCount": self.degree(b, out=False)}
+        if by_uid:
+            row.update(src=self.uid[a], dst=self.uid[b], srcUsername=self.username[a], dstUsername=self.username[b])
+        return row
+
+    def _follow_many(self, p: Dict[str, Any], by_uid: bool = False) -> Rows:
+        now = _now()
+        out = []
+        for a, b in self._pairs(p, self.by_uid if by_uid else self.by_username):
+            created = self.add_edge(a, b)
+            if created:
+                self.follows_updated[a] = now
+            out.append(dict(self._pair_row(a, b, by_uid), created=created))
+        return out
+
+    def _unfollow_many(self, p: Dict[str, Any], by_uid: bool = False) -> Rows:
+        now = _now()
+        out = []
+        for a, b in self._pairs(p, self.by_uid if by_uid else self.by_username):
+            if self.remove_edge(a, b):
+                self.follows_updated[a] = now
+                out.append(self._pair_row(a, b, by_uid))
+        return out
+
+    def _merge_follows_uid(self, p: Dict[str, Any]) -> Rows:
+        now = _now()
+        by_uid = self.by_uid
+        for src, dst in zip(p["src"], p["dst"]):
+            a, b = by_uid.get(src), by_uid.get(dst)
+            if a is not None and b is not None and self.add_edge(a, b):
+                self.follows_updated[a] = now
+        return []
+
+    def _merge_follows(self, p: Dict[str, Any]) -> Rows:
+        now = _now()
+        for row in p["rows"]:
+            a, b = self.by_username.get(row["src"]), self.by_username.get(row["dst"])
+            if a is not None and b is not None and self.add_edge(a, b):
+                self.follows_updated[a] = now
+        return []
+
+    # -- UC-12 --------------------------------------------------------------------
+
+    def _path_endpoints(self, p: Dict[str, Any]) -> Rows:
+        out = []
+        for u in p["usernames"]:
+            i = self.by_username.get(u)
+            if i is not None and self.uid[i] is not None:
+                out.append({"username": u, "uid": self.uid[i], "following": self.degree(i, out=True),
+                            "followers": self.degree(i, out=False)})
+        return out
+
+    def _level(self, p: Dict[str, Any], out: bool) -> Rows:
+        uid, deg = self.uid, self.out_deg if out else self.in_deg
+        rows = []
+        for parent in p["ids"]:
+            i = self.by_uid.get(parent)
+            if i is None:
+                continue
+            adj = [j for j in self._adjacent(i, out).tolist() if uid[j] is not None]
+            if adj:
+                rows.append({"parent": parent, "next": [uid[j] for j in adj], "degree": deg[adj].tolist()})
+        return rows
+
+    # -- UC-7 / UC-8 --------------------------------------------------------------
+
+    def _rows(self, ids: Iterable[int]) -> Rows:
+        return [{"username": self.username[i], "name": self.name[i]} for i in ids]
+
+    def _page(self, p: Dict[str, Any], out: bool, forward: bool) -> Rows:
+        u = self.by_username.get(p["u"])
+        if u is None:
+            return []
+        names = self.username
+        ids = self._adjacent(u, out).tolist()
+        if forward:
+            key = p.get("after")
+            ids = [i for i in ids if names[i] > key] if key is not None else ids
+            return self._rows(heapq.nsmallest(p["limit"], ids, key=names.__getitem__))
+        key = p["before"]
+        return self._rows(heapq.nlargest(p["limit"], (i for i in ids if names[i] < key), key=names.__getitem__))
+
+    def _following_all(self, p: Dict[str, Any]) -> Rows:
+        u = self.by_username.get(p["u"])
+        return [] if u is None else self._rows(self._adjacent(u, True).tolist())
+
+    def _common(self, p: Dict[str, Any]) -> Optional[np.ndarray]:
+        # mutual followees in the smaller side's storage order
+        ids = self._ids(p, "u1", "u2")
+        if ids is None:
+            return None
+        a, b = ids
+        s, l = (a, b) if self.degree(a) <= self.degree(b) else (b, a)
+        walk = self._adjacent(s, True)
+        return walk[np.isin(walk, self._adjacent(l, True))]
+
+    def _mutuals(self, p: Dict[str, Any]) -> Rows:
+        common = self._common(p)
+        if common is None:
+            return []
+        return self._rows(heapq.nsmallest(p["limit"], common.tolist(), key=self.username.__getitem__))
+
+    def _mutuals_count(self, p: Dict[str, Any]) -> Rows:
+        common = self._common(p)
+        return [] if common is None else [{"total": len(common)}]
+
+    def _mutuals_sample(self, p: Dict[str, Any]) -> Rows:
+        common = self._common(p)
+        if common is None:
+            return []
+        return [{"total": len(common), "sample": self._rows(common[:p["limit"]].tolist())}]
+
+    # -- UC-9 ---------------------------------------------------------------------
+
+    def _candidates(self, p: Dict[str, Any]) -> Rows:
+        me = self.by_username.get(p["u"])
+        if me is None:
+            return []
+        mine = self._adjacent(me, True)
+        recs, weights = [], []
+        for f in mine[:p["max_friends"]].tolist():
+            out = self.degree(f)
+            cap = p["fanout"] if out <= p["supernode_degree"] else p["supernode_sample"]
+            if cap <= 0:
+                continue
+            r = self._adjacent(f, True)[:cap]
+            recs.append(r)
+            weights.append(np.full(len(r), 1.0 / math.log(2.0 + out + self.degree(f, out=False))))
+        if not recs:
+            return []
+        rec, w = np.concatenate(recs), np.concatenate(weights)
+        keep = (rec != me) & ~np.isin(rec, mine)
+        ids, inv = np.unique(rec[keep], return_inverse=True)
+        mutuals = np.bincount(inv, minlength=len(ids))
+        aa = np.bincount(inv, weights=w[keep], minlength=len(ids))
+        names = self.username
+        top = heapq.nsmallest(p["max_candidates"], range(len(ids)),
+                              key=lambda k: (-mutuals[k], -aa[k], names[ids[k]]))
+        mine_n = len(mine)
+        pr, community = self.pagerank, self.community
+        return [{"username": names[ids[k]], "name": self.name[ids[k]], "mutuals": int(mutuals[k]),
+                 "adamicAdar": float(aa[k]), "followers": self.degree(int(ids[k]), out=False), "myFollowing": mine_n,
+                 "pagerank": pr[ids[k]] or 0.0,
+                 "sameCommunity": community[me] is not None and community[ids[k]] == community[me]}
+                for k in top]
+
+    def _precomputed(self, p: Dict[str, Any]) -> Rows:
+        me = self.by_username.get(p["u"])
+        stored = self.recs.get(me) if me is not None else None
+        if stored is None:
+            return []
+        computed_at, scorer, top, recs = stored
+        changed = self.follows_updated[me]
+        if (computed_at < _now() - timedelta(seconds=p["max_age"]) or scorer != p["scorer"] or top < p["limit"]
+                or (changed is not None and changed > computed_at)):
+            return []
+        out = [{"username": self.username[r], "name": self.name[r], "mutuals": m,
+                "followers": self.degree(r, out=False), "score": score}
+               for r, _, score, m in sorted(recs, key=lambda x: x[1]) if not self.has_edge(me, r)]
+        return [{"computedAt": computed_at, "recs": out[:p["limit"]]}]
+
+    def _store_recs(self, p: Dict[str, Any]) -> Rows:
+        for row in p["rows"]:
+            me = self.by_username.get(row["username"])
+            if me is None:
+                continue
+            recs = [(self.by_username[r["username"]], r["rank"], r["score"], r["mutuals"])
+                    for r in row["recs"] if r["username"] in self.by_username]
+            self.recs[me] = (_native(row["computedAt"]), row["scorer"], row["top"], recs)
+        return []
+
+    # -- UC-10 / UC-11 ------------------------------------------------------------
+
+    def _words(self, i: int) -> Set[str]:
+        return {t.lower() for v in (self.username[i], self.name[i], self.email[i]) if v for t in _TOKEN.findall(v)}
+
+    def _index_text(self, i: int) -> None:
+        if self._tokens is None:
+            return
+        for t in self._words(i):
+            if t not in self._tokens:
+                self._tokens[t] = set()
+                self._vocab = None
+            self._tokens[t].add(i)
+
+    def _unindex_text(self, i: int) -> None:
+        if self._tokens is None:
+            return
+        for t in self._words(i):
+            self._tokens.get(t, set()).discard(i)
+
+    def _search_fulltext(self, p: Dict[str, Any]) -> Rows:
+        # built on first use: one set of ids per lower-cased word of username, name and email
+        if self._tokens is None:
+            self._tokens = {}
+            for i in range(len(self.username)):
+                self._index_text(i)
+        if self._vocab is None:
+            self._vocab = sorted(self._tokens)
+        score: Dict[int, float] = {}
+        required = " AND " in p["q"]
+        matched: Optional[Set[int]] = None
+        for term in p["q"].split():
+            if term in ("AND", "OR"):
+                continue
+            # a trailing * is a prefix query; an escaped one is a literal
+            prefix = term.endswith("*") and not term.endswith("\\*")
+            term_hits: Set[int] = set()
+            for word in _TOKEN.findall(term.lower()):
+                if prefix:
+                    k = bisect.bisect_left(self._vocab, word)
+                    hits: Set[int] = set()
+                    while k < len(self._vocab) and self._vocab[k].startswith(word):
+                        hits |= self._tokens[self._vocab[k]]
+                        k += 1
+                else:
+                    hits = self._tokens.get(word, set())
+                term_hits |= hits
+                for i in hits:
+                    score[i] = score.get(i, 0.0) + 1.0
+            matched = term_hits if matched is None else matched & term_hits
+        if required and matched is not None:
+            score = {i: v for i, v in score.items() if i in matched}
+        names = self.username
+        top = heapq.nsmallest(p["limit"], score, key=lambda i: (-score[i], names[i]))
+        return [{"username": names[i], "name": self.name[i], "score": score[i]} for i in top]
+
+    def _search_contains(self, p: Dict[str, Any]) -> Rows:
+        q = p["q"].lower()
+        hits = (i for i in range(len(self.username))
+                if q in self.username[i].lower() or q in (self.name[i] or "").lower())
+        return self._rows(heapq.nsmallest(p["limit"], hits, key=self.username.__getitem__))
+
+    def _popular(self, p: Dict[str, Any]) -> Rows:
+        deg = self.degrees(out=False)
+        limit = min(p["limit"], len(deg))
+        if limit <= 0:
+            return []
+        # everyone tied with the limit-th count is a candidate; ties sort by username
+        kth = np.partition(deg, len(deg) - limit)[len(deg) - limit]
+        cand = np.flatnonzero(deg >= kth).tolist()
+        names = self.username
+        top = heapq.nsmallest(limit, cand, key=lambda i: (-deg[i], names[i]))
+        return [{"username": names[i], "name": self.name[i], "followerCount": int(deg[i])} for i in top]
+
+    def _popular_pagerank(self, p: Dict[str, Any]) -> Rows:
+        if self._by_pagerank is None:
+            pr, names = self.pagerank, self.username
+            self._by_pagerank = sorted((i for i, v in enumerate(pr) if v is not None), key=lambda i: (-pr[i], names[i]))
+        return [{"username": self.username[i], "name": self.name[i], "followerCount": self.degree(i, out=False),
+                 "pagerank": self.pagerank[i]} for i in self._by_pagerank[:p["limit"]]]
+
+    # -- analytics and snapshots --------------------------------------------------
+
+    def _set_analytics(self, p: Dict[str, Any]) -> Rows:
+        for row in p["rows"]:
+            i = self.by_username.get(row["username"])
+            if i is None:
+                continue
+            props = row["props"]
+            if "pagerank" in props:
+                self.pagerank[i] = props["pagerank"]
+            if "community" in props:
+                self.community[i] = props["community"]
+        self._by_pagerank = None
+        return []
+
+    def _all_follows(self, p: Dict[str, Any]) -> Rows:
+        names = self.username
+        return [{"src": names[a], "dst": names[b]} for a in range(len(names)) for b in self._adjacent(a, True).tolist()]
+
+    # -- job and leaderboard state ------------------------------------------------
+
+    def _users_page(self, p: Dict[str, Any]) -> Rows:
+        if self._sorted is None:
+            self._sorted = sorted(self.username)
+        k = bisect.bisect_right(self._sorted, p["after"])
+        return [{"username": u} for u in self._sorted[k:k + p["limit"]]]
+
+    def _passwordless_page(self, p: Dict[str, Any]) -> Rows:
+        if self._sorted is None:
+            self._sorted = sorted(self.username)
+        k = bisect.bisect_right(self._sorted, p["after"])
+        out: List[Dict[str, Any]] = []
+        for u in islice(self._sorted, k, None):
+            if len(out) >= p["limit"]:
+                break
+            if self.pw_hash[self.by_username[u]] is None:
+                out.append({"username": u})
+        return out
+
+    def _changed_users(self, p: Dict[str, Any]) -> Rows:
+        since = _native(p["since"])
+        out: Set[int] = set()
+        for c, t in enumerate(self.follows_updated):
+            if t is not None and t >= since:
+                out.add(c)
+                out.update(self._adjacent(c, False).tolist())
+        return [{"username": self.username[i]} for i in out]
+
+    def _load_singleton(self, label: str, name: str, key: str) -> Rows:
+        props = self.singletons.get((label, name))
+        if props is None:
+            return []
+        return [dict(props)] if key in props else []
+
+    def _save_singleton(self, label: str, p: Dict[str, Any]) -> Rows:
+        self.singletons.setdefault((label, p["name"]), {}).update(
+            {("lastRunAt" if k == "startedAt" else k): v for k, v in p.items() if k != "name"})
+        return []
+
+    def _record_schema(self, p: Dict[str, Any]) -> Rows:
+        props = self.singletons.setdefault(("SchemaVersion", "app"), {})
+        if props.get("version", 0) <= p["version"]:
+            props.update(version=p["version"], migration=p["name"], updatedAt=_now())
+        return []
+
+    def _backfill_uids(self, p: Dict[str, Any]) -> Rows:
+        if self._sorted is None:
+            self._sorted = sorted(self.username)
+        k = bisect.bisect_right(self._sorted, p["after"])
+        page = self._sorted[k:k + p["limit"]]
+        assigned = 0
+        for u in page:
+            i = self.by_username[u]
+            uid = auth_service.source_uid(u)
+            if uid is None and self.uid[i] is None:
+                uid = self._next_uid(p["uid_base"])
+            if uid is not None and uid != self.uid[i]:
+                self._set_uid(i, uid)
+                assigned += 1
+        return [{"seen": len(page), "assigned": assigned, "last": page[-1] if page else None}]
+
+def replicate(client: Any, graph: Optional[MemoryGraph] = None, fetch_size: int = 10_000) -> MemoryGraph:
+    """
+    Copies every User and FOLLOWS relationship from a live database (streamed with
+    read_iter) into a MemoryGraph, to serve reads from the process.
+    """
+    graph = graph or MemoryGraph()
+    with graph._lock:
+        graph.clear()
+        for r in client.read_iter(REPLICA_USERS_CYPHER, fetch_size=fetch_size):
+            graph._create(r["username"], r["name"], r["email"], r["bio"], r["passwordHash"], r["salt"], r["uid"])
+            if r["uid"] is not None and r["uid"] >= graph.next_uid:
+                graph.next_uid = r["uid"] + 1
+        src: List[int] = []
+        dst: List[int] = []
+        ids = graph.by_username
+        for r in client.read_iter(REPLICA_FOLLOWS_CYPHER, fetch_size=fetch_size):
+            src.append(ids[r["src"]])
+            dst.append(ids[r["dst"]])
+        graph.load_edges(np.array(src, dtype=np.int64), np.array(dst, dtype=np.int64))
+    return graph
+
+def from_snapshot(snapshot: Snapshot, graph: Optional[MemoryGraph] = None) -> MemoryGraph:
+    """
+    Loads a graph snapshot (app/data/snapshot.py) into a MemoryGraph. Users get
+    their username as name, their stored uid and no other properties; users
+    without one (and every user of a version 1 file) draw one from the
+    registration sequence, so UC-12 reaches them. The CSR arrays are used as
+    they are, so edges stay memory-mapped until the first compaction.
+    """
+    graph = graph or MemoryGraph()
+    with graph._lock:
+        graph.clear()
+        uids = snapshot.uid.tolist() if snapshot.uid is not None else [NO_UID] * len(snapshot)
+        for username, uid in zip(snapshot.usernames(), uids):
+            if uid == NO_UID:
+                uid = graph._next_uid(auth_service.REGISTERED_UID_BASE)
+            graph._create(username, username, None, None, uid=uid)
+        graph.out_off, graph.out_dst = snapshot.out_off, snapshot.out_dst
+        graph.in_off, graph.in_src = snapshot.in_off, snapshot.in_src
+        n = len(snapshot)
+        graph.out_deg[:n] = np.diff(graph.out_off)
+        graph.in_deg[:n] = np.diff(graph.in_off)
+    return graph
+
+REPLICA_USERS_CYPHER = """
+MATCH (u:User)
+RETURN u.username AS username, u.uid AS uid, u.name AS name, u.email AS email, u.bio AS bio,
+       u.passwordHash AS passwordHash, u.salt AS salt
+"""
+
+REPLICA_FOLLOWS_CYPHER = """
+MATCH (a:User)-[:FOLLOWS]->(b:User)
+RETURN a.username AS src, b.username AS dst
+"""
+
+# -- driver surface ---------------------------------------------------------------
+
+class MemoryTransaction:
+    def __init__(self, graph: MemoryGraph) -> None:
+        self.graph = graph
+
+    def run(self, cypher: str, parameters: Optional[Dict[str, Any]] = None, **kwargs: Any) -> StandInResult:
+        t0 = time.perf_counter()
+        rows = self.graph.execute(cypher, {**(parameters or {}), **kwargs})
+        return StandInResult(map(StandInRow, rows), int((time.perf_counter() - t0) * 1000))
+
+    def __enter__(self) -> "MemoryTransaction":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        return None
+
+    def commit(self) -> None:
+        return None
+
+    def rollback(self) -> None:
+        return None
+
+class MemorySession:
+    def __init__(self, graph: MemoryGraph) -> None:
+        self.graph = graph
+
+    def __enter__(self) -> "MemorySession":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        return None
+
+    def run(self, cypher: str, parameters: Optional[Dict[str, Any]] = None, **kwargs: Any) -> StandInResult:
+        return MemoryTransaction(self.graph).run(cypher, parameters, **kwargs)
+
+    def begin_transaction(self, timeout: Optional[float] = None, **kwargs: Any) -> MemoryTransaction:
+        return MemoryTransaction(self.graph)
+
+    def execute_read(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        return fn(MemoryTransaction(self.graph), *args, **kwargs)
+
+    execute_write = execute_read
+
+    def close(self) -> None:
+        return None
+
+class MemoryDriver:
+    """Stands in for `neo4j.Driver`; every session works on the same MemoryGraph."""
+    # jobs that fan out to worker processes must stay in this one
+    in_process = True
+    _shared: Optional[MemoryGraph] = None
+
+    def __init__(self, graph: Optional[MemoryGraph] = None) -> None:
+        self.graph = graph if graph is not None else MemoryGraph()
+
+    @classmethod
+    def shared(cls) -> "MemoryDriver":
+        """A driver on the process-wide graph used by APP_BACKEND=memory (preloaded from APP_SNAPSHOT if set)."""
+        if MemoryDriver._shared is None:
+            path = config.env_path("APP_SNAPSHOT")
+            MemoryDriver._shared = from_snapshot(Snapshot(path)) if path else MemoryGraph()
+        return cls(MemoryDriver._shared)
+
+    def session(self, database: Optional[str] = None, **config: Any) -> MemorySession:
+        return MemorySession(self.graph)
+
+    def close(self) -> None:
+        return None
+
+# -- asyncio flavour, for AsyncNeo4jClient --------------------------------------
+
+class AsyncMemoryTransaction(MemoryTransaction):
+    async def run(self, cypher: str, parameters: Optional[Dict[str, Any]] = None, **kwargs: Any) -> AsyncStandInResult:
+        # statements are CPU-only and short; yield once so gathered reads interleave
+        await asyncio.sleep(0)
+        t0 = time.perf_counter()
+        rows = self.graph.execute(cypher, {**(parameters or {}), **kwargs})
+        return AsyncStandInResult(map(StandInRow, rows), int((time.perf_counter() - t0) * 1000))
+
+    async def __aenter__(self) -> "AsyncMemoryTransaction":
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        return None
+
+    async def commit(self) -> None:
+        return None
+
+    async def rollback(self) -> None:
+        return None
+
+class AsyncMemorySession:
+    def __init__(self, graph: MemoryGraph) -> None:
+        self.graph = graph
+
+    async def __aenter__(self) -> "AsyncMemorySession":
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        return None
+
+    async def run(self, cypher: str, parameters: Optional[Dict[str, Any]] = None, **kwargs: Any) -> AsyncStandInResult:
+        return await AsyncMemoryTransaction(self.graph).run(cypher, parameters, **kwargs)
+
+    async def begin_transaction(self, timeout: Optional[float] = None, **kwargs: Any) -> AsyncMemoryTransaction:
+        return AsyncMemoryTransaction(self.graph)
+
+    async def execute_read(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        return await fn(AsyncMemoryTransaction(self.graph), *args, **kwargs)
+
+    execute_write = execute_read
+
+    async def close(self) -> None:
+        return None
+
+class AsyncMemoryDriver(MemoryDriver):
+    def session(self, database: Optional[str] = None, **config: Any) -> AsyncMemorySession:
+        return AsyncMemorySession(self.graph)
+
+    async def close(self) -> None:
+        return None
@@ -1,48 +1,298 @@
 from __future__ import annotations
-import os
-from typing import Iterable, List, Dict, Any, Optional
-from neo4j import GraphDatabase, basic_auth
-from dotenv import load_dotenv
+import threading, time
+from contextlib import contextmanager
+from itertools import islice
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Dict, Any, Optional
+from neo4j import AsyncGraphDatabase, GraphDatabase, READ_ACCESS, basic_auth
+from neo4j.exceptions import Neo4jError
+from app import config
+from app.bulk import AsyncBatchWriter, Pack, ParallelBatchWriter, PartitionKey, pack_rows
+from app.instrumentation import caller_tag
 
-load_dotenv()
+if TYPE_CHECKING:
+    from app.cache import ReadCache
+    from app.instrumentation import Instrumentation
 
-NEO4J_URI = os.getenv("NEO4J_URI", "bolt://localhost:7687")
-NEO4J_USER = os.getenv("NEO4J_USER", "neo4j")
-NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD", "neo4j")
-DB_DATABASE = os.getenv("DB_DATABASE", "neo4j")
+# Settings are read when a client is created (app/config.py), not at import:
+# NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD, DB_DATABASE, the pool settings below,
+# and APP_BACKEND: "neo4j" (default) or "memory", the in-process graph of
+# app/memory.py, shared by every client in the process.
+
+def is_timeout(e: Neo4jError) -> bool:
+    # a statement stopped by the `timeout=` of read/write (sync and async)
+    return "TransactionTimedOut" in (e.code or "")
+
+def _pool_config(pool_size: Optional[int], connection_lifetime: Optional[float],
+                 acquisition_timeout: Optional[float]) -> Dict[str, Any]:
+    # driver defaults: 100 connections, 1 h lifetime, 60 s acquisition timeout
+    return {
+        "max_connection_pool_size": pool_size if pool_size is not None else config.env_int("NEO4J_POOL_SIZE", 100),
+        "max_connection_lifetime": connection_lifetime if connection_lifetime is not None
+        else config.env_float("NEO4J_CONNECTION_LIFETIME", 3600),
+        "connection_acquisition_timeout": acquisition_timeout if acquisition_timeout is not None
+        else config.env_float("NEO4J_ACQUISITION_TIMEOUT", 60),
+    }
+
+def connection_settings(uri: Optional[str] = None, user: Optional[str] = None, password: Optional[str] = None,
+                        database: Optional[str] = None, backend: Optional[str] = None) -> Dict[str, Any]:
+    # arguments left as None come from the environment
+    return {
+        "uri": uri or config.env("NEO4J_URI", "bolt://localhost:7687"),
+        "user": user or config.env("NEO4J_USER", "neo4j"),
+        "password": password or config.env("NEO4J_PASSWORD", "neo4j"),
+        "database": database or config.env("DB_DATABASE", "neo4j"),
+        "backend": backend or config.env("APP_BACKEND", "neo4j"),
+    }
+
+def _driver(factory: Any, settings: Dict[str, Any], pool_size: Optional[int], connection_lifetime: Optional[float],
+            acquisition_timeout: Optional[float]) -> Any:
+    if settings["backend"] == "memory":
+        from app.memory import AsyncMemoryDriver, MemoryDriver
+        return (MemoryDriver if factory is GraphDatabase else AsyncMemoryDriver).shared()
+    return factory.driver(settings["uri"], auth=basic_auth(settings["user"], settings["password"]),
+                          **_pool_config(pool_size, connection_lifetime, acquisition_timeout))
+
+def _pool_stats(driver: Any) -> Dict[str, Any]:
+    # The driver has no public pool API, so this reads private attributes
+    # (driver._pool.connections, .pool_config, connection.in_use) as laid out
+    # in neo4j 6.4, the version it was checked against. Any other layout gives {}.
+    try:
+        pool = getattr(driver, "_pool", None)
+        connections = getattr(pool, "connections", None)
+        if connections is None:
+            return {}
+        out: Dict[str, Any] = {"max_size": getattr(getattr(pool, "pool_config", None), "max_connection_pool_size", None)}
+        for address, conns in list(connections.items()):
+            in_use = sum(1 for c in list(conns) if getattr(c, "in_use", False))
+            out[str(address)] = {"in_use": in_use, "idle": len(conns) - in_use}
+        return out
+    except Exception:
+        return {}
 
 class Neo4jClient:
     """
     Thin wrapper around the official neo4j Driver.
+
+    Every call borrows a session from the pool unless it runs inside
+    `unit_of_work()`, which pins one session to the current thread for all
+    calls made in the block.
     """
-    def __init__(self, uri: str = NEO4J_URI, user: str = NEO4J_USER, password: str = NEO4J_PASSWORD, database: str = DB_DATABASE) -> None:
-        self.driver = GraphDatabase.driver(uri, auth=basic_auth(user, password))
-        self.database = database
+    def __init__(self, uri: Optional[str] = None, user: Optional[str] = None, password: Optional[str] = None,
+                 database: Optional[str] = None, driver: Any = None, pool_size: Optional[int] = None,
+                 connection_lifetime: Optional[float] = None, acquisition_timeout: Optional[float] = None,
+                 backend: Optional[str] = None) -> None:
+        # `driver` lets benchmarks plug in a stand-in (see app/standin.py) or an app/memory.py graph;
+        # arguments left as None come from the environment. `settings` holds the resolved values
+        # (Neo4jClient(**client.settings) reaches the same database, e.g. from a worker process).
+        self.settings = connection_settings(uri, user, password, database, backend)
+        self.driver = driver if driver is not None else _driver(
+            GraphDatabase, self.settings, pool_size, connection_lifetime, acquisition_timeout)
+        self.database = self.settings["database"]
+        # optional read-through cache (app/cache.py), used by reads that pass cache_tags
+        self.cache: Optional[ReadCache] = None
+        # optional per-query timing / slow log (app/instrumentation.py); None costs nothing
+        self.instrumentation: Optional[Instrumentation] = None
+        self._local = threading.local()
+        self._counts = {"sessions": 0, "queries": 0, "reused": 0, "units_of_work": 0, "streamed_rows": 0}
+        self._counts_lock = threading.Lock()
 
     def close(self) -> None:
         self.driver.close()
 
-    def read(self, cypher: str, params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    def _count(self, name: str, n: int = 1) -> None:
+        with self._counts_lock:
+            self._counts[name] += n
+
+    def metrics(self) -> Dict[str, Any]:
+        """Session/query counters of this client plus a best-effort pool snapshot."""
+        with self._counts_lock:
+            out: Dict[str, Any] = dict(self._counts)
+        out["pool"] = _pool_stats(self.driver)
+        return out
+
+    @contextmanager
+    def unit_of_work(self) -> Iterator[Neo4jClient]:
+        """
+        Runs every read/write/run issued by this thread inside the block on one
+        session: no per-query pool checkout, and later reads see earlier writes
+        (the session chains bookmarks). Nested blocks share the outer session.
+
+            with client.unit_of_work():
+                auth_service.login_user(client, ...)
+                user_service.get_profile(client, ...)
+        """
+        if getattr(self._local, "session", None) is not None:
+            yield self
+            return
+        self._count("units_of_work")
+        self._count("sessions")
         with self.driver.session(database=self.database) as session:
-            result = session.execute_read(lambda tx: list(tx.run(cypher, **(params or {}))))
-        return [r.data() for r in result]
+            self._local.session = session
+            try:
+                yield self
+            finally:
+                self._local.session = None
+
+    @contextmanager
+    def _session(self, **config: Any) -> Iterator[Any]:
+        self._count("queries")
+        bound = getattr(self._local, "session", None)
+        if bound is not None:
+            self._count("reused")
+            yield bound
+            return
+        self._count("sessions")
+        with self.driver.session(database=self.database, **config) as session:
+            yield session
+
+    def _fetch(self, runner: Any, cypher: str, params: Optional[Dict[str, Any]], tag: Optional[str],
+               profile: bool = False) -> List[Dict[str, Any]]:
+        # runner: a transaction or session; tag: the calling service function, taken before entering the driver
+        if self.instrumentation is None:
+            return runner.run(cypher, params or {}).data()
+        return self.instrumentation.observe(runner, cypher, params or {}, tag, profile=profile)
+
+    def read(self, cypher: str, params: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None,
+             cache_tags: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """
+        With `timeout` (seconds) the query runs in one explicit transaction that the
+        server aborts after that long; it is not retried, so the budget is a hard bound.
+        With `cache_tags` and a cache attached, results are served from the cache and
+        dropped when a writer invalidates one of the tags.
+        """
+        if cache_tags is not None and self.cache is not None:
+            return self.cache.read(lambda: self.read(cypher, params, timeout), cypher, params or {}, cache_tags)
+        tag = self.instrumentation and caller_tag()
+        if timeout is not None:
+            with self._session(default_access_mode=READ_ACCESS) as session:
+                with session.begin_transaction(timeout=timeout) as tx:
+                    return self._fetch(tx, cypher, params, tag, profile=True)
+        with self._session() as session:
+            return session.execute_read(lambda tx: self._fetch(tx, cypher, params, tag, profile=True))
+
+    def read_iter(self, cypher: str, params: Optional[Dict[str, Any]] = None, fetch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """
+        Streams a large result: records are pulled from the server `fetch_size` at a
+        time and yielded one by one, so memory stays flat. Always uses its own session
+        (a session runs one transaction at a time); close the generator to stop early.
+        """
+        self._count("queries")
+        self._count("sessions")
+        ins = self.instrumentation
+        tag = ins and caller_tag()
+        with self.driver.session(database=self.database, default_access_mode=READ_ACCESS, fetch_size=fetch_size) as session:
+            with session.begin_transaction() as tx:
+                n = 0
+                t0 = time.perf_counter()
+                result = tx.run(cypher, params or {})
+                try:
+                    for record in result:
+                        n += 1
+                        yield record.data()
+                finally:
+                    self._count("streamed_rows", n)
+                    if ins is not None:
+                        ins.record(tag, cypher, params or {}, (time.perf_counter() - t0) * 1000, result.consume(), n)
 
     def write(self, cypher: str, params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
-        with self.driver.session(database=self.database) as session:
-            result = session.execute_write(lambda tx: list(tx.run(cypher, **(params or {}))))
-        return [r.data() for r in result]
+        tag = self.instrumentation and caller_tag()
+        with self._session() as session:
+            return session.execute_write(lambda tx: self._fetch(tx, cypher, params, tag))
+
+    def run(self, cypher: str, params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Auto-commit query, required for `CALL { ... } IN TRANSACTIONS`.
+        """
+        tag = self.instrumentation and caller_tag()
+        with self._session() as session:
+            return self._fetch(session, cypher, params, tag)
 
-    def write_many(self, cypher: str, rows: Iterable[Dict[str, Any]], batch_size: int = 1000) -> int:
+    def write_many(self, cypher: str, rows: Iterable[Dict[str, Any]], batch_size: int = 1000,
+                   workers: int = 1, partition_key: Optional[PartitionKey] = None, pack: Pack = pack_rows) -> int:
         """
         Execute UNWIND-based batched writes. Returns total rows processed.
+        `rows` is consumed lazily, so only one batch is held in memory at a time.
+
+        With workers > 1 batches are written concurrently by a ParallelBatchWriter;
+        pass `partition_key` (row -> (src, dst)) for relationship writes so that
+        concurrent batches never touch the same nodes. `pack` turns a batch into
+        the statement parameters (default `{"rows": batch}`), e.g. parallel
+        integer lists instead of a list of maps.
         """
-        rows = list(rows)
+        if workers > 1:
+            writer = ParallelBatchWriter(self.driver, self.database, workers=workers, instrumentation=self.instrumentation)
+            return writer.run(cypher, rows, batch_size=batch_size, partition_key=partition_key, pack=pack)
+        it = iter(rows)
         total = 0
-        with self.driver.session(database=self.database) as session:
-            for i in range(0, len(rows), batch_size):
-                chunk = rows[i:i+batch_size]
-                def _run(tx):
-                    tx.run(cypher, rows=chunk).consume()
-                session.execute_write(_run)
+        tag = self.instrumentation and caller_tag()
+        with self._session() as session:
+            while True:
+                chunk = list(islice(it, batch_size))
+                if not chunk:
+                    break
+                params = pack(chunk)
+                session.execute_write(lambda tx: self._fetch(tx, cypher, params, tag))
                 total += len(chunk)
         return total
+
+class AsyncNeo4jClient:
+    """
+    Neo4jClient on the asyncio driver: same read / write / run / write_many
+    surface, every method a coroutine, so independent queries can be awaited
+    together (see app/services/aio.py).
+    """
+    def __init__(self, uri: Optional[str] = None, user: Optional[str] = None, password: Optional[str] = None,
+                 database: Optional[str] = None, driver: Any = None, pool_size: Optional[int] = None,
+                 connection_lifetime: Optional[float] = None, acquisition_timeout: Optional[float] = None,
+                 backend: Optional[str] = None) -> None:
+        self.settings = connection_settings(uri, user, password, database, backend)
+        self.driver = driver if driver is not None else _driver(
+            AsyncGraphDatabase, self.settings, pool_size, connection_lifetime, acquisition_timeout)
+        self.database = self.settings["database"]
+        self.cache: Optional[ReadCache] = None
+        self.instrumentation: Optional[Instrumentation] = None
+
+    async def close(self) -> None:
+        await self.driver.close()
+
+    def metrics(self) -> Dict[str, Any]:
+        return {"pool": _pool_stats(self.driver)}
+
+    async def _fetch(self, runner: Any, cypher: str, params: Optional[Dict[str, Any]], tag: Optional[str],
+                     profile: bool = False) -> List[Dict[str, Any]]:
+        if self.instrumentation is None:
+            result = await runner.run(cypher, params or {})
+            return await result.data()
+        return await self.instrumentation.aobserve(runner, cypher, params or {}, tag, profile=profile)
+
+    async def read(self, cypher: str, params: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None,
+                   cache_tags: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        tag = self.instrumentation and caller_tag()
+        if cache_tags is not None and self.cache is not None:
+            return await self.cache.aread(lambda: self._read(cypher, params, timeout, tag), cypher, params or {}, cache_tags)
+        return await self._read(cypher, params, timeout, tag)
+
+    async def _read(self, cypher: str, params: Optional[Dict[str, Any]], timeout: Optional[float],
+                    tag: Optional[str]) -> List[Dict[str, Any]]:
+        if timeout is not None:
+            async with self.driver.session(database=self.database, default_access_mode=READ_ACCESS) as session:
+                async with await session.begin_transaction(timeout=timeout) as tx:
+                    return await self._fetch(tx, cypher, params, tag, profile=True)
+        async with self.driver.session(database=self.database) as session:
+            return await session.execute_read(lambda tx: self._fetch(tx, cypher, params, tag, profile=True))
+
+    async def write(self, cypher: str, params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        tag = self.instrumentation and caller_tag()
+        async with self.driver.session(database=self.database) as session:
+            return await session.execute_write(lambda tx: self._fetch(tx, cypher, params, tag))
+
+    async def run(self, cypher: str, params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        tag = self.instrumentation and caller_tag()
+        async with self.driver.session(database=self.database) as session:
+            return await self._fetch(session, cypher, params, tag)
+
+    async def write_many(self, cypher: str, rows: Iterable[Dict[str, Any]], batch_size: int = 1000,
+                         workers: int = 1, partition_key: Optional[PartitionKey] = None, pack: Pack = pack_rows) -> int:
+        """See Neo4jClient.write_many; workers > 1 keeps that many batches in flight."""
+        writer = AsyncBatchWriter(self.driver, self.database, workers=workers, instrumentation=self.instrumentation)
+        return await writer.run(cypher, rows, batch_size=batch_size, partition_key=partition_key, pack=pack)
@@ -0,0 +1,239 @@
+"""
+Versioned schema migrations: the one place constraints, indexes and schema
+data fixes are defined.
+
+MIGRATIONS is an append-only list of numbered steps. Every step is
+idempotent (IF NOT EXISTS DDL, or a batched data fix that skips rows already
+done), so running it twice or from two processes at once is harmless. The
+database records the highest applied number on one
+(:SchemaVersion {name: 'app'}) node.
+
+ensure() reads that node with a single query. When the database is up to
+date, which is the common case, that read is the only schema work at
+startup (plus one index wait for callers that pass `wait`). Otherwise the
+missing steps run in order and the version is recorded after each one:
+
+    python -m app.schema status     # applied version and index states
+    python -m app.schema migrate    # apply pending steps, wait for indexes
+    python -m app.schema wait       # block until every index is online
+
+Add a step by appending a Migration with the next number. Never edit or
+renumber a step that has shipped.
+"""
+from __future__ import annotations
+import argparse, time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+from app.neo4j_client import Neo4jClient
+from app.services.auth_service import REGISTERED_UID_BASE, SYNTHETIC_UID_BASE
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    statements: Tuple[str, ...] = ()
+    # data steps: called with the client after the statements
+    run: Optional[Callable[[Neo4jClient], Any]] = None
+
+VERSION_CYPHER = """
+OPTIONAL MATCH (s:SchemaVersion {name: 'app'})
+RETURN s.version AS version
+"""
+
+# never moves backwards if an older process records a step late
+RECORD_CYPHER = """
+MERGE (s:SchemaVersion {name: 'app'})
+SET s.version = CASE WHEN coalesce(s.version, 0) < $version THEN $version ELSE s.version END,
+    s.migration = CASE WHEN coalesce(s.version, 0) <= $version THEN $name ELSE s.migration END,
+    s.updatedAt = datetime()
+"""
+
+AWAIT_INDEXES_CYPHER = "CALL db.awaitIndexes($timeout)"
+
+INDEXES_CYPHER = """
+SHOW INDEXES YIELD name, type, state, populationPercent
+RETURN name, type, state, populationPercent
+ORDER BY name
+"""
+
+# Imported users (u<id>, s<i>) get the uid their source assigns
+# (auth_service.source_uid), the one FOLLOWS_UID_CYPHER will look them up by,
+# and are re-keyed when they hold another. Every other user without a uid
+# gets one from the registration sequence. A username-ordered page at a time
+# (the unique index serves the ordering); s<i> pages come before u<id> ones,
+# so a synthetic user still on an old low uid has moved before its Pokec
+# namesake claims it.
+UID_BACKFILL_CYPHER = """
+MATCH (u:User) WHERE u.username > $after
+WITH u ORDER BY u.username LIMIT $limit
+WITH u, CASE WHEN u.username =~ 'u[1-9][0-9]{0,8}' THEN toInteger(substring(u.username, 1))
+             WHEN u.username =~ 's[1-9][0-9]{0,8}' THEN $synthetic_base + toInteger(substring(u.username, 1))
+        END AS source
+WITH collect(u) AS page,
+     collect(CASE WHEN source IS NULL AND u.uid IS NULL THEN u END) AS todo,
+     collect(CASE WHEN source IS NOT NULL AND (u.uid IS NULL OR u.uid <> source) THEN {user: u, uid: source} END) AS keyed
+CALL {
+  WITH keyed
+  UNWIND keyed AS k
+  WITH k.user AS u, k.uid AS uid
+  SET u.uid = uid
+}
+MERGE (seq:Sequence {name: 'uid'})
+SET seq.next = coalesce(seq.next, $uid_base) + size(todo)
+WITH page, todo, keyed, seq.next - size(todo) AS first
+CALL {
+  WITH todo, first
+  UNWIND range(0, size(todo) - 1) AS i
+  WITH todo[i] AS u, first + i AS uid
+  SET u.uid = uid
+}
+RETURN size(page) AS seen, size(todo) + size(keyed) AS assigned, page[-1].username AS last
+"""
+
+def backfill_uids(client: Neo4jClient, batch_size: int = 10_000) -> int:
+    """
+    Gives every User the uid its source assigns, or one from the sequence if it
+    has none. Returns how many were assigned.
+    """
+    after, assigned = "", 0
+    params = {"uid_base": REGISTERED_UID_BASE, "synthetic_base": SYNTHETIC_UID_BASE}
+    while True:
+        rows = client.write(UID_BACKFILL_CYPHER, {"after": after, "limit": batch_size, **params})
+        if not rows or rows[0]["last"] is None:
+            return assigned
+        assigned += rows[0]["assigned"]
+        if rows[0]["seen"] < batch_size:
+            return assigned
+        after = rows[0]["last"]
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "user keys", (
+        """
+        CREATE CONSTRAINT user_username_unique IF NOT EXISTS
+        FOR (u:User) REQUIRE u.username IS UNIQUE
+        """,
+        """
+        CREATE CONSTRAINT user_email_unique IF NOT EXISTS
+        FOR (u:User) REQUIRE u.email IS UNIQUE
+        """,
+        """
+        CREATE CONSTRAINT schema_version_name_unique IF NOT EXISTS
+        FOR (s:SchemaVersion) REQUIRE s.name IS UNIQUE
+        """,
+    )),
+    # UC-10 search
+    Migration(2, "user fulltext", (
+        """
+        CREATE FULLTEXT INDEX user_fulltext IF NOT EXISTS
+        FOR (u:User) ON EACH [u.username, u.name, u.email]
+        """,
+    )),
+    # UC-11 reads users ordered by the maintained follower counter
+    Migration(3, "follower count index", (
+        """
+        CREATE INDEX user_follower_count IF NOT EXISTS
+        FOR (u:User) ON (u.followerCount)
+        """,
+    )),
+    # incremental UC-9 precompute finds users whose follows changed since the last run
+    Migration(4, "follows updated index", (
+        """
+        CREATE INDEX user_follows_updated IF NOT EXISTS
+        FOR (u:User) ON (u.followsUpdatedAt)
+        """,
+    )),
+    # UC-11 ranked by PageRank (app/jobs/analytics.py)
+    Migration(5, "pagerank index", (
+        """
+        CREATE INDEX user_pagerank IF NOT EXISTS
+        FOR (u:User) ON (u.pagerank)
+        """,
+    )),
+    # integer key for edge loading and UC-12 (loader.FOLLOWS_UID_CYPHER)
+    Migration(6, "uid key", (
+        """
+        CREATE CONSTRAINT user_uid_unique IF NOT EXISTS
+        FOR (u:User) REQUIRE u.uid IS UNIQUE
+        """,
+        """
+        CREATE CONSTRAINT sequence_name_unique IF NOT EXISTS
+        FOR (s:Sequence) REQUIRE s.name IS UNIQUE
+        """,
+    )),
+    Migration(7, "backfill uids", run=backfill_uids),
+    # step 7 used to draw sequence uids for imported users too, and synthetic
+    # users used to be loaded with uid i; both left FOLLOWS_UID_CYPHER
+    # matching nothing. Re-running the backfill moves them to their source uid.
+    Migration(8, "re-key imported users", run=backfill_uids),
+]
+
+LATEST = MIGRATIONS[-1].version
+
+def current_version(client: Neo4jClient) -> int:
+    rows = client.read(VERSION_CYPHER)
+    return (rows[0]["version"] if rows else None) or 0
+
+def pending(version: int) -> List[Migration]:
+    return [m for m in MIGRATIONS if m.version > version]
+
+def migrate(client: Neo4jClient, version: Optional[int] = None, log: Callable[[str], Any] = lambda _: None) -> List[Migration]:
+    """Applies every step above `version` (read from the database if None), in order. Returns them."""
+    todo = pending(current_version(client) if version is None else version)
+    for m in todo:
+        t0 = time.perf_counter()
+        for statement in m.statements:
+            client.write(statement)
+        if m.run is not None:
+            m.run(client)
+        client.write(RECORD_CYPHER, {"version": m.version, "name": m.name})
+        log(f"migration {m.version} ({m.name}) applied in {time.perf_counter() - t0:.2f}s")
+    return todo
+
+def await_indexes(client: Neo4jClient, timeout: float = 300.0) -> None:
+    """Blocks until every index is online (fails after `timeout` seconds)."""
+    client.run(AWAIT_INDEXES_CYPHER, {"timeout": int(timeout)})
+
+def ensure(client: Neo4jClient, wait: Optional[float] = None, log: Callable[[str], Any] = lambda _: None) -> int:
+    """
+    Brings the schema up to date: one read when it already is. With `wait`
+    (seconds), also blocks until every index is online, including ones
+    another process created and is still populating, for callers about to
+    run heavy reads or index-backed writes (one more round trip). Returns
+    the number of steps applied.
+    """
+    version = current_version(client)
+    applied = migrate(client, version, log) if version < LATEST else []
+    if wait is not None:
+        await_indexes(client, wait)
+    return len(applied)
+
+def status(client: Neo4jClient) -> Dict[str, Any]:
+    version = current_version(client)
+    return {"version": version, "latest": LATEST, "pending": [f"{m.version} {m.name}" for m in pending(version)],
+            "indexes": client.read(INDEXES_CYPHER)}
+
+def main():
+    parser = argparse.ArgumentParser(description="Schema migrations")
+    parser.add_argument("command", choices=["status", "migrate", "wait"])
+    parser.add_argument("--timeout", type=float, default=300.0, help="Seconds to wait for indexes to come online")
+    args = parser.parse_args()
+
+    client = Neo4jClient()
+    try:
+        if args.command == "status":
+            s = status(client)
+            print(f"schema version {s['version']} of {s['latest']}")
+            for p in s["pending"]:
+                print(f"  pending: {p}")
+            for ix in s["indexes"]:
+                print(f"  {ix['name']:<32} {ix['type']:<9} {ix['state']:<10} {ix['populationPercent']:.0f}%")
+        elif args.command == "migrate":
+            n = ensure(client, wait=args.timeout, log=print)
+            print(f"Applied {n} migration(s); schema is at version {LATEST}.")
+        else:
+            t0 = time.perf_counter()
+            await_indexes(client, args.timeout)
+            print(f"All indexes online ({time.perf_counter() - t0:.1f}s).")
+    finally:
+        client.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""
+Async versions of the auth, user, graph and search services for
+AsyncNeo4jClient. Same names, arguments, Cypher and events as the
+synchronous functions; only the I/O is awaited. Password hashing and
+verification run on the shared hashing thread pool (app.utils.hashing) so
+bcrypt does not stall the event loop.
+"""
+from __future__ import annotations
+import asyncio, time
+from typing import Any, Dict, List, Optional, Tuple
+
+from neo4j.exceptions import ConstraintError, Neo4jError
+
+from app import events
+from app.neo4j_client import AsyncNeo4jClient, is_timeout
+from app.services import (auth_service, graph_service as gs, path_service as ps, recommendation_service as rs,
+                          search_service, user_service)
+from app.utils import hashing
+from app.utils.validators import is_valid_username
+
+# -- UC-1 / UC-2 ----------------------------------------------------------------
+
+async def register_user(client: AsyncNeo4jClient, username: str, name: str, email: str, password: str,
+                        bio: str = "") -> Dict[str, Any]:
+    pw_hash, salt = await hashing.hash_password_async(password)
+    try:
+        recs = await client.write(auth_service.REGISTER_CYPHER, {"username": username, "name": name, "email": email,
+                                                                 "bio": bio, "pw_hash": pw_hash, "salt": salt,
+                                                                 "uid_base": auth_service.REGISTERED_UID_BASE})
+    except ConstraintError as e:
+        raise ValueError("Username or email already exists") from e
+    events.publish("user_registered", username=username, name=name, email=email)
+    return recs[0]["user"]
+
+async def login_user(client: AsyncNeo4jClient, username: str, password: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    recs = await client.read(auth_service.LOGIN_CYPHER, {"username": username})
+    if not recs:
+        return None, "User not found"
+    return await hashing.offload(auth_service.check_login, recs[0], password)
+
+# -- UC-3 / UC-4 ----------------------------------------------------------------
+
+async def get_profile(client: AsyncNeo4jClient, username: str) -> Optional[Dict[str, Any]]:
+    recs = await client.read(user_service.PROFILE_CYPHER, {"username": username}, cache_tags=[f"user:{username}"])
+    return recs[0]["user"] if recs else None
+
+async def update_profile(client: AsyncNeo4jClient, username: str, name: Optional[str] = None, bio: Optional[str] = None,
+                         email: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    recs = await client.write(user_service.UPDATE_PROFILE_CYPHER,
+                              {"username": username, "name": name, "bio": bio, "email": email})
+    if not recs:
+        return None
+    user = recs[0]["user"]
+    events.publish("profile_updated", username=username, name=user["name"], email=user["email"])
+    return user
+
+# -- UC-5 .. UC-9 ---------------------------------------------------------------
+
+async def follow_user(client: AsyncNeo4jClient, src_username: str, dst_username: str) -> bool:
+    if not (is_valid_username(src_username) and is_valid_username(dst_username)):
+        return False
+    if src_username == dst_username:
+        return False
+    recs = await client.write(gs.FOLLOW_CYPHER, {"src": src_username, "dst": dst_username})
+    if recs and recs[0]["created"]:
+        events.publish("followed", src=src_username, dst=dst_username,
+                       name=recs[0]["name"], followerCount=recs[0]["followerCount"])
+    return bool(recs)
+
+async def unfollow_user(client: AsyncNeo4jClient, src_username: str, dst_username: str) -> int:
+    if not (is_valid_username(src_username) and is_valid_username(dst_username)):
+        return 0
+    recs = await client.write(gs.UNFOLLOW_CYPHER, {"src": src_username, "dst": dst_username})
+    if not recs:
+        return 0
+    events.publish("unfollowed", src=src_username, dst=dst_username,
+                   name=recs[0]["name"], followerCount=recs[0]["followerCount"])
+    return recs[0]["removed"]
+
+async def _page(client: AsyncNeo4jClient, after_cypher: str, before_cypher: str, username: str, limit: int,
+                cursor: Optional[str], tag: str) -> gs.Page:
+    cypher, params, forward = gs.page_query(after_cypher, before_cypher, username, limit, cursor)
+    return gs.page_result(await client.read(cypher, params, cache_tags=[tag]), limit, forward, cursor is None)
+
+async def list_following(client: AsyncNeo4jClient, username: str, limit: int = 20, cursor: Optional[str] = None) -> gs.Page:
+    if not is_valid_username(username):
+        return [], None, None
+    return await _page(client, gs.FOLLOWING_AFTER_CYPHER, gs.FOLLOWING_BEFORE_CYPHER, username, limit, cursor,
+                       f"following:{username}")
+
+async def list_followers(client: AsyncNeo4jClient, username: str, limit: int = 20, cursor: Optional[str] = None) -> gs.Page:
+    if not is_valid_username(username):
+        return [], None, None
+    return await _page(client, gs.FOLLOWERS_AFTER_CYPHER, gs.FOLLOWERS_BEFORE_CYPHER, username, limit, cursor,
+                       f"followers:{username}")
+
+async def home(client: AsyncNeo4jClient, username: str, page_size: int = 20) -> Dict[str, Any]:
+    """Profile plus the first UC-7 page of both lists, fetched concurrently."""
+    profile, following, followers = await asyncio.gather(
+        get_profile(client, username),
+        list_following(client, username, page_size),
+        list_followers(client, username, page_size),
+    )
+    return {"profile": profile, "following": following, "followers": followers}
+
+async def mutual_connections(client: AsyncNeo4jClient, u1: str, u2: str, limit: int = 20,
+                             adjacency: Optional[gs.Adjacency] = None) -> List[Dict[str, Any]]:
+    if not gs.mutual_args(u1, u2):
+        return []
+    if adjacency is not None and u1 in adjacency and u2 in adjacency:
+        return gs.intersect_following(adjacency[u1], adjacency[u2], limit)
+    return await client.read(gs.MUTUALS_CYPHER, {"u1": u1, "u2": u2, "limit": limit}, cache_tags=gs.mutual_tags(u1, u2))
+
+async def mutual_count(client: AsyncNeo4jClient, u1: str, u2: str) -> int:
+    if not gs.mutual_args(u1, u2):
+        return 0
+    recs = await client.read(gs.MUTUALS_COUNT_CYPHER, {"u1": u1, "u2": u2}, cache_tags=gs.mutual_tags(u1, u2))
+    return recs[0]["total"] if recs else 0
+
+async def mutual_sample(client: AsyncNeo4jClient, u1: str, u2: str, limit: int = 20) -> Tuple[int, List[Dict[str, Any]]]:
+    if not gs.mutual_args(u1, u2):
+        return 0, []
+    recs = await client.read(gs.MUTUALS_SAMPLE_CYPHER, {"u1": u1, "u2": u2, "limit": limit},
+                             cache_tags=gs.mutual_tags(u1, u2))
+    if not recs:
+        return 0, []
+    return recs[0]["total"], recs[0]["sample"]
+
+async def _candidates(client: AsyncNeo4jClient, params: Dict[str, Any], timeout: float) -> Optional[List[Dict[str, Any]]]:
+    try:
+        return await client.read(rs.CANDIDATES_CYPHER, params, timeout=timeout)
+    except Neo4jError as e:
+        if not is_timeout(e):
+            raise
+        return None
+
+async def recommend_connections(client: AsyncNeo4jClient, username: str, limit: int = 10, scorer: str = "mutuals",
+                                budget: Optional[float] = 2.0, max_age: Optional[float] = 24 * 3600,
+                                **limits: int) -> List[Dict[str, Any]]:
+    # see graph_service.recommend_connections and recommendation_service.recommend
+    if not is_valid_username(username):
+        return []
+    params, fallback = rs.attempts(username, scorer, False, limits)
+    if max_age is not None:
+        stored = rs.parse_stored(await client.read(rs.PRECOMPUTED_CYPHER, {"u": username, "scorer": scorer,
+                                                                      "max_age": int(max_age), "limit": limit}))
+        if stored is not None:
+            return stored
+    if budget is None:
+        return rs.rank(await client.read(rs.CANDIDATES_CYPHER, params), scorer, limit)
+    deadline = time.monotonic() + budget
+    rows = await _candidates(client, params, budget * 0.7)
+    if rows is None:
+        remaining = deadline - time.monotonic()
+        rows = await _candidates(client, fallback, remaining) if remaining > 0.01 else None
+    return rs.rank(rows or [], scorer, limit)
+
+# -- UC-10 / UC-11 --------------------------------------------------------------
+
+async def search_users(client: AsyncNeo4jClient, q: str, limit: int = 25) -> List[Dict[str, Any]]:
+    query = search_service.fulltext_query(q)
+    if not query:
+        return []
+    try:
+        return await client.read(search_service.SEARCH_FULLTEXT_CYPHER, {"q": query, "limit": limit})
+    except Neo4jError as e:
+        search_service.log.warning("fulltext search failed (%s); falling back to a label scan", e.code)
+        return await client.read(search_service.SEARCH_CONTAINS_CYPHER, {"q": q, "limit": limit})
+
+async def popular_users(client: AsyncNeo4jClient, limit: int = 10, rank_by: str = "followers") -> List[Dict[str, Any]]:
+    # the in-process Leaderboard is synchronous; async callers read the index directly (cached)
+    if rank_by not in search_service.RANKINGS:
+        raise ValueError(f"Unknown ranking {rank_by!r}; choose from {', '.join(search_service.RANKINGS)}")
+    cypher = search_service.POPULAR_PAGERANK_CYPHER if rank_by == "pagerank" else search_service.POPULAR_CYPHER
+    return await client.read(cypher, {"limit": limit}, cache_tags=["popular"])
+
+# -- UC-12 ----------------------------------------------------------------------
+
+async def _level(client: AsyncNeo4jClient, side: ps.Side, batch_size: int,
+                 deadline: Optional[float]) -> List[Dict[str, Any]]:
+    # the batches of one level are independent, so they are read concurrently
+    timeout = ps.remaining_time(deadline)
+    try:
+        parts = await asyncio.gather(*(client.read(side.cypher, {"ids": ids}, timeout=timeout)
+                                       for ids in side.batches(batch_size)))
+    except Neo4jError as e:
+        if not is_timeout(e):
+            raise
+        raise ps.OutOfTime() from e
+    return [r for rows in parts for r in rows]
+
+async def degrees_of_separation(client: AsyncNeo4jClient, src: str, dst: str, k: int = 1,
+                                budget: Optional[float] = 2.0, **limits: int) -> ps.Separation:
+    # see path_service.shortest_paths
+    caps = dict(ps.DEFAULT_LIMITS, **limits)
+    if not ps.valid_args(src, dst, k):
+        return ps.Separation(None, [], True, 0, 0)
+    deadline = time.monotonic() + budget if budget is not None else None
+    queries = 1
+    sides = ps.make_sides(await client.read(ps.ENDPOINTS_CYPHER, {"usernames": [src, dst]}), src, dst, k)
+    if sides is None:
+        return ps.Separation(None, [], True, 0, queries)
+    fwd, bwd = sides
+    met = list(fwd.frontier) if src == dst else []
+    complete = True
+    while not met:
+        side, other, complete = ps.pick_side(fwd, bwd, caps)
+        if side is None:
+            break
+        batches = -(-len(side.frontier) // caps["batch_size"])
+        try:
+            met = side.advance(await _level(client, side, caps["batch_size"], deadline), other)
+        except ps.OutOfTime:
+            complete = False
+            break
+        queries += batches
+    visited = len(fwd.depth) + len(bwd.depth)
+    if not met:
+        return ps.Separation(None, [], complete, visited, queries)
+    distance, chains = ps.shortest_chains(fwd, bwd, met, k)
+    rows = await client.read(ps.PATH_USERS_CYPHER, {"ids": ps.path_ids(chains)})
+    return ps.Separation(distance, ps.named_paths(chains, rows), True, visited, queries + 1)
@@ -1,60 +1,77 @@
 from __future__ import annotations
-from typing import Optional, Dict, Any
+import re
+from typing import Optional, Dict, Any, Tuple
 from neo4j.exceptions import ConstraintError
+from app import events
 from app.neo4j_client import Neo4jClient
 from app.utils.hashing import hash_password, verify_password
 
-def create_schema(client: Neo4jClient) -> None:
-    # Constraints & indexes
-    client.write("""
-    CREATE CONSTRAINT user_username_unique IF NOT EXISTS
-    FOR (u:User) REQUIRE u.username IS UNIQUE
-    """)
-    client.write("""
-    CREATE CONSTRAINT user_email_unique IF NOT EXISTS
-    FOR (u:User) REQUIRE u.email IS UNIQUE
-    """)
-    client.write("""
-    CREATE FULLTEXT INDEX user_fulltext IF NOT EXISTS
-    FOR (u:User) ON EACH [u.username, u.name, u.email]
-    """)
+# uid ranges, one per source, so every dataset can share a database:
+#   [1, 2^31)       Pokec users u<id>: the SNAP id
+#   [2^31, 2^32)    synthetic users s<i>: SYNTHETIC_UID_BASE + i
+#   [2^32, ...)     registered and seed users, counting up on the :Sequence node
+# Statements that draw from the sequence write seq.next before reading it:
+# the write takes the node's lock, so concurrent draws never see the same value.
+SYNTHETIC_UID_BASE = 1 << 31
+REGISTERED_UID_BASE = 1 << 32
+
+_SOURCE_NAME = re.compile(r"([us])([1-9][0-9]{0,8})")
+
+def source_uid(username: str) -> Optional[int]:
+    """The uid an imported username (u<id>, s<i>) always gets, or None for other names."""
+    m = _SOURCE_NAME.fullmatch(username)
+    if m is None:
+        return None
+    return int(m.group(2)) + (SYNTHETIC_UID_BASE if m.group(1) == "s" else 0)
+
+REGISTER_CYPHER = """
+MERGE (seq:Sequence {name: 'uid'})
+SET seq.next = coalesce(seq.next, $uid_base) + 1
+WITH seq.next - 1 AS uid
+CREATE (u:User {
+    uid: uid,
+    username: $username,
+    name: $name,
+    email: $email,
+    bio: $bio,
+    passwordHash: $pw_hash,
+    salt: $salt,
+    followerCount: 0,
+    followingCount: 0,
+    createdAt: datetime(),
+    updatedAt: datetime()
+})
+RETURN u { .* } AS user
+"""
+
+LOGIN_CYPHER = """
+MATCH (u:User {username: $username})
+RETURN u.passwordHash AS passwordHash, u.salt AS salt, u { .username, .name, .email, .bio } AS profile
+"""
 
 def register_user(client: Neo4jClient, username: str, name: str, email: str, password: str, bio: str = "") -> Dict[str, Any]:
     # UC-1: User Registration
     pw_hash, salt = hash_password(password)
     try:
         recs = client.write(
-            """
-            CREATE (u:User {
-                username: $username,
-                name: $name,
-                email: $email,
-                bio: $bio,
-                passwordHash: $pw_hash,
-                salt: $salt,
-                createdAt: datetime(),
-                updatedAt: datetime()
-            })
-            RETURN u { .* } AS user
-            """,
-            {"username": username, "name": name, "email": email, "bio": bio, "pw_hash": pw_hash, "salt": salt}
+            REGISTER_CYPHER,
+            {"username": username, "name": name, "email": email, "bio": bio, "pw_hash": pw_hash, "salt": salt,
+             "uid_base": REGISTERED_UID_BASE}
         )
-        return recs[0]["user"]
     except ConstraintError as e:
         raise ValueError("Username or email already exists") from e
+    user = recs[0]["user"]
+    events.publish("user_registered", username=username, name=name, email=email)
+    return user
 
 def login_user(client: Neo4jClient, username: str, password: str) -> Optional[Dict[str, Any]]:
     # UC-2: User Login
-    recs = client.read(
-        """
-        MATCH (u:User {username: $username})
-        RETURN u.passwordHash AS passwordHash, u.salt AS salt, u { .username, .name, .email, .bio } AS profile
-        """,
-        {"username": username}
-    )
+    recs = client.read(LOGIN_CYPHER, {"username": username})
     if not recs:
         return None, "User not found"
-    row = recs[0]
+    return check_login(recs[0], password)
+
+def check_login(row: Dict[str, Any], password: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
     if row["passwordHash"] is None:
         return None, "This account does not have a password set."
     ok = verify_password(password, row["passwordHash"], row["salt"] or "")
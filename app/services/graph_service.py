@@ -1,24 +1,45 @@
 from __future__ import annotations
-from typing import List, Dict, Any
+import base64
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
 
+from app import events
 from app.neo4j_client import Neo4jClient
+from app.services import path_service, recommendation_service
 from app.utils.validators import is_valid_username
 
+# Creating the relationship locks both endpoints before ON CREATE SET reads
+# the counters, so concurrent follows cannot lose an increment.
+FOLLOW_CYPHER = """
+MATCH (a:User {username: $src}), (b:User {username: $dst})
+WITH a, b, NOT EXISTS { (a)-[:FOLLOWS]->(b) } AS created
+MERGE (a)-[r:FOLLOWS]->(b)
+ON CREATE SET r.since = datetime(),
+              a.followingCount = coalesce(a.followingCount, 0) + 1,
+              a.followsUpdatedAt = datetime(),
+              b.followerCount = coalesce(b.followerCount, 0) + 1
+RETURN created, b.name AS name, b.followerCount AS followerCount
+"""
+
+UNFOLLOW_CYPHER = """
+MATCH (a:User {username: $src})-[r:FOLLOWS]->(b:User {username: $dst})
+DELETE r
+WITH a, b, count(*) AS removed
+SET a.followingCount = coalesce(a.followingCount, removed) - removed,
+    a.followsUpdatedAt = datetime(),
+    b.followerCount = coalesce(b.followerCount, removed) - removed
+RETURN removed, b.name AS name, b.followerCount AS followerCount
+"""
+
 def follow_user(client: Neo4jClient, src_username: str, dst_username: str) -> bool:
     # UC-5: Follow Another User
     if not (is_valid_username(src_username) and is_valid_username(dst_username)):
         return False
     if src_username == dst_username:
         return False
-    recs = client.write(
-        """
-        MATCH (a:User {username: $src}), (b:User {username: $dst})
-        MERGE (a)-[r:FOLLOWS]->(b)
-        ON CREATE SET r.since = datetime()
-        RETURN 1 AS ok
-        """,
-        {"src": src_username, "dst": dst_username},
-    )
+    recs = client.write(FOLLOW_CYPHER, {"src": src_username, "dst": dst_username})
+    if recs and recs[0]["created"]:
+        events.publish("followed", src=src_username, dst=dst_username,
+                       name=recs[0]["name"], followerCount=recs[0]["followerCount"])
     return bool(recs)
 
 
@@ -26,84 +47,366 @@ def unfollow_user(client: Neo4jClient, src_username: str, dst_username: str) ->
     # UC-6: Unfollow a User
     if not (is_valid_username(src_username) and is_valid_username(dst_username)):
         return 0
-    recs = client.write(
-        """
-        MATCH (a:User {username: $src})-[r:FOLLOWS]->(b:User {username: $dst})
-        DELETE r
-        RETURN count(*) AS removed
-        """,
-        {"src": src_username, "dst": dst_username},
-    )
-    return recs[0]["removed"] if recs else 0
-
-
-def list_following(client: Neo4jClient, username: str, limit: int = 20, skip: int = 0) -> List[Dict[str, Any]]:
-    # UC-7: View Friends/Connections (following)
+    recs = client.write(UNFOLLOW_CYPHER, {"src": src_username, "dst": dst_username})
+    if not recs:
+        return 0
+    events.publish("unfollowed", src=src_username, dst=dst_username,
+                   name=recs[0]["name"], followerCount=recs[0]["followerCount"])
+    return recs[0]["removed"]
+
+
+# Bulk UC-5 / UC-6: rows are {src, dsts}, one per source, so each source is
+# matched once per batch. Pairs are deduplicated beforehand, so `created` and
+# the per-row counter updates behave exactly as in FOLLOW_CYPHER, and `since`
+# is set only when the relationship is created.
+FOLLOW_MANY_CYPHER = """
+UNWIND $rows AS row
+MATCH (a:User {username: row.src})
+UNWIND row.dsts AS dst
+MATCH (b:User {username: dst})
+WITH a, b, NOT EXISTS { (a)-[:FOLLOWS]->(b) } AS created
+MERGE (a)-[r:FOLLOWS]->(b)
+ON CREATE SET r.since = datetime(),
+              a.followingCount = coalesce(a.followingCount, 0) + 1,
+              a.followsUpdatedAt = datetime(),
+              b.followerCount = coalesce(b.followerCount, 0) + 1
+RETURN a.username AS src, b.username AS dst, created, b.name AS name, b.followerCount AS followerCount
+"""
+
+UNFOLLOW_MANY_CYPHER = """
+UNWIND $rows AS row
+MATCH (a:User {username: row.src})
+UNWIND row.dsts AS dst
+MATCH (a)-[r:FOLLOWS]->(b:User {username: dst})
+DELETE r
+SET a.followingCount = coalesce(a.followingCount, 1) - 1,
+    a.followsUpdatedAt = datetime(),
+    b.followerCount = coalesce(b.followerCount, 1) - 1
+RETURN a.username AS src, b.username AS dst, b.name AS name, b.followerCount AS followerCount
+"""
+
+# the same, addressing users by their integer uid (unique constraint) instead of username
+FOLLOW_MANY_UID_CYPHER = """
+UNWIND $rows AS row
+MATCH (a:User {uid: row.src})
+UNWIND row.dsts AS dst
+MATCH (b:User {uid: dst})
+WITH a, b, NOT EXISTS { (a)-[:FOLLOWS]->(b) } AS created
+MERGE (a)-[r:FOLLOWS]->(b)
+ON CREATE SET r.since = datetime(),
+              a.followingCount = coalesce(a.followingCount, 0) + 1,
+              a.followsUpdatedAt = datetime(),
+              b.followerCount = coalesce(b.followerCount, 0) + 1
+RETURN a.uid AS src, b.uid AS dst, a.username AS srcUsername, b.username AS dstUsername,
+       created, b.name AS name, b.followerCount AS followerCount
+"""
+
+UNFOLLOW_MANY_UID_CYPHER = """
+UNWIND $rows AS row
+MATCH (a:User {uid: row.src})
+UNWIND row.dsts AS dst
+MATCH (a)-[r:FOLLOWS]->(b:User {uid: dst})
+DELETE r
+SET a.followingCount = coalesce(a.followingCount, 1) - 1,
+    a.followsUpdatedAt = datetime(),
+    b.followerCount = coalesce(b.followerCount, 1) - 1
+RETURN a.uid AS src, b.uid AS dst, a.username AS srcUsername, b.username AS dstUsername,
+       b.name AS name, b.followerCount AS followerCount
+"""
+
+KEYS = ("username", "uid")
+
+# per-pair outcomes of follow_many / unfollow_many
+CREATED, EXISTS, REMOVED, MISSING, INVALID, DUPLICATE = "created", "exists", "removed", "missing", "invalid", "duplicate"
+
+PairResult = Tuple[Any, Any, str]
+
+def _valid_uid(uid: Any) -> bool:
+    return isinstance(uid, int) and not isinstance(uid, bool) and uid >= 0
+
+def _many_statement(key: str, follow: bool) -> Tuple[str, Callable[[Any], bool]]:
+    if key == "username":
+        return (FOLLOW_MANY_CYPHER if follow else UNFOLLOW_MANY_CYPHER), is_valid_username
+    if key == "uid":
+        return (FOLLOW_MANY_UID_CYPHER if follow else UNFOLLOW_MANY_UID_CYPHER), _valid_uid
+    raise ValueError(f"Unknown key {key!r}; choose from {', '.join(KEYS)}")
+
+def _pair_batches(pairs: Iterable[Tuple[Any, Any]], batch_size: int, valid: Callable[[Any], bool] = is_valid_username
+                  ) -> Tuple[List[PairResult], Dict[Tuple[Any, Any], int], List[List[Dict[str, Any]]]]:
+    """
+    Validates and deduplicates the pairs, then groups them by source into
+    batches of at most `batch_size` pairs. Returns (results with rejected pairs
+    already filled in, index of each pair to send, batches of {src, dsts} rows).
+    """
+    results: List[PairResult] = []
+    todo: Dict[Tuple[Any, Any], int] = {}
+    by_src: Dict[Any, List[Any]] = {}
+    for src, dst in pairs:
+        if not (valid(src) and valid(dst)) or src == dst:
+            results.append((src, dst, INVALID))
+        elif (src, dst) in todo:
+            results.append((src, dst, DUPLICATE))
+        else:
+            todo[(src, dst)] = len(results)
+            results.append((src, dst, MISSING))
+            by_src.setdefault(src, []).append(dst)
+    batches: List[List[Dict[str, Any]]] = []
+    batch: List[Dict[str, Any]] = []
+    size = 0
+    # sorted sources: concurrent bulk calls lock users in the same order
+    for src in sorted(by_src):
+        dsts = by_src[src]
+        for k in range(0, len(dsts), batch_size):
+            part = dsts[k:k + batch_size]
+            if size + len(part) > batch_size:
+                batches.append(batch)
+                batch, size = [], 0
+            batch.append({"src": src, "dsts": part})
+            size += len(part)
+    if batch:
+        batches.append(batch)
+    return results, todo, batches
+
+def follow_many(client: Neo4jClient, pairs: Iterable[Tuple[Any, Any]], batch_size: int = 5000,
+                key: str = "username") -> List[PairResult]:
+    """
+    Bulk UC-5: follows every (src, dst) pair, `batch_size` pairs per transaction.
+    Pairs are usernames, or integer uids with key="uid".
+    Returns (src, dst, status) in input order; status is CREATED, EXISTS,
+    MISSING (either user does not exist), INVALID or DUPLICATE (repeats an
+    earlier pair). A "followed" event is published for every created follow.
+    """
+    cypher, valid = _many_statement(key, follow=True)
+    results, todo, batches = _pair_batches(pairs, batch_size, valid)
+    for batch in batches:
+        recs = client.write(cypher, {"rows": batch})
+        for r in recs:
+            results[todo[(r["src"], r["dst"])]] = (r["src"], r["dst"], CREATED if r["created"] else EXISTS)
+            if r["created"]:
+                events.publish("followed", src=r.get("srcUsername", r["src"]), dst=r.get("dstUsername", r["dst"]),
+                               name=r["name"], followerCount=r["followerCount"])
+    return results
+
+def unfollow_many(client: Neo4jClient, pairs: Iterable[Tuple[Any, Any]], batch_size: int = 5000,
+                  key: str = "username") -> List[PairResult]:
+    """
+    Bulk UC-6: removes every (src, dst) follow, `batch_size` pairs per transaction.
+    Pairs are usernames, or integer uids with key="uid".
+    Returns (src, dst, status) in input order; status is REMOVED, MISSING (no
+    such follow), INVALID or DUPLICATE. An "unfollowed" event is published for
+    every removed follow.
+    """
+    cypher, valid = _many_statement(key, follow=False)
+    results, todo, batches = _pair_batches(pairs, batch_size, valid)
+    for batch in batches:
+        recs = client.write(cypher, {"rows": batch})
+        for r in recs:
+            results[todo[(r["src"], r["dst"])]] = (r["src"], r["dst"], REMOVED)
+            events.publish("unfollowed", src=r.get("srcUsername", r["src"]), dst=r.get("dstUsername", r["dst"]),
+                           name=r["name"], followerCount=r["followerCount"])
+    return results
+
+
+# UC-7 keyset pagination: each page seeks past the last username seen instead
+# of re-sorting and skipping everything before it. With LIMIT the server keeps
+# only a top-(limit+1) heap while expanding, and no DISTINCT pass is needed
+# because FOLLOWS is MERGEd (at most one per pair).
+FOLLOWING_AFTER_CYPHER = """
+MATCH (:User {username: $u})-[:FOLLOWS]->(v:User)
+WHERE $after IS NULL OR v.username > $after
+RETURN v.username AS username, v.name AS name
+ORDER BY v.username ASC
+LIMIT $limit
+"""
+
+FOLLOWING_BEFORE_CYPHER = """
+MATCH (:User {username: $u})-[:FOLLOWS]->(v:User)
+WHERE v.username < $before
+RETURN v.username AS username, v.name AS name
+ORDER BY v.username DESC
+LIMIT $limit
+"""
+
+FOLLOWERS_AFTER_CYPHER = """
+MATCH (v:User)-[:FOLLOWS]->(:User {username: $u})
+WHERE $after IS NULL OR v.username > $after
+RETURN v.username AS username, v.name AS name
+ORDER BY v.username ASC
+LIMIT $limit
+"""
+
+FOLLOWERS_BEFORE_CYPHER = """
+MATCH (v:User)-[:FOLLOWS]->(:User {username: $u})
+WHERE v.username < $before
+RETURN v.username AS username, v.name AS name
+ORDER BY v.username DESC
+LIMIT $limit
+"""
+
+Page = Tuple[List[Dict[str, Any]], Optional[str], Optional[str]]
+
+def encode_cursor(direction: str, username: str) -> str:
+    # direction: "a" = page after username, "b" = page before username
+    return base64.urlsafe_b64encode(f"{direction}:{username}".encode("utf-8")).decode("ascii")
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    try:
+        direction, username = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split(":", 1)
+    except (ValueError, UnicodeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if direction not in ("a", "b"):
+        raise ValueError("Invalid cursor")
+    return direction, username
+
+# page_query/page_result and mutual_args/mutual_tags are shared with app/services/aio.py
+def page_query(after_cypher: str, before_cypher: str, username: str, limit: int,
+                cursor: Optional[str]) -> Tuple[str, Dict[str, Any], bool]:
+    # returns (cypher, params, forward); one extra row tells whether another page exists
+    direction, key = decode_cursor(cursor) if cursor else ("a", None)
+    if direction == "a":
+        return after_cypher, {"u": username, "after": key, "limit": limit + 1}, True
+    return before_cypher, {"u": username, "before": key, "limit": limit + 1}, False
+
+def page_result(rows: List[Dict[str, Any]], limit: int, forward: bool, first: bool) -> Page:
+    more = len(rows) > limit
+    if forward:
+        rows = rows[:limit]
+        next_cursor = encode_cursor("a", rows[-1]["username"]) if more else None
+        prev_cursor = encode_cursor("b", rows[0]["username"]) if not first and rows else None
+    else:
+        rows = rows[:limit][::-1]
+        prev_cursor = encode_cursor("b", rows[0]["username"]) if more else None
+        next_cursor = encode_cursor("a", rows[-1]["username"]) if rows else None
+    return rows, next_cursor, prev_cursor
+
+def _page(client: Neo4jClient, after_cypher: str, before_cypher: str, username: str, limit: int, cursor: Optional[str],
+          tag: str) -> Page:
+    cypher, params, forward = page_query(after_cypher, before_cypher, username, limit, cursor)
+    return page_result(client.read(cypher, params, cache_tags=[tag]), limit, forward, cursor is None)
+
+
+def list_following(client: Neo4jClient, username: str, limit: int = 20, cursor: Optional[str] = None) -> Page:
+    """
+    UC-7: View Friends/Connections (following), one page ordered by username.
+    Returns (rows, next_cursor, prev_cursor); pass a cursor back to move pages.
+    """
     if not is_valid_username(username):
-        return []
-    recs = client.read(
-        """
-        MATCH (:User {username: $u})-[:FOLLOWS]->(v:User)
-        RETURN DISTINCT v.username AS username, v.name AS name
-        ORDER BY v.username
-        SKIP $skip LIMIT $limit
-        """,
-        {"u": username, "skip": skip, "limit": limit},
-    )
-    return recs
-
-
-def list_followers(client: Neo4jClient, username: str, limit: int = 20, skip: int = 0) -> List[Dict[str, Any]]:
-    # UC-7: View Friends/Connections (followers)
+        return [], None, None
+    return _page(client, FOLLOWING_AFTER_CYPHER, FOLLOWING_BEFORE_CYPHER, username, limit, cursor, f"following:{username}")
+
+
+def list_followers(client: Neo4jClient, username: str, limit: int = 20, cursor: Optional[str] = None) -> Page:
+    """
+    UC-7: View Friends/Connections (followers), one page ordered by username.
+    Returns (rows, next_cursor, prev_cursor); pass a cursor back to move pages.
+    """
     if not is_valid_username(username):
-        return []
-    recs = client.read(
-        """
-        MATCH (v:User)-[:FOLLOWS]->(:User {username: $u})
-        RETURN DISTINCT v.username AS username, v.name AS name
-        ORDER BY v.username
-        SKIP $skip LIMIT $limit
-        """,
-        {"u": username, "skip": skip, "limit": limit},
-    )
-    return recs
-
-
-def mutual_connections(client: Neo4jClient, u1: str, u2: str, limit: int = 20) -> List[Dict[str, Any]]:
+        return [], None, None
+    return _page(client, FOLLOWERS_AFTER_CYPHER, FOLLOWERS_BEFORE_CYPHER, username, limit, cursor, f"followers:{username}")
+
+
+# UC-8: both out-degrees are read first (maintained counter, else the O(1)
+# degree count) and the smaller adjacency list is walked; the larger side is
+# only probed for a single relationship per candidate.
+SMALLER_SIDE = """
+MATCH (a:User {username: $u1}), (b:User {username: $u2})
+WITH a, b, coalesce(a.followingCount, COUNT { (a)-[:FOLLOWS]->() })
+        <= coalesce(b.followingCount, COUNT { (b)-[:FOLLOWS]->() }) AS aSmaller
+WITH CASE WHEN aSmaller THEN a ELSE b END AS s, CASE WHEN aSmaller THEN b ELSE a END AS l
+"""
+
+MUTUALS_CYPHER = SMALLER_SIDE + """
+MATCH (s)-[:FOLLOWS]->(m:User)
+WHERE EXISTS { (l)-[:FOLLOWS]->(m) }
+RETURN m.username AS username, m.name AS name
+ORDER BY username
+LIMIT $limit
+"""
+
+MUTUALS_COUNT_CYPHER = SMALLER_SIDE + """
+RETURN COUNT { (s)-[:FOLLOWS]->(m:User) WHERE EXISTS { (l)-[:FOLLOWS]->(m) } } AS total
+"""
+
+# the sample is whatever the walk meets first (no sort), so memory stays at $limit rows
+MUTUALS_SAMPLE_CYPHER = SMALLER_SIDE + """
+CALL {
+  WITH s, l
+  MATCH (s)-[:FOLLOWS]->(m:User)
+  WHERE EXISTS { (l)-[:FOLLOWS]->(m) }
+  RETURN m
+  LIMIT $limit
+}
+WITH s, l, collect(m {.username, .name}) AS sample
+RETURN COUNT { (s)-[:FOLLOWS]->(m:User) WHERE EXISTS { (l)-[:FOLLOWS]->(m) } } AS total, sample
+"""
+
+FOLLOWING_ALL_CYPHER = """
+MATCH (:User {username: $u})-[:FOLLOWS]->(v:User)
+RETURN v.username AS username, v.name AS name
+"""
+
+# username -> {followee username: followee name}
+Adjacency = Mapping[str, Mapping[str, str]]
+
+def mutual_args(u1: str, u2: str) -> bool:
+    return is_valid_username(u1) and is_valid_username(u2) and u1 != u2
+
+def mutual_tags(u1: str, u2: str) -> List[str]:
+    return [f"following:{u1}", f"following:{u2}"]
+
+def load_following(client: Neo4jClient, username: str) -> Dict[str, str]:
+    """Full followee map of one user, for callers that keep adjacency in memory."""
+    rows = client.read(FOLLOWING_ALL_CYPHER, {"u": username}, cache_tags=[f"following:{username}"])
+    return {r["username"]: r["name"] for r in rows}
+
+def intersect_following(f1: Mapping[str, str], f2: Mapping[str, str], limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Client-side UC-8: iterates the smaller map and probes the larger one."""
+    small, large = (f1, f2) if len(f1) <= len(f2) else (f2, f1)
+    common = sorted(u for u in small if u in large)
+    if limit is not None:
+        common = common[:limit]
+    return [{"username": u, "name": small[u]} for u in common]
+
+def mutual_connections(client: Neo4jClient, u1: str, u2: str, limit: int = 20,
+                       adjacency: Optional[Adjacency] = None) -> List[Dict[str, Any]]:
     # UC-8: Mutual Connections
-    if not (is_valid_username(u1) and is_valid_username(u2)):
+    # If both followee maps are already in `adjacency` no query is sent.
+    if not mutual_args(u1, u2):
         return []
-    if u1 == u2:
-        return []
-    recs = client.read(
-        """
-        MATCH (a:User {username: $u1}), (b:User {username: $u2})
-        MATCH (a)-[:FOLLOWS]->(m:User)<-[:FOLLOWS]-(b)
-        RETURN DISTINCT m.username AS username, m.name AS name
-        ORDER BY username
-        LIMIT $limit
-        """,
-        {"u1": u1, "u2": u2, "limit": limit},
-    )
-    return recs
-
-
-def recommend_connections(client: Neo4jClient, username: str, limit: int = 10) -> List[Dict[str, Any]]:
+    if adjacency is not None and u1 in adjacency and u2 in adjacency:
+        return intersect_following(adjacency[u1], adjacency[u2], limit)
+    return client.read(MUTUALS_CYPHER, {"u1": u1, "u2": u2, "limit": limit}, cache_tags=mutual_tags(u1, u2))
+
+def mutual_count(client: Neo4jClient, u1: str, u2: str) -> int:
+    # UC-8, count only
+    if not mutual_args(u1, u2):
+        return 0
+    recs = client.read(MUTUALS_COUNT_CYPHER, {"u1": u1, "u2": u2}, cache_tags=mutual_tags(u1, u2))
+    return recs[0]["total"] if recs else 0
+
+def mutual_sample(client: Neo4jClient, u1: str, u2: str, limit: int = 20) -> Tuple[int, List[Dict[str, Any]]]:
+    # UC-8 for very large intersections: exact total plus up to `limit` unordered mutuals
+    if not mutual_args(u1, u2):
+        return 0, []
+    recs = client.read(MUTUALS_SAMPLE_CYPHER, {"u1": u1, "u2": u2, "limit": limit}, cache_tags=mutual_tags(u1, u2))
+    if not recs:
+        return 0, []
+    return recs[0]["total"], recs[0]["sample"]
+
+
+def recommend_connections(client: Neo4jClient, username: str, limit: int = 10, scorer: str = "mutuals",
+                          budget: Optional[float] = 2.0, max_age: Optional[float] = 24 * 3600, **limits: int) -> List[Dict[str, Any]]:
     # UC-9: Friend Recommendations
-    if not is_valid_username(username):
-        return []
-    recs = client.read(
-        """
-        MATCH (me:User {username: $u})
-        MATCH (me)-[:FOLLOWS]->(friend:User)-[:FOLLOWS]->(rec:User)
-        WHERE NOT (me)-[:FOLLOWS]->(rec) AND rec <> me
-        WITH rec, count(DISTINCT friend) AS mutuals
-        OPTIONAL MATCH (rec)<-[:FOLLOWS]-(follower:User)
-        WITH rec, mutuals, count(DISTINCT follower) AS followers
-        RETURN rec.username AS username, rec.name AS name, mutuals, followers
-        ORDER BY mutuals DESC, followers DESC, username ASC
-        LIMIT $limit
-        """,
-        {"u": username, "limit": limit},
-    )
-    return recs
+    # Serve the batch job's stored results (app/jobs/recommend.py) while they are
+    # fresh, otherwise run the bounded two-hop expansion live.
+    if max_age is not None and is_valid_username(username):
+        stored = recommendation_service.precomputed(client, username, limit=limit, scorer=scorer, max_age=max_age)
+        if stored is not None:
+            return stored
+    return recommendation_service.recommend(client, username, limit=limit, scorer=scorer, budget=budget, **limits)
+
+def degrees_of_separation(client: Neo4jClient, src: str, dst: str, k: int = 1, budget: Optional[float] = 2.0,
+                          **limits: int) -> path_service.Separation:
+    # UC-12: Degrees of Separation
+    # Bidirectional BFS with depth, frontier and time bounds (app/services/path_service.py).
+    return path_service.shortest_paths(client, src, dst, k=k, budget=budget, **limits)
@@ -0,0 +1,199 @@
+from __future__ import annotations
+import heapq, threading, time
+from typing import Any, Dict, List, Optional, Tuple
+
+from app import events
+from app.neo4j_client import Neo4jClient
+from app.services.search_service import POPULAR_CYPHER
+
+# Rank keys sort ascending from best to worst: (-followerCount, username).
+RankKey = Tuple[int, str]
+
+LOAD_CYPHER = """
+MATCH (l:Leaderboard {name: $name})
+RETURN l.usernames AS usernames, l.names AS names, l.counts AS counts,
+       l.floorCount AS floorCount, l.floorUsername AS floorUsername,
+       l.capacity AS capacity, l.refreshedAt AS refreshedAt
+"""
+
+SAVE_CYPHER = """
+MERGE (l:Leaderboard {name: $name})
+SET l.usernames = $usernames, l.names = $names, l.counts = $counts,
+    l.floorCount = $floorCount, l.floorUsername = $floorUsername,
+    l.capacity = $capacity, l.refreshedAt = $refreshedAt
+"""
+
+class Leaderboard:
+    """
+    Top-K users by followerCount (UC-11), kept in process.
+
+    One index-ordered scan seeds `k + margin` entries; follow/unfollow events
+    then update them in place. `floor` is the rank key of the best user *not*
+    tracked, so every tracked entry ranked above it is exact. When fewer than the
+    requested number of entries are provably exact, or the last scan is older
+    than `max_age` seconds (writes from other processes are only seen by a
+    scan), the next read rescans. Reads sort at most k + margin entries.
+    Events that arrive while a scan is running are recorded and replayed on
+    top of its result, since the scan may have read the counts before them.
+
+    With `persist=True` the seed is stored on a `:Leaderboard` node so a restarted
+    process can reuse a scan that is still within `max_age`. A refresh writes
+    it only when the top k changed.
+    """
+    def __init__(self, client: Neo4jClient, k: int = 15, margin: Optional[int] = None, max_age: float = 60.0,
+                 persist: bool = True, name: str = "popular") -> None:
+        self.client = client
+        self.k = k
+        self.capacity = k + (margin if margin is not None else k)
+        self.max_age = max_age
+        self.persist = persist
+        self.name = name
+        self.entries: Dict[str, Tuple[int, str]] = {}  # username -> (followerCount, name)
+        self.heap: List[Tuple[int, str]] = []           # (followerCount, username), lazily invalidated
+        self.floor: Optional[RankKey] = None             # None: every user is tracked
+        self.refreshed_at = 0.0
+        self.scans = 0
+        self._sorted: Optional[List[Dict[str, Any]]] = None
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._scanning = 0
+        self._during_scan: List[Dict[str, Any]] = []      # events since the oldest running scan began
+        self._saved_top: Optional[List[Tuple[str, int]]] = None
+        events.subscribe("followed", self.on_change)
+        events.subscribe("unfollowed", self.on_change)
+
+    def close(self) -> None:
+        events.unsubscribe("followed", self.on_change)
+        events.unsubscribe("unfollowed", self.on_change)
+
+    # -- seeding -------------------------------------------------------------
+
+    def refresh(self) -> None:
+        with self._lock:
+            self._scanning += 1
+            mark = len(self._during_scan)
+        try:
+            rows = self.client.read(POPULAR_CYPHER, {"limit": self.capacity + 1})
+        except BaseException:
+            self._end_scan()
+            raise
+        self.scans += 1
+        floor = None
+        if len(rows) > self.capacity:
+            last = rows.pop()
+            floor = (-last["followerCount"], last["username"])
+        with self._lock:
+            replay = self._during_scan[mark:]
+            self._end_scan()
+            self._reset(rows, floor, time.time())
+            for event in replay:
+                self._apply(**event)
+            top = self._top_key()
+            changed = top != self._saved_top
+        if self.persist and changed:
+            self.save()
+            self._saved_top = top
+
+    def _end_scan(self) -> None:
+        with self._lock:
+            self._scanning -= 1
+            if not self._scanning:
+                self._during_scan.clear()
+
+    def _top_key(self) -> List[Tuple[str, int]]:
+        return [(r["username"], r["followerCount"]) for r in self._exact()[:self.k]]
+
+    def _reset(self, rows: List[Dict[str, Any]], floor: Optional[RankKey], refreshed_at: float) -> None:
+        with self._lock:
+            self.entries = {r["username"]: (r["followerCount"], r["name"]) for r in rows}
+            self.heap = [(c, u) for u, (c, _) in self.entries.items()]
+            heapq.heapify(self.heap)
+            self.floor = floor
+            self.refreshed_at = refreshed_at
+            self._sorted = None
+
+    def load(self) -> bool:
+        """Adopts the persisted seed if it is still fresh. Returns True on success."""
+        recs = self.client.read(LOAD_CYPHER, {"name": self.name})
+        if not recs or recs[0]["usernames"] is None:
+            return False
+        r = recs[0]
+        if r["capacity"] != self.capacity or time.time() - r["refreshedAt"] > self.max_age:
+            return False
+        rows = [{"username": u, "name": n, "followerCount": c} for u, n, c in zip(r["usernames"], r["names"], r["counts"])]
+        floor = (-r["floorCount"], r["floorUsername"]) if r["floorUsername"] is not None else None
+        with self._lock:
+            self._reset(rows, floor, r["refreshedAt"])
+            self._saved_top = self._top_key()
+        return True
+
+    def save(self) -> None:
+        with self._lock:
+            items = list(self.entries.items())
+            floor = self.floor
+            refreshed_at = self.refreshed_at
+        self.client.write(SAVE_CYPHER, {
+            "name": self.name,
+            "usernames": [u for u, _ in items],
+            "names": [n for _, (_, n) in items],
+            "counts": [c for _, (c, _) in items],
+            "floorCount": -floor[0] if floor else None,
+            "floorUsername": floor[1] if floor else None,
+            "capacity": self.capacity,
+            "refreshedAt": refreshed_at,
+        })
+
+    # -- incremental updates -------------------------------------------------
+
+    def on_change(self, dst: str, name: str, followerCount: int, **_: Any) -> None:
+        with self._lock:
+            if self._scanning:
+                self._during_scan.append({"dst": dst, "name": name, "followerCount": followerCount})
+            self._apply(dst, name, followerCount)
+
+    def _apply(self, dst: str, name: str, followerCount: int) -> None:
+        # followerCount is the committed absolute value, so replays and races converge
+        key = (-followerCount, dst)
+        with self._lock:
+            if dst not in self.entries and self.floor is not None and key > self.floor:
+                return  # still ranked below an untracked user; nothing to do
+            self.entries[dst] = (followerCount, name)
+            heapq.heappush(self.heap, (followerCount, dst))
+            while len(self.entries) > self.capacity:
+                c, u = heapq.heappop(self.heap)
+                if self.entries.get(u, (None,))[0] != c:
+                    continue  # stale heap entry
+                del self.entries[u]
+                evicted = (-c, u)
+                self.floor = evicted if self.floor is None else min(self.floor, evicted)
+            if len(self.heap) > 4 * self.capacity:
+                self.heap = [(c, u) for u, (c, _) in self.entries.items()]
+                heapq.heapify(self.heap)
+            self._sorted = None
+
+    # -- reads ---------------------------------------------------------------
+
+    def top(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        limit = self.k if limit is None else limit
+        if not self._loaded:
+            self._loaded = True
+            if self.persist:
+                self.load()
+        if time.time() - self.refreshed_at > self.max_age:
+            self.refresh()
+        rows = self._exact()
+        if len(rows) < limit and self.floor is not None:
+            self.refresh()
+            rows = self._exact()
+        return rows[:limit]
+
+    def _exact(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            if self._sorted is None:
+                ranked = sorted(self.entries.items(), key=lambda kv: (-kv[1][0], kv[0]))
+                self._sorted = [
+                    {"username": u, "name": n, "followerCount": c}
+                    for u, (c, n) in ranked
+                    if self.floor is None or (-c, u) < self.floor
+                ]
+            return self._sorted
@@ -0,0 +1,218 @@
+from __future__ import annotations
+import time
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from neo4j.exceptions import Neo4jError
+from app.neo4j_client import Neo4jClient, is_timeout
+from app.utils.validators import is_valid_username
+
+# UC-12 degrees of separation: a bidirectional BFS run from the client. The
+# source side walks FOLLOWS forwards and the target side backwards, one level
+# at a time, and each step expands the side whose frontier has fewer edges to
+# read (the maintained counters). A level is fetched with one UNWIND read per
+# `batch_size` frontier nodes, never one query per node. Nodes are addressed
+# by uid so batches stay integer lists.
+ENDPOINTS_CYPHER = """
+UNWIND $usernames AS name
+MATCH (u:User {username: name})
+WHERE u.uid IS NOT NULL
+RETURN u.username AS username, u.uid AS uid,
+       coalesce(u.followingCount, 0) AS following, coalesce(u.followerCount, 0) AS followers
+"""
+
+# `degree` is each neighbour's count in the same direction: the cost of expanding it next
+FOLLOWING_LEVEL_CYPHER = """
+UNWIND $ids AS id
+MATCH (:User {uid: id})-[:FOLLOWS]->(v:User)
+WHERE v.uid IS NOT NULL
+RETURN id AS parent, collect(v.uid) AS next, collect(coalesce(v.followingCount, 0)) AS degree
+"""
+
+FOLLOWERS_LEVEL_CYPHER = """
+UNWIND $ids AS id
+MATCH (:User {uid: id})<-[:FOLLOWS]-(v:User)
+WHERE v.uid IS NOT NULL
+RETURN id AS parent, collect(v.uid) AS next, collect(coalesce(v.followerCount, 0)) AS degree
+"""
+
+PATH_USERS_CYPHER = """
+UNWIND $ids AS id
+MATCH (u:User {uid: id})
+RETURN u.uid AS uid, u.username AS username, u.name AS name
+"""
+
+DEFAULT_LIMITS = {
+    "max_depth": 6,
+    # neighbours one level may read (sum of the frontier's counters)
+    "max_frontier": 1_000_000,
+    "batch_size": 5000,
+}
+
+class Separation(NamedTuple):
+    # distance None: not connected (complete) or not found within the limits
+    distance: Optional[int]
+    paths: List[List[Dict[str, Any]]]
+    complete: bool
+    visited: int
+    queries: int
+
+# The helpers below are public so that aio.degrees_of_separation runs the same
+# search with async reads.
+class Side:
+    """One direction of the search: depth and BFS parents of every node reached."""
+    def __init__(self, root: int, degree: int, cypher: str, keep: int) -> None:
+        self.cypher = cypher
+        self.keep = keep
+        self.depth: Dict[int, int] = {root: 0}
+        self.parents: Dict[int, List[int]] = {root: []}
+        self.frontier: Dict[int, int] = {root: degree}
+        self.level = 0
+
+    @property
+    def cost(self) -> Tuple[int, int]:
+        return sum(self.frontier.values()), len(self.frontier)
+
+    def batches(self, size: int) -> List[List[int]]:
+        ids = list(self.frontier)
+        return [ids[k:k + size] for k in range(0, len(ids), size)]
+
+    def advance(self, rows: Iterable[Dict[str, Any]], other: Side) -> List[int]:
+        """
+        Takes the next level from the level query's rows. Returns the newly
+        reached nodes that `other` has already seen (possibly none).
+        """
+        level = self.level + 1
+        depth, parents = self.depth, self.parents
+        frontier: Dict[int, int] = {}
+        met: List[int] = []
+        for r in rows:
+            parent = r["parent"]
+            for v, degree in zip(r["next"], r["degree"]):
+                d = depth.get(v)
+                if d is None:
+                    depth[v] = level
+                    parents[v] = [parent]
+                    frontier[v] = degree
+                    if v in other.depth:
+                        met.append(v)
+                elif d == level and len(parents[v]) < self.keep:
+                    parents[v].append(parent)
+        self.frontier = frontier
+        self.level = level
+        return met
+
+    def chains(self, node: int) -> Iterator[List[int]]:
+        # root .. node along BFS parents
+        parents = self.parents[node]
+        if not parents:
+            yield [node]
+            return
+        for p in parents:
+            for chain in self.chains(p):
+                chain.append(node)
+                yield chain
+
+def valid_args(src: str, dst: str, k: int) -> bool:
+    return is_valid_username(src) and is_valid_username(dst) and k >= 1
+
+def make_sides(rows: List[Dict[str, Any]], src: str, dst: str, k: int) -> Optional[Tuple[Side, Side]]:
+    ends = {r["username"]: r for r in rows}
+    if src not in ends or dst not in ends:
+        return None
+    return (Side(ends[src]["uid"], ends[src]["following"], FOLLOWING_LEVEL_CYPHER, k),
+            Side(ends[dst]["uid"], ends[dst]["followers"], FOLLOWERS_LEVEL_CYPHER, k))
+
+def pick_side(fwd: Side, bwd: Side, caps: Dict[str, int]) -> Tuple[Optional[Side], Optional[Side], bool]:
+    """
+    The side to expand next and the other one, or (None, None, complete) when
+    the search is over: complete=True if a side ran out of nodes (not
+    connected), False if a limit stops it.
+    """
+    if not fwd.frontier or not bwd.frontier:
+        return None, None, True
+    if fwd.level + bwd.level >= caps["max_depth"]:
+        return None, None, False
+    side, other = (fwd, bwd) if fwd.cost <= bwd.cost else (bwd, fwd)
+    if side.cost[0] > caps["max_frontier"]:
+        return None, None, False
+    return side, other, True
+
+def shortest_chains(fwd: Side, bwd: Side, met: List[int], k: int) -> Tuple[int, List[List[int]]]:
+    distance = min(fwd.depth[m] + bwd.depth[m] for m in met)
+
+    def gen() -> Iterator[List[int]]:
+        for m in met:
+            if fwd.depth[m] + bwd.depth[m] != distance:
+                continue
+            for head in fwd.chains(m):
+                for tail in bwd.chains(m):
+                    yield head + tail[-2::-1]
+    return distance, list(islice(gen(), k))
+
+def path_ids(chains: List[List[int]]) -> List[int]:
+    return sorted({n for chain in chains for n in chain})
+
+def named_paths(chains: List[List[int]], rows: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    users = {r["uid"]: {"username": r["username"], "name": r["name"]} for r in rows}
+    return [[users[n] for n in chain] for chain in chains]
+
+class OutOfTime(Exception):
+    pass
+
+def remaining_time(deadline: Optional[float]) -> Optional[float]:
+    # seconds left for the next query (None: no budget)
+    if deadline is None:
+        return None
+    left = deadline - time.monotonic()
+    if left <= 0.001:
+        raise OutOfTime()
+    return left
+
+def _level(client: Neo4jClient, side: Side, batch_size: int, deadline: Optional[float]) -> List[Dict[str, Any]]:
+    rows: List[Dict[str, Any]] = []
+    for ids in side.batches(batch_size):
+        try:
+            rows.extend(client.read(side.cypher, {"ids": ids}, timeout=remaining_time(deadline)))
+        except Neo4jError as e:
+            if not is_timeout(e):
+                raise
+            raise OutOfTime() from e
+    return rows
+
+def shortest_paths(client: Neo4jClient, src: str, dst: str, k: int = 1, budget: Optional[float] = 2.0,
+                   **limits: int) -> Separation:
+    """
+    UC-12: distance from `src` to `dst` along FOLLOWS and up to `k` shortest
+    follow-chains (all of that length), each a list of {username, name}.
+    Gives up (complete=False) past `max_depth` hops, before a level that
+    would read more than `max_frontier` neighbours, or after `budget`
+    seconds. Keyword overrides for DEFAULT_LIMITS are accepted.
+    """
+    caps = dict(DEFAULT_LIMITS, **limits)
+    if not valid_args(src, dst, k):
+        return Separation(None, [], True, 0, 0)
+    deadline = time.monotonic() + budget if budget is not None else None
+    queries = 1
+    sides = make_sides(client.read(ENDPOINTS_CYPHER, {"usernames": [src, dst]}), src, dst, k)
+    if sides is None:
+        return Separation(None, [], True, 0, queries)
+    fwd, bwd = sides
+    met = list(fwd.frontier) if src == dst else []
+    complete = True
+    while not met:
+        side, other, complete = pick_side(fwd, bwd, caps)
+        if side is None:
+            break
+        batches = -(-len(side.frontier) // caps["batch_size"])
+        try:
+            met = side.advance(_level(client, side, caps["batch_size"], deadline), other)
+        except OutOfTime:
+            complete = False
+            break
+        queries += batches
+    visited = len(fwd.depth) + len(bwd.depth)
+    if not met:
+        return Separation(None, [], complete, visited, queries)
+    distance, chains = shortest_chains(fwd, bwd, met, k)
+    rows = client.read(PATH_USERS_CYPHER, {"ids": path_ids(chains)})
+    return Separation(distance, named_paths(chains, rows), True, visited, queries + 1)
@@ -0,0 +1,212 @@
+from __future__ import annotations
+import math, time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from neo4j.exceptions import Neo4jError
+from app.neo4j_client import Neo4jClient, is_timeout
+from app.utils.validators import is_valid_username
+
+# UC-9 candidate generation with bounded work.
+#  - at most $max_friends of my followees are expanded
+#  - a followee following more than $supernode_degree accounts is a supernode:
+#    only $supernode_sample of its follows are read (0 skips it entirely)
+#  - every other followee contributes at most $fanout follows
+#  - only the best $max_candidates by (mutuals, Adamic-Adar) leave the server
+# Adamic-Adar weighs each shared followee by 1/log(its degree), using the
+# maintained counters instead of counting relationships. pagerank and
+# community come from app/jobs/analytics.py (absent until it has run).
+CANDIDATES_CYPHER = """
+MATCH (me:User {username: $u})
+CALL {
+  WITH me
+  MATCH (me)-[:FOLLOWS]->(friend:User)
+  RETURN friend
+  LIMIT $max_friends
+}
+CALL {
+  WITH friend
+  WITH friend WHERE coalesce(friend.followingCount, 0) <= $supernode_degree
+  MATCH (friend)-[:FOLLOWS]->(rec:User)
+  RETURN rec
+  LIMIT $fanout
+  UNION
+  WITH friend
+  WITH friend WHERE coalesce(friend.followingCount, 0) > $supernode_degree AND $supernode_sample > 0
+  MATCH (friend)-[:FOLLOWS]->(rec:User)
+  RETURN rec
+  LIMIT $supernode_sample
+}
+WITH me, friend, rec
+WHERE rec <> me AND NOT (me)-[:FOLLOWS]->(rec)
+WITH me, rec, count(friend) AS mutuals,
+     sum(1.0 / log(2.0 + coalesce(friend.followingCount, 0) + coalesce(friend.followerCount, 0))) AS adamicAdar
+ORDER BY mutuals DESC, adamicAdar DESC, rec.username ASC
+LIMIT $max_candidates
+RETURN rec.username AS username, rec.name AS name, mutuals, adamicAdar,
+       coalesce(rec.followerCount, 0) AS followers, coalesce(me.followingCount, 0) AS myFollowing,
+       coalesce(rec.pagerank, 0.0) AS pagerank, coalesce(rec.community = me.community, false) AS sameCommunity
+"""
+
+DEFAULT_LIMITS = {
+    "max_friends": 500,
+    "fanout": 200,
+    "supernode_degree": 5000,
+    "supernode_sample": 50,
+    "max_candidates": 500,
+}
+
+# Used when the first attempt runs out of time: skip supernodes, expand less.
+FALLBACK_LIMITS = {
+    "max_friends": 100,
+    "fanout": 50,
+    "supernode_degree": 5000,
+    "supernode_sample": 0,
+    "max_candidates": 200,
+}
+
+# Large enough to never cap anything: used to compute the exact answer.
+EXACT_LIMITS = {k: 2**62 for k in DEFAULT_LIMITS}
+
+Scorer = Callable[[Dict[str, Any]], float]
+
+def score_mutuals(c: Dict[str, Any]) -> float:
+    return float(c["mutuals"])
+
+def score_adamic_adar(c: Dict[str, Any]) -> float:
+    return float(c["adamicAdar"])
+
+def score_jaccard(c: Dict[str, Any]) -> float:
+    # |my followees ∩ rec's followers| / |my followees ∪ rec's followers|
+    union = c["myFollowing"] + c["followers"] - c["mutuals"]
+    return c["mutuals"] / union if union > 0 else 0.0
+
+def score_pagerank(c: Dict[str, Any]) -> float:
+    # mutuals, boosted for influential candidates (pagerank 1.0 = average user)
+    return c["mutuals"] * (1.0 + math.log1p(c.get("pagerank") or 0.0))
+
+def score_community(c: Dict[str, Any]) -> float:
+    # mutuals, doubled for candidates in my label-propagation community
+    return c["mutuals"] * (2.0 if c.get("sameCommunity") else 1.0)
+
+SCORERS: Dict[str, Scorer] = {
+    "mutuals": score_mutuals,
+    "adamic_adar": score_adamic_adar,
+    "jaccard": score_jaccard,
+    "pagerank": score_pagerank,
+    "community": score_community,
+}
+
+def register_scorer(name: str, fn: Scorer) -> None:
+    SCORERS[name] = fn
+
+def rank(candidates: List[Dict[str, Any]], scorer: str = "mutuals", limit: int = 10) -> List[Dict[str, Any]]:
+    fn = SCORERS[scorer]
+    out = []
+    for c in candidates:
+        out.append({"username": c["username"], "name": c["name"], "mutuals": c["mutuals"],
+                    "followers": c["followers"], "score": fn(c)})
+    out.sort(key=lambda r: (-r["score"], -r["followers"], r["username"]))
+    return out[:limit]
+
+# attempts and parse_stored are shared with the async version (app/services/aio.py)
+def attempts(username: str, scorer: str, exact: bool, limits: Dict[str, int]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    # parameters for the first attempt and for the cheaper fallback
+    if scorer not in SCORERS:
+        raise ValueError(f"Unknown scorer {scorer!r}; choose from {', '.join(SCORERS)}")
+    caps = dict(EXACT_LIMITS if exact else DEFAULT_LIMITS, **limits)
+    fallback = dict(FALLBACK_LIMITS, u=username)
+    for k, v in caps.items():
+        fallback[k] = min(fallback[k], v)
+    return dict(caps, u=username), fallback
+
+def recommend(client: Neo4jClient, username: str, limit: int = 10, scorer: str = "mutuals",
+              budget: Optional[float] = 2.0, exact: bool = False, **limits: int) -> List[Dict[str, Any]]:
+    """
+    UC-9 with bounded work. `budget` (seconds) is a hard per-request bound: 70% goes to
+    the normal caps, the rest to a cheaper retry without supernodes; if both time out
+    the result is empty. `exact=True` lifts all caps (for small graphs / evaluation).
+    Keyword overrides for DEFAULT_LIMITS are accepted.
+    """
+    if not is_valid_username(username):
+        return []
+    params, fallback = attempts(username, scorer, exact, limits)
+    if budget is None:
+        return rank(client.read(CANDIDATES_CYPHER, params), scorer, limit)
+    deadline = time.monotonic() + budget
+    try:
+        return rank(client.read(CANDIDATES_CYPHER, params, timeout=budget * 0.7), scorer, limit)
+    except Neo4jError as e:
+        if not is_timeout(e):
+            raise
+    remaining = deadline - time.monotonic()
+    if remaining <= 0.01:
+        return []
+    try:
+        return rank(client.read(CANDIDATES_CYPHER, fallback, timeout=remaining), scorer, limit)
+    except Neo4jError as e:
+        if not is_timeout(e):
+            raise
+        return []
+
+# Stored results are used only if they were computed with the same scorer, are
+# newer than $max_age seconds and none of my own follows changed since.
+PRECOMPUTED_CYPHER = """
+MATCH (me:User {username: $u})
+WHERE me.recsComputedAt >= datetime() - duration({seconds: $max_age})
+  AND me.recsScorer = $scorer AND me.recsTop >= $limit
+  AND (me.followsUpdatedAt IS NULL OR me.followsUpdatedAt <= me.recsComputedAt)
+OPTIONAL MATCH (me)-[r:RECOMMENDED]->(rec:User)
+WHERE NOT (me)-[:FOLLOWS]->(rec)
+WITH me, r, rec
+ORDER BY r.rank ASC
+RETURN me.recsComputedAt AS computedAt,
+       collect({username: rec.username, name: rec.name, mutuals: r.mutuals,
+                followers: coalesce(rec.followerCount, 0), score: r.score})[..$limit] AS recs
+"""
+
+STORE_CYPHER = """
+UNWIND $rows AS row
+MATCH (me:User {username: row.username})
+CALL {
+  WITH me
+  MATCH (me)-[old:RECOMMENDED]->()
+  DELETE old
+}
+CALL {
+  WITH me, row
+  UNWIND row.recs AS r
+  MATCH (rec:User {username: r.username})
+  CREATE (me)-[:RECOMMENDED {rank: r.rank, score: r.score, mutuals: r.mutuals}]->(rec)
+}
+SET me.recsComputedAt = row.computedAt, me.recsScorer = row.scorer, me.recsTop = row.top
+"""
+
+def precomputed(client: Neo4jClient, username: str, limit: int = 10, scorer: str = "mutuals",
+                max_age: float = 24 * 3600) -> Optional[List[Dict[str, Any]]]:
+    """
+    Returns the stored UC-9 results for `username`, or None if they are missing or stale.
+    """
+    return parse_stored(client.read(PRECOMPUTED_CYPHER, {"u": username, "scorer": scorer, "max_age": int(max_age), "limit": limit}))
+
+def parse_stored(recs: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
+    if not recs:
+        return None
+    return [r for r in recs[0]["recs"] if r["username"] is not None]
+
+def store(client: Neo4jClient, results: List[Dict[str, Any]], scorer: str, top: int, computed_at: Any) -> int:
+    """
+    Replaces the RECOMMENDED relationships of each user in one UNWIND write.
+    `results` items: {"username": ..., "recs": rank(..., limit=top) output}.
+    """
+    rows = [{
+        "username": r["username"], "scorer": scorer, "top": top, "computedAt": computed_at,
+        "recs": [{"username": x["username"], "rank": i, "score": x["score"], "mutuals": x["mutuals"]}
+                 for i, x in enumerate(r["recs"])],
+    } for r in results]
+    return client.write_many(STORE_CYPHER, rows, batch_size=len(rows) or 1)
+
+def overlap_at_k(approx: List[Dict[str, Any]], exact: List[Dict[str, Any]]) -> float:
+    """Share of the exact top-k that the bounded answer also returns."""
+    if not exact:
+        return 1.0
+    want = {r["username"] for r in exact}
+    return len(want & {r["username"] for r in approx}) / len(want)
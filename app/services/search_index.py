@@ -0,0 +1,237 @@
+from __future__ import annotations
+import bisect, heapq, threading, unicodedata
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+import numpy as np
+
+from app import events
+from app.neo4j_client import Neo4jClient
+
+INDEX_USERS_CYPHER = """
+MATCH (u:User)
+RETURN u.username AS username, u.name AS name, coalesce(u.followerCount, 0) AS followerCount
+"""
+
+def normalize(text: str) -> str:
+    """Case-folded, accents stripped, whitespace collapsed: 'Žilina  Nováková' -> 'zilina novakova'."""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return " ".join("".join(c for c in decomposed if not unicodedata.combining(c)).split())
+
+def index_keys(username: str, name: Optional[str]) -> Set[str]:
+    # the username, the full name, and the name from each later word on ("novakova")
+    keys = {normalize(username)}
+    words = normalize(name or "").split()
+    for k in range(len(words)):
+        keys.add(" ".join(words[k:]))
+    keys.discard("")
+    return keys
+
+class _Segment:
+    """
+    Sorted (key, user id) entries plus the max follower count per block of
+    `block` entries. Block maxima are upper bounds: counts only ever raise them,
+    so a block whose bound is below the current k-th best can be skipped.
+    """
+    def __init__(self, entries: List[Tuple[str, int]], followers: np.ndarray, block: int) -> None:
+        entries.sort()
+        self.keys = [k for k, _ in entries]
+        self.owner = np.fromiter((i for _, i in entries), dtype=np.int32, count=len(entries))
+        self.block = block
+        nb = -(-len(entries) // block)
+        counts = followers[self.owner] if len(entries) else np.zeros(0, dtype=np.int64)
+        padded = np.full(nb * block, -1, dtype=np.int64)
+        padded[:len(counts)] = counts
+        self.bound = padded.reshape(nb, block).max(axis=1) if nb else np.zeros(0, dtype=np.int64)
+        # positions of each user's entries, to raise the bounds on follower changes
+        order = np.argsort(self.owner, kind="stable")
+        self.pos = order.astype(np.int64)
+        self.pos_off = np.zeros(len(followers) + 1, dtype=np.int64)
+        if len(entries):
+            np.cumsum(np.bincount(self.owner, minlength=len(followers)), out=self.pos_off[1:])
+
+    def range(self, prefix: str) -> Tuple[int, int]:
+        lo = bisect.bisect_left(self.keys, prefix)
+        # "\U0010ffff" sorts after every character that can follow the prefix
+        return lo, bisect.bisect_left(self.keys, prefix + "\U0010ffff", lo)
+
+    def raise_bound(self, i: int, count: int) -> None:
+        if i + 1 >= len(self.pos_off):
+            return
+        blocks = self.pos[self.pos_off[i]:self.pos_off[i + 1]] // self.block
+        if len(blocks):
+            np.maximum.at(self.bound, blocks, count)
+
+class PrefixIndex:
+    """
+    Typeahead for UC-10: users whose normalized username, full name or a later
+    name word starts with the query, ranked by followerCount (then username).
+    A block is skipped once its bound cannot beat the k-th best, so among
+    users tied at the cut-off the ones found first win.
+
+    One streaming read (read_iter) builds a large sorted segment. Registrations
+    and renames published as events go into a small overlay segment; the
+    renamed user's old entries are hidden. The index is rebuilt from its own
+    state once the overlay outgrows `overlay_max` entries. Follow/unfollow
+    events carry the committed follower count, which updates the ranking in
+    place. Writes made by other processes show up after the next refresh().
+    """
+    def __init__(self, client: Neo4jClient, block: int = 512, overlay_max: int = 4096, fetch_size: int = 10_000) -> None:
+        self.client = client
+        self.block = block
+        self.overlay_max = overlay_max
+        self.fetch_size = fetch_size
+        self._lock = threading.RLock()
+        self._built = False
+        self._reset([], [], [])
+        for kind in ("user_registered", "profile_updated"):
+            events.subscribe(kind, self.on_profile)
+        for kind in ("followed", "unfollowed"):
+            events.subscribe(kind, self.on_follow)
+
+    def close(self) -> None:
+        for kind in ("user_registered", "profile_updated"):
+            events.unsubscribe(kind, self.on_profile)
+        for kind in ("followed", "unfollowed"):
+            events.unsubscribe(kind, self.on_follow)
+
+    def __len__(self) -> int:
+        return len(self.usernames)
+
+    # -- building ------------------------------------------------------------
+
+    def refresh(self) -> None:
+        """Rebuilds from a full streaming read of the users."""
+        self.load(self.client.read_iter(INDEX_USERS_CYPHER, fetch_size=self.fetch_size))
+
+    def load(self, rows: Iterable[Dict[str, Any]]) -> None:
+        """Rebuilds from rows shaped like INDEX_USERS_CYPHER's (username, name, followerCount)."""
+        usernames: List[str] = []
+        names: List[Optional[str]] = []
+        counts: List[int] = []
+        for r in rows:
+            usernames.append(r["username"])
+            names.append(r["name"])
+            counts.append(r["followerCount"])
+        self._reset(usernames, names, counts)
+        self._built = True
+
+    def _reset(self, usernames: List[str], names: List[Optional[str]], counts: Iterable[int]) -> None:
+        followers = np.fromiter(counts, dtype=np.int64, count=len(usernames))
+        entries = [(k, i) for i, (u, n) in enumerate(zip(usernames, names)) for k in index_keys(u, n)]
+        base = _Segment(entries, followers, self.block)
+        with self._lock:
+            self.usernames = usernames
+            self.names = names
+            self.ids = {u: i for i, u in enumerate(usernames)}
+            self.followers = followers
+            self.base = base
+            self.hidden: Set[int] = set()
+            self.extra: Dict[int, Set[str]] = {}
+            self.overlay = _Segment([], followers, self.block)
+
+    def _compact(self) -> None:
+        # fold the overlay in: rebuild from the current users, names and counts
+        self._reset(list(self.usernames), list(self.names), self.followers[:len(self.usernames)].tolist())
+
+    # -- incremental updates -------------------------------------------------
+
+    def on_profile(self, username: str, name: Optional[str] = None, **_: Any) -> None:
+        with self._lock:
+            i = self.ids.get(username)
+            if i is None:
+                i = len(self.usernames)
+                self.usernames.append(username)
+                self.names.append(name)
+                self.ids[username] = i
+                if i >= len(self.followers):
+                    self.followers = np.concatenate((self.followers, np.zeros(max(i + 1, 1024), dtype=np.int64)))
+            else:
+                self.names[i] = name
+            self.hidden.add(i)
+            self.extra[i] = index_keys(username, name)
+            self._rebuild_overlay()
+
+    def _rebuild_overlay(self) -> None:
+        entries = [(k, i) for i, keys in self.extra.items() for k in keys]
+        if len(entries) > self.overlay_max:
+            self._compact()
+            return
+        self.overlay = _Segment(entries, self.followers, self.block)
+
+    def on_follow(self, dst: str, followerCount: int, **_: Any) -> None:
+        # followerCount is the committed absolute value, so replays and races converge
+        with self._lock:
+            i = self.ids.get(dst)
+            if i is None:
+                return
+            self.followers[i] = followerCount
+            self.base.raise_bound(i, followerCount)
+            self.overlay.raise_bound(i, followerCount)
+
+    # -- reads ---------------------------------------------------------------
+
+    def search(self, q: str, limit: int = 25) -> List[Dict[str, Any]]:
+        prefix = normalize(q)
+        if not prefix or limit <= 0:
+            return []
+        if not self._built:
+            self.refresh()
+        with self._lock:
+            top = _TopK(limit, self.followers)
+            hidden = np.fromiter(self.hidden, dtype=np.int32, count=len(self.hidden)) if self.hidden else None
+            top.collect(self.base, prefix, hidden)
+            top.collect(self.overlay, prefix, None)
+            best = top.best
+            ranked = heapq.nsmallest(limit, best, key=lambda i: (-best[i], self.usernames[i]))
+            return [{"username": self.usernames[i], "name": self.names[i], "followerCount": best[i]} for i in ranked]
+
+class _TopK:
+    """The `limit` distinct users with the most followers seen so far, and the count to beat."""
+    def __init__(self, limit: int, followers: np.ndarray) -> None:
+        self.limit = limit
+        self.followers = followers
+        self.best: Dict[int, int] = {}
+        self._heap: List[int] = []
+
+    @property
+    def kth(self) -> int:
+        return self._heap[0] if len(self._heap) >= self.limit else -1
+
+    def take(self, seg: _Segment, a: int, b: int, hidden: Optional[np.ndarray]) -> None:
+        owners = seg.owner[a:b]
+        if hidden is not None:
+            owners = owners[~np.isin(owners, hidden)]
+        counts = self.followers[owners]
+        k = self.limit
+        if len(owners) > k:
+            keep = np.argpartition(counts, len(counts) - k)[len(counts) - k:]
+            if len(set(owners[keep].tolist())) < k:
+                # one user under several keys in the slice: rank distinct users
+                owners, first = np.unique(owners, return_index=True)
+                counts = counts[first]
+                keep = np.argpartition(counts, len(counts) - k)[len(counts) - k:] if len(owners) > k else slice(None)
+            owners, counts = owners[keep], counts[keep]
+        for i, c in zip(owners.tolist(), counts.tolist()):
+            if i in self.best:
+                continue
+            self.best[i] = c
+            if len(self._heap) < k:
+                heapq.heappush(self._heap, c)
+            elif c > self._heap[0]:
+                heapq.heapreplace(self._heap, c)
+
+    def collect(self, seg: _Segment, prefix: str, hidden: Optional[np.ndarray]) -> None:
+        lo, hi = seg.range(prefix)
+        if hi - lo <= 4 * seg.block:
+            if hi > lo:
+                self.take(seg, lo, hi, hidden)
+            return
+        # ragged ends directly, then whole blocks by descending bound until none can beat the k-th best
+        first, last = -(-lo // seg.block), hi // seg.block
+        self.take(seg, lo, first * seg.block, hidden)
+        self.take(seg, last * seg.block, hi, hidden)
+        bounds = seg.bound[first:last]
+        for k in np.argsort(-bounds, kind="stable").tolist():
+            if bounds[k] <= self.kth:
+                break
+            b = first + k
+            self.take(seg, b * seg.block, (b + 1) * seg.block, hidden)
@@ -1,34 +1,90 @@
 from __future__ import annotations
-from typing import List, Dict, Any
+import logging, re
+from typing import TYPE_CHECKING, List, Dict, Any, Optional
+from neo4j.exceptions import Neo4jError
 from app.neo4j_client import Neo4jClient
 
-def search_users(client: Neo4jClient, q: str, limit: int = 25) -> List[Dict[str, Any]]:
+if TYPE_CHECKING:
+    from app.services.leaderboard import Leaderboard
+    from app.services.search_index import PrefixIndex
+
+log = logging.getLogger(__name__)
+
+# followerCount is maintained on write; the range index serves the ordering
+POPULAR_CYPHER = """
+MATCH (u:User)
+WHERE u.followerCount IS NOT NULL
+RETURN u.username AS username, u.name AS name, u.followerCount AS followerCount
+ORDER BY u.followerCount DESC, username ASC
+LIMIT $limit
+"""
+
+# written in bulk by app/jobs/analytics.py (1.0 = average user); range index user_pagerank
+POPULAR_PAGERANK_CYPHER = """
+MATCH (u:User)
+WHERE u.pagerank IS NOT NULL
+RETURN u.username AS username, u.name AS name, coalesce(u.followerCount, 0) AS followerCount,
+       u.pagerank AS pagerank
+ORDER BY u.pagerank DESC, username ASC
+LIMIT $limit
+"""
+
+SEARCH_FULLTEXT_CYPHER = """
+CALL db.index.fulltext.queryNodes('user_fulltext', $q)
+YIELD node, score
+RETURN node.username AS username, node.name AS name, score
+ORDER BY score DESC
+LIMIT $limit
+"""
+
+SEARCH_CONTAINS_CYPHER = """
+MATCH (u:User)
+WHERE toLower(u.username) CONTAINS toLower($q) OR toLower(u.name) CONTAINS toLower($q)
+RETURN u.username AS username, u.name AS name
+ORDER BY username
+LIMIT $limit
+"""
+
+# every character with a meaning in Lucene query syntax
+_LUCENE_SPECIAL = re.compile(r'([+\-&|!(){}\[\]^"~*?:\\/])')
+
+def fulltext_query(q: str) -> str:
+    """
+    Raw input as a Lucene query that always parses: every term escaped and
+    required, the last one matched as a prefix for typeahead. Lower-casing
+    keeps AND/OR/NOT typed by users from acting as operators.
+    """
+    terms = [_LUCENE_SPECIAL.sub(r"\\\1", w) for w in q.lower().split()]
+    if not terms:
+        return ""
+    terms[-1] += "*"
+    return " AND ".join(terms)
+
+def search_users(client: Neo4jClient, q: str, limit: int = 25, index: Optional[PrefixIndex] = None) -> List[Dict[str, Any]]:
     # UC-10: Search Users
-    # use fulltext index if available
+    # prefix index in process if given, else the fulltext index with escaped input
+    if index is not None:
+        return index.search(q, limit)
+    query = fulltext_query(q)
+    if not query:
+        return []
     try:
-        return client.read("""
-            CALL db.index.fulltext.queryNodes('user_fulltext', $q)
-            YIELD node, score
-            RETURN node.username AS username, node.name AS name, score
-            ORDER BY score DESC
-            LIMIT $limit
-        """, {"q": q, "limit": limit})
-    except Exception:
-        return client.read("""
-            MATCH (u:User)
-            WHERE toLower(u.username) CONTAINS toLower($q) OR toLower(u.name) CONTAINS toLower($q)
-            RETURN u.username AS username, u.name AS name
-            ORDER BY username
-            LIMIT $limit
-        """, {"q": q, "limit": limit})
-
-def popular_users(client: Neo4jClient, limit: int = 10) -> List[Dict[str, Any]]:
+        return client.read(SEARCH_FULLTEXT_CYPHER, {"q": query, "limit": limit})
+    except Neo4jError as e:
+        # only a missing user_fulltext index should get here: the scan reads every user
+        log.warning("fulltext search failed (%s); falling back to a label scan", e.code)
+        return client.read(SEARCH_CONTAINS_CYPHER, {"q": q, "limit": limit})
+
+RANKINGS = ("followers", "pagerank")
+
+def popular_users(client: Neo4jClient, limit: int = 10, leaderboard: Optional[Leaderboard] = None,
+                  rank_by: str = "followers") -> List[Dict[str, Any]]:
     # UC-11: Explore Popular Users
-    return client.read("""
-        MATCH (u:User)
-        OPTIONAL MATCH (u)<-[:FOLLOWS]-(:User)
-        WITH u, count(*) AS followerCount
-        RETURN u.username AS username, u.name AS name, followerCount
-        ORDER BY followerCount DESC, username ASC
-        LIMIT $limit
-    """, {"limit": limit})
+    # rank_by="pagerank" needs a prior analytics run; raw follower counts are easy to game
+    if rank_by not in RANKINGS:
+        raise ValueError(f"Unknown ranking {rank_by!r}; choose from {', '.join(RANKINGS)}")
+    if rank_by == "pagerank":
+        return client.read(POPULAR_PAGERANK_CYPHER, {"limit": limit}, cache_tags=["popular"])
+    if leaderboard is not None and limit <= leaderboard.k:
+        return leaderboard.top(limit)
+    return client.read(POPULAR_CYPHER, {"limit": limit}, cache_tags=["popular"])
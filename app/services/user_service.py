@@ -1,23 +1,43 @@
 from __future__ import annotations
 from typing import Dict, Any, Optional, List
+from app import events
 from app.neo4j_client import Neo4jClient
 
+PROFILE_CYPHER = """
+MATCH (u:User {username: $username})
+RETURN u { .username, .name, .email, .bio, createdAt: toString(u.createdAt), updatedAt: toString(u.updatedAt) } AS user
+"""
+
+UPDATE_PROFILE_CYPHER = """
+MATCH (u:User {username: $username})
+SET u.name = coalesce($name, u.name),
+    u.bio = coalesce($bio, u.bio),
+    u.email = coalesce($email, u.email),
+    u.updatedAt = datetime()
+RETURN u { .username, .name, .email, .bio, updatedAt: toString(u.updatedAt) } AS user
+"""
+
+UIDS_CYPHER = """
+UNWIND $usernames AS name
+MATCH (u:User {username: name})
+RETURN u.username AS username, u.uid AS uid
+"""
+
+def resolve_uids(client: Neo4jClient, usernames: List[str]) -> Dict[str, int]:
+    """username -> uid for the given users, for internal calls that address users by uid."""
+    recs = client.read(UIDS_CYPHER, {"usernames": list(usernames)})
+    return {r["username"]: r["uid"] for r in recs if r["uid"] is not None}
+
 def get_profile(client: Neo4jClient, username: str) -> Optional[Dict[str, Any]]:
     # UC-3: View Profile
-    recs = client.read("""
-        MATCH (u:User {username: $username})
-        RETURN u { .username, .name, .email, .bio, createdAt: toString(u.createdAt), updatedAt: toString(u.updatedAt) } AS user
-    """, {"username": username})
+    recs = client.read(PROFILE_CYPHER, {"username": username}, cache_tags=[f"user:{username}"])
     return recs[0]["user"] if recs else None
 
 def update_profile(client: Neo4jClient, username: str, name: Optional[str] = None, bio: Optional[str] = None, email: Optional[str] = None) -> Optional[Dict[str, Any]]:
     # UC-4: Edit Profile
-    recs = client.write("""
-        MATCH (u:User {username: $username})
-        SET u.name = coalesce($name, u.name),
-            u.bio = coalesce($bio, u.bio),
-            u.email = coalesce($email, u.email),
-            u.updatedAt = datetime()
-        RETURN u { .username, .name, .email, .bio, updatedAt: toString(u.updatedAt) } AS user
-    """, {"username": username, "name": name, "bio": bio, "email": email})
-    return recs[0]["user"] if recs else None
+    recs = client.write(UPDATE_PROFILE_CYPHER, {"username": username, "name": name, "bio": bio, "email": email})
+    if not recs:
+        return None
+    user = recs[0]["user"]
+    events.publish("profile_updated", username=username, name=user["name"], email=user["email"])
+    return user
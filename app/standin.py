@@ -0,0 +1,264 @@
+from __future__ import annotations
+import asyncio, threading, time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+class StandInRecord:
+    __slots__ = ("_i",)
+    keys = ("username", "name")
+
+    def __init__(self, i: int) -> None:
+        self._i = i
+
+    def data(self) -> Dict[str, Any]:
+        return {"username": f"user{self._i:07d}", "name": f"User {self._i}"}
+
+class StandInRow(dict):
+    """A responder row; `data()` mirrors neo4j.Record.data()."""
+    def data(self) -> Dict[str, Any]:
+        return dict(self)
+
+class StandInSummary:
+    """The ResultSummary fields Instrumentation reads; server time is the per-row cost."""
+    plan = None
+    profile = None
+    counters = None
+
+    def __init__(self, server_ms: int = 0) -> None:
+        self.result_available_after = server_ms
+        self.result_consumed_after = 0
+
+class StandInResult:
+    def __init__(self, records: Optional[Iterable[Any]] = None, server_ms: int = 0) -> None:
+        # records may be a generator: like a real result, rows are produced as they are pulled
+        self._records = iter(records) if records is not None else iter(())
+        self._summary = StandInSummary(server_ms)
+
+    def __iter__(self) -> Iterator[Any]:
+        return self._records
+
+    def data(self) -> List[Dict[str, Any]]:
+        return [r.data() for r in self._records]
+
+    def consume(self) -> StandInSummary:
+        for _ in self._records:
+            pass
+        return self._summary
+
+class StandInTransaction:
+    def __init__(self, driver: "StandInDriver") -> None:
+        self.driver = driver
+
+    def run(self, cypher: str, parameters: Optional[Dict[str, Any]] = None, **kwargs: Any) -> StandInResult:
+        params = {**(parameters or {}), **kwargs}
+        server_ms = self.driver._serve(params)
+        return StandInResult(self.driver._records(cypher, params), server_ms)
+
+class StandInExplicitTransaction(StandInTransaction):
+    def __enter__(self) -> "StandInExplicitTransaction":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        return None
+
+    def commit(self) -> None:
+        return None
+
+    def rollback(self) -> None:
+        return None
+
+class StandInSession:
+    def __init__(self, driver: "StandInDriver") -> None:
+        self.driver = driver
+        self._used = False
+
+    def __enter__(self) -> "StandInSession":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def run(self, cypher: str, parameters: Optional[Dict[str, Any]] = None, **kwargs: Any) -> StandInResult:
+        self._checkout()
+        return StandInTransaction(self.driver).run(cypher, parameters, **kwargs)
+
+    def begin_transaction(self, timeout: Optional[float] = None, **kwargs: Any) -> StandInExplicitTransaction:
+        self._checkout()
+        return StandInExplicitTransaction(self.driver)
+
+    def execute_read(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        self._checkout()
+        return fn(StandInTransaction(self.driver), *args, **kwargs)
+
+    def execute_write(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        self._checkout()
+        return fn(StandInTransaction(self.driver), *args, **kwargs)
+
+    def close(self) -> None:
+        return None
+
+    def _checkout(self) -> None:
+        # the first statement of a session pays for the pool checkout / reset
+        if not self._used:
+            self._used = True
+            self.driver.sessions += 1
+            time.sleep(self.driver.session_cost)
+
+def _batch(params: Dict[str, Any]) -> Tuple[int, set]:
+    # (rows in the batch, relationship endpoints it locks)
+    if isinstance(params.get("src"), list):
+        return len(params["src"]), set(params["src"]) | set(params["dst"])
+    rows = params.get("rows") or ()
+    return len(rows), {v for r in rows if isinstance(r, dict) for k, v in r.items() if k in ("src", "dst")}
+
+class StandInDriver:
+    """
+    Latency-only stand-in for `neo4j.Driver`, used by benchmarks that need no
+    real data. Every statement costs one network round trip plus a per-row
+    server cost, and at most `server_threads` statements execute at once,
+    mimicking a database with a fixed number of cores.
+
+    Rows carrying `src`/`dst` keys (or parallel `$src`/`$dst` lists) are
+    treated as relationship writes: the driver tracks the endpoints held by
+    executing statements and counts `lock_conflicts` whenever two concurrent
+    batches would lock the same node.
+
+    `session_ms` is charged once per sync session that runs anything (pool checkout
+    and connection reset); `result_rows` makes every statement return that
+    many (username, name) records, generated lazily as they are pulled.
+    A `responder(cypher, params) -> rows` replaces those records with rows
+    shaped like the real query's, so service functions can run end to end.
+    """
+    def __init__(self, round_trip_ms: float = 2.0, per_row_us: float = 20.0, server_threads: int = 8,
+                 session_ms: float = 0.0, result_rows: int = 0,
+                 responder: Optional[Callable[[str, Dict[str, Any]], Iterable[Dict[str, Any]]]] = None) -> None:
+        self.round_trip = round_trip_ms / 1000.0
+        self.responder = responder
+        self.per_row = per_row_us / 1_000_000.0
+        self.session_cost = session_ms / 1000.0
+        self.result_rows = result_rows
+        self.sessions = 0
+        self._cores = threading.Semaphore(server_threads)
+        self._lock = threading.Lock()
+        self._held: Dict[Any, int] = {}
+        self.statements = 0
+        self.rows = 0
+        self.lock_conflicts = 0
+
+    def session(self, database: Optional[str] = None, **config: Any) -> StandInSession:
+        return StandInSession(self)
+
+    def close(self) -> None:
+        return None
+
+    def _records(self, cypher: str, params: Dict[str, Any]) -> Iterator[Any]:
+        if self.responder is not None:
+            return (StandInRow(r) for r in self.responder(cypher, params))
+        return (StandInRecord(i) for i in range(self.result_rows))
+
+    def _serve(self, params: Dict[str, Any]) -> int:
+        n, nodes = _batch(params)
+        # half the round trip is spent on the wire before the server sees it
+        time.sleep(self.round_trip / 2)
+        with self._cores:
+            self._admit(n, nodes)
+            time.sleep(self.per_row * n)
+            self._release(nodes)
+        time.sleep(self.round_trip / 2)
+        return int(self.per_row * n * 1000)
+
+    def _admit(self, n: int, nodes: set) -> None:
+        with self._lock:
+            self.statements += 1
+            self.rows += n
+            if any(v in self._held for v in nodes):
+                self.lock_conflicts += 1
+            for v in nodes:
+                self._held[v] = self._held.get(v, 0) + 1
+
+    def _release(self, nodes: set) -> None:
+        with self._lock:
+            for v in nodes:
+                if self._held[v] == 1:
+                    del self._held[v]
+                else:
+                    self._held[v] -= 1
+
+# -- asyncio flavour, for AsyncNeo4jClient -----------------------------------
+
+class AsyncStandInResult(StandInResult):
+    async def data(self) -> List[Dict[str, Any]]:
+        return [r.data() for r in self._records]
+
+    async def consume(self) -> StandInSummary:
+        return StandInResult.consume(self)
+
+class AsyncStandInTransaction:
+    def __init__(self, driver: "AsyncStandInDriver") -> None:
+        self.driver = driver
+
+    async def run(self, cypher: str, parameters: Optional[Dict[str, Any]] = None, **kwargs: Any) -> AsyncStandInResult:
+        params = {**(parameters or {}), **kwargs}
+        server_ms = await self.driver._aserve(params)
+        return AsyncStandInResult(self.driver._records(cypher, params), server_ms)
+
+class AsyncStandInExplicitTransaction(AsyncStandInTransaction):
+    async def __aenter__(self) -> "AsyncStandInExplicitTransaction":
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        return None
+
+    async def commit(self) -> None:
+        return None
+
+    async def rollback(self) -> None:
+        return None
+
+class AsyncStandInSession:
+    def __init__(self, driver: "AsyncStandInDriver") -> None:
+        self.driver = driver
+
+    async def __aenter__(self) -> "AsyncStandInSession":
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self.close()
+
+    async def run(self, cypher: str, parameters: Optional[Dict[str, Any]] = None, **kwargs: Any) -> AsyncStandInResult:
+        return await AsyncStandInTransaction(self.driver).run(cypher, parameters, **kwargs)
+
+    async def begin_transaction(self, timeout: Optional[float] = None, **kwargs: Any) -> AsyncStandInExplicitTransaction:
+        return AsyncStandInExplicitTransaction(self.driver)
+
+    async def execute_read(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        return await fn(AsyncStandInTransaction(self.driver), *args, **kwargs)
+
+    async def execute_write(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        return await fn(AsyncStandInTransaction(self.driver), *args, **kwargs)
+
+    async def close(self) -> None:
+        return None
+
+class AsyncStandInDriver(StandInDriver):
+    """StandInDriver for `neo4j.AsyncDriver` callers; same cost model, no threads."""
+    def __init__(self, round_trip_ms: float = 2.0, per_row_us: float = 20.0, server_threads: int = 8,
+                 session_ms: float = 0.0, result_rows: int = 0,
+                 responder: Optional[Callable[[str, Dict[str, Any]], Iterable[Dict[str, Any]]]] = None) -> None:
+        super().__init__(round_trip_ms, per_row_us, server_threads, session_ms, result_rows, responder)
+        self._acores = asyncio.Semaphore(server_threads)
+
+    def session(self, database: Optional[str] = None, **config: Any) -> AsyncStandInSession:
+        return AsyncStandInSession(self)
+
+    async def close(self) -> None:
+        return None
+
+    async def _aserve(self, params: Dict[str, Any]) -> int:
+        n, nodes = _batch(params)
+        await asyncio.sleep(self.round_trip / 2)
+        async with self._acores:
+            self._admit(n, nodes)
+            await asyncio.sleep(self.per_row * n)
+            self._release(nodes)
+        await asyncio.sleep(self.round_trip / 2)
+        return int(self.per_row * n * 1000)
@@ -1,6 +1,10 @@
 from __future__ import annotations
-import os, hashlib
-from typing import Tuple
+import asyncio, os, hashlib, threading
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import islice
+from typing import Any, Callable, Deque, Iterable, Iterator, List, Optional, Tuple, TypeVar
+from app import config
 
 try:
     import bcrypt
@@ -8,15 +12,25 @@ try:
 except Exception:
     _HAS_BCRYPT = False
 
+T = TypeVar("T")
+
+def bcrypt_rounds() -> int:
+    # BCRYPT_ROUNDS: each +1 doubles the cost of a hash (12 is ~0.3 s on one core)
+    return config.env_int("BCRYPT_ROUNDS", 12)
+
+def hash_threads() -> int:
+    # HASH_THREADS for async hashing/verification; bcrypt releases the GIL, so one per core
+    return config.env_int("HASH_THREADS", 0) or (os.cpu_count() or 1)
+
 def _random_bytes(n: int = 16) -> bytes:
     return os.urandom(n)
 
-def hash_password(password: str) -> Tuple[str, str]:
+def hash_password(password: str, rounds: Optional[int] = None) -> Tuple[str, str]:
     """
     Returns (hash, salt). Uses bcrypt if available; otherwise salted SHA-256.
     """
     if _HAS_BCRYPT:
-        salt = bcrypt.gensalt()
+        salt = bcrypt.gensalt(rounds=rounds or bcrypt_rounds())
         hashed = bcrypt.hashpw(password.encode("utf-8"), salt)
         return hashed.decode("utf-8"), salt.decode("utf-8")
     else:
@@ -33,3 +47,58 @@ def verify_password(password: str, stored_hash: str, salt: str) -> bool:
     else:
         h = hashlib.sha256((salt + password).encode("utf-8")).hexdigest()
         return h == stored_hash
+
+# -- bulk -------------------------------------------------------------------------
+
+def _hash_chunk(passwords: List[str], rounds: Optional[int]) -> List[Tuple[str, str]]:
+    return [hash_password(p, rounds) for p in passwords]
+
+def hash_many(passwords: Iterable[str], workers: int = 1, rounds: Optional[int] = None,
+              chunk_size: int = 64) -> Iterator[Tuple[str, str]]:
+    """
+    Yields hash_password(p) for each password, in input order. With workers > 1
+    chunks are hashed by a process pool; `passwords` is consumed lazily and at
+    most 2 * workers chunks are in flight, so results can be written while the
+    pool keeps hashing.
+    """
+    it = iter(passwords)
+    if workers <= 1:
+        for p in it:
+            yield hash_password(p, rounds)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending: Deque[Future] = deque()
+        while True:
+            chunk = list(islice(it, chunk_size))
+            if chunk:
+                pending.append(pool.submit(_hash_chunk, chunk, rounds))
+            if pending and (not chunk or len(pending) >= 2 * workers):
+                yield from pending.popleft().result()
+            elif not chunk:
+                return
+
+# -- async ------------------------------------------------------------------------
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+def executor() -> ThreadPoolExecutor:
+    """
+    Shared pool of hash_threads() threads for password work from async code. A
+    dedicated pool keeps a burst of logins from occupying the loop's default
+    executor, and caps concurrent hashes at the number of cores.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=hash_threads(), thread_name_prefix="hashing")
+        return _executor
+
+async def offload(fn: Callable[..., T], *args: Any) -> T:
+    return await asyncio.get_running_loop().run_in_executor(executor(), fn, *args)
+
+async def hash_password_async(password: str, rounds: Optional[int] = None) -> Tuple[str, str]:
+    return await offload(hash_password, password, rounds)
+
+async def verify_password_async(password: str, stored_hash: str, salt: str) -> bool:
+    return await offload(verify_password, password, stored_hash, salt)
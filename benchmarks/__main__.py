@@ -0,0 +1,105 @@
+"""
+Benchmark suite for UC-1..UC-11 and the loader.
+
+    python -m benchmarks run --backend standin --scale 10k --concurrency 8 --ops 2000
+    python -m benchmarks run --backend neo4j --scale 100k --no_load --out before.json
+    python -m benchmarks compare before.json after.json --threshold 0.10
+
+`run` loads a deterministic synthetic graph (unless --no_load), drives each
+use case through the service functions and writes throughput and latency
+percentiles as JSON. `compare` exits with status 1 if any metric got worse by
+more than the threshold.
+"""
+from __future__ import annotations
+import argparse, json, os, sys
+from app.data import synthetic
+from app.instrumentation import Instrumentation
+from app.utils.hashing import hash_password
+from benchmarks import backends, runner, workload
+
+SCALES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+
+def run(args: argparse.Namespace) -> int:
+    args.users = args.users or SCALES[args.scale]
+    pw_hash, salt = hash_password(workload.BENCH_PASSWORD)
+    client = backends.make_client(args, pw_hash, salt)
+    if args.instrument:
+        client.instrumentation = Instrumentation(slow_ms=None)
+    result = {"meta": runner.metadata(args), "load": None, "uc": {}}
+    try:
+        if not args.no_load:
+            print(f"loading {args.users:,} users, avg degree {args.avg_degree} ({args.backend})...")
+            result["load"] = runner.load_graph(client, args.users, args.avg_degree, args.model, args.seed,
+                                               args.workers, args.batch_size)
+        w = workload.Workload(client, args.users)
+        w.prepare()
+        for uc, op in workload.select(args.uc).items():
+            ops, warmup = (args.auth_ops, 0) if uc in workload.HASHING else (args.ops, args.warmup)
+            result["uc"][uc] = runner.measure(op, w, uc, ops, args.concurrency, warmup, args.seed)
+            print(f"  {uc} done")
+        if client.instrumentation is not None:
+            result["queries"] = client.instrumentation.snapshot()
+    finally:
+        client.close()
+    runner.print_result(result)
+    out = args.out or os.path.join("benchmarks", "results",
+                                   f"{args.backend}-{args.scale}-{result['meta']['commit'] or 'nogit'}.json")
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    runner.save(result, out)
+    print(f"wrote {out}")
+    if args.strict and any(r["errors"] for r in result["uc"].values()):
+        print("operations failed (--strict)")
+        return 1
+    return 0
+
+def compare(args: argparse.Namespace) -> int:
+    with open(args.base, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(args.new, encoding="utf-8") as f:
+        new = json.load(f)
+    worse = runner.compare(base, new, args.threshold)
+    print(f"{base['meta'].get('commit')} -> {new['meta'].get('commit')}, threshold {args.threshold:.0%}")
+    for name, metric, b, n, change in worse:
+        print(f"REGRESSION {name:<6} {metric:<14} {b:>12,.3f} -> {n:>12,.3f} ({change:+.1%})")
+    if not worse:
+        print("no regressions")
+    return 1 if worse else 0
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="UC-1..UC-11 and loader benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    r = sub.add_parser("run", help="Load a synthetic graph and benchmark the use cases")
+    r.add_argument("--backend", choices=backends.BACKENDS, default="standin")
+    r.add_argument("--scale", choices=SCALES, default="10k")
+    r.add_argument("--users", type=int, help="Overrides --scale")
+    r.add_argument("--avg_degree", type=int, default=10)
+    r.add_argument("--model", choices=synthetic.MODELS, default="powerlaw")
+    r.add_argument("--seed", type=int, default=42)
+    r.add_argument("--no_load", action="store_true", help="Reuse a graph loaded by an earlier run")
+    r.add_argument("--workers", type=int, default=4, help="Loader write sessions")
+    r.add_argument("--batch_size", type=int, default=5000, help="Loader rows per batch")
+    r.add_argument("--uc", nargs="*", default=[], help="Use cases to run, e.g. UC-3 UC-7 (default: all)")
+    r.add_argument("--ops", type=int, default=1000, help="Measured operations per use case")
+    r.add_argument("--auth_ops", type=int, default=20, help="Measured operations for UC-1/UC-2 (password hashing)")
+    r.add_argument("--warmup", type=int, default=100, help="Unmeasured operations per use case")
+    r.add_argument("--concurrency", type=int, default=8, help="Client threads")
+    r.add_argument("--instrument", action="store_true", help="Add per-query stats to the result")
+    r.add_argument("--strict", action="store_true", help="Exit with status 1 if any operation failed")
+    r.add_argument("--out", help="Result file (default benchmarks/results/<backend>-<scale>-<commit>.json)")
+    r.add_argument("--rtt_ms", type=float, default=1.0, help="Stand-in round trip")
+    r.add_argument("--row_us", type=float, default=2.0, help="Stand-in server cost per written row")
+    r.add_argument("--server_threads", type=int, default=8, help="Stand-in concurrent statements")
+    r.set_defaults(func=run)
+
+    c = sub.add_parser("compare", help="Flag regressions between two result files")
+    c.add_argument("base")
+    c.add_argument("new")
+    c.add_argument("--threshold", type=float, default=0.10, help="Relative change that counts as a regression")
+    c.set_defaults(func=compare)
+
+    args = parser.parse_args()
+    return args.func(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
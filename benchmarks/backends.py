@@ -0,0 +1,111 @@
+"""
+Clients for the benchmark suite. `neo4j` connects with the usual .env
+settings; `memory` runs on the in-process graph of app/memory.py; `standin`
+runs offline on the latency stand-in driver, answering each service query
+with rows of the right shape for the synthetic graph (usernames s1..sN), so
+UC-1..UC-12 exercise the real service code paths plus a modelled round trip.
+"""
+from __future__ import annotations
+import argparse, zlib
+from typing import Any, Callable, Dict, List
+from app.memory import MemoryDriver
+from app.neo4j_client import Neo4jClient
+from app.standin import StandInDriver
+from app.services import (auth_service, graph_service as gs, path_service as ps, recommendation_service as rs,
+                          search_service, user_service)
+
+BACKENDS = ("neo4j", "memory", "standin")
+
+def _user(i: int) -> Dict[str, Any]:
+    return {"username": f"s{i}", "name": f"Synthetic User {i}"}
+
+class CannedResponder:
+    """
+    Answers the service Cypher with deterministic rows derived from the username
+    and parameters: `followees` rows per adjacency list, `candidates` UC-9 rows.
+    Writes report success. Unknown statements (schema, loader UNWINDs) return nothing.
+    """
+    def __init__(self, users: int, pw_hash: str, salt: str, followees: int = 10, candidates: int = 100) -> None:
+        self.users = users
+        self.pw_hash = pw_hash
+        self.salt = salt
+        self.followees = followees
+        self.candidates = candidates
+        self.handlers: Dict[str, Callable[[Dict[str, Any]], List[Dict[str, Any]]]] = {
+            auth_service.REGISTER_CYPHER: self._register,
+            auth_service.LOGIN_CYPHER: self._login,
+            user_service.PROFILE_CYPHER: self._profile,
+            user_service.UPDATE_PROFILE_CYPHER: self._profile,
+            gs.FOLLOW_CYPHER: lambda p: [{"created": True, "name": p["dst"], "followerCount": 1}],
+            gs.UNFOLLOW_CYPHER: lambda p: [{"removed": 1, "name": p["dst"], "followerCount": 0}],
+            gs.FOLLOW_MANY_CYPHER: lambda p: [{"src": r["src"], "dst": d, "created": True, "name": d, "followerCount": 1}
+                                              for r in p["rows"] for d in r["dsts"]],
+            gs.UNFOLLOW_MANY_CYPHER: lambda p: [{"src": r["src"], "dst": d, "name": d, "followerCount": 0}
+                                                for r in p["rows"] for d in r["dsts"]],
+            gs.FOLLOWING_AFTER_CYPHER: self._page,
+            gs.FOLLOWERS_AFTER_CYPHER: self._page,
+            gs.FOLLOWING_BEFORE_CYPHER: self._page,
+            gs.FOLLOWERS_BEFORE_CYPHER: self._page,
+            gs.MUTUALS_CYPHER: lambda p: self._neighbours(p["u1"])[:p["limit"]],
+            gs.MUTUALS_COUNT_CYPHER: lambda p: [{"total": self.followees}],
+            gs.MUTUALS_SAMPLE_CYPHER: lambda p: [{"total": self.followees, "sample": self._neighbours(p["u1"])[:p["limit"]]}],
+            rs.CANDIDATES_CYPHER: self._candidates,
+            ps.ENDPOINTS_CYPHER: lambda p: [{"username": u, "uid": int(u[1:]), "following": self.followees,
+                                             "followers": self.followees} for u in p["usernames"]],
+            ps.FOLLOWING_LEVEL_CYPHER: lambda p: self._level(p, "out"),
+            ps.FOLLOWERS_LEVEL_CYPHER: lambda p: self._level(p, "in"),
+            ps.PATH_USERS_CYPHER: lambda p: [dict(_user(i), uid=i) for i in p["ids"]],
+            search_service.SEARCH_FULLTEXT_CYPHER: lambda p: [dict(_user(i), score=1.0) for i in self._ids(p["q"], p["limit"])],
+            search_service.POPULAR_CYPHER: lambda p: [dict(_user(i), followerCount=1000 - i) for i in range(1, p["limit"] + 1)],
+        }
+
+    def __call__(self, cypher: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        handler = self.handlers.get(cypher)
+        return handler(params) if handler is not None else []
+
+    def _ids(self, key: str, n: int) -> List[int]:
+        # n pseudo-random, stable ids per key
+        h = zlib.crc32(key.encode("utf-8"))
+        return [(h + k * 7919) % self.users + 1 for k in range(n)]
+
+    def _neighbours(self, username: str) -> List[Dict[str, Any]]:
+        return sorted((_user(i) for i in self._ids(username, self.followees)), key=lambda r: r["username"])
+
+    def _register(self, p: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return [{"user": {"username": p["username"], "name": p["name"], "email": p["email"], "bio": p["bio"]}}]
+
+    def _login(self, p: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return [{"passwordHash": self.pw_hash, "salt": self.salt, "profile": self._profile(p)[0]["user"]}]
+
+    def _profile(self, p: Dict[str, Any]) -> List[Dict[str, Any]]:
+        u = p["username"]
+        return [{"user": {"username": u, "name": p.get("name") or u, "email": p.get("email") or f"{u}@example.com",
+                          "bio": p.get("bio") or ""}}]
+
+    def _page(self, p: Dict[str, Any]) -> List[Dict[str, Any]]:
+        rows = self._neighbours(p["u"])
+        if p.get("after"):
+            rows = [r for r in rows if r["username"] > p["after"]]
+        if p.get("before"):
+            rows = [r for r in rows if r["username"] < p["before"]][::-1]
+        return rows[:p["limit"]]
+
+    def _candidates(self, p: Dict[str, Any]) -> List[Dict[str, Any]]:
+        n = min(self.candidates, p["max_candidates"])
+        return [dict(_user(i), mutuals=n - k, adamicAdar=(n - k) / 3.0, followers=k, myFollowing=self.followees)
+                for k, i in enumerate(self._ids(p["u"] + ":rec", n))]
+
+    def _level(self, p: Dict[str, Any], direction: str) -> List[Dict[str, Any]]:
+        # canned uid i is user s<i>
+        return [{"parent": i, "next": self._ids(f"s{i}:{direction}", self.followees),
+                 "degree": [self.followees] * self.followees} for i in p["ids"]]
+
+def make_client(args: argparse.Namespace, pw_hash: str = "", salt: str = "") -> Neo4jClient:
+    if args.backend == "neo4j":
+        return Neo4jClient()
+    if args.backend == "memory":
+        return Neo4jClient(driver=MemoryDriver())
+    responder = CannedResponder(args.users, pw_hash, salt)
+    driver = StandInDriver(round_trip_ms=args.rtt_ms, per_row_us=args.row_us, server_threads=args.server_threads,
+                           responder=responder)
+    return Neo4jClient(driver=driver)
@@ -0,0 +1,130 @@
+"""
+Timing, loader measurement, result files and regression comparison for the
+benchmark suite.
+"""
+from __future__ import annotations
+import argparse, json, math, platform, random, subprocess, threading, time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+from app import schema
+from app.data.loader import SCHEMA_WAIT, USER_CYPHER, load_edges, synthetic_edge_pairs, synthetic_user_rows
+from app.neo4j_client import Neo4jClient
+from benchmarks.workload import Operation, Workload
+
+def percentile(ordered: List[float], q: float) -> float:
+    # nearest-rank on an already sorted list
+    if not ordered:
+        return 0.0
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+def load_graph(client: Neo4jClient, users: int, avg_degree: int, model: str, seed: int, workers: int,
+               batch_size: int) -> Dict[str, Any]:
+    """Writes the synthetic graph through the loader statements, timing users and edges separately."""
+    schema.ensure(client, wait=SCHEMA_WAIT)
+    t0 = time.perf_counter()
+    n = client.write_many(USER_CYPHER, synthetic_user_rows(users), batch_size=batch_size, workers=workers)
+    t1 = time.perf_counter()
+    m, created = load_edges(client, synthetic_edge_pairs(users, avg_degree, model=model, seed=seed),
+                            batch_size=batch_size, workers=workers)
+    t2 = time.perf_counter()
+    return {"users": n, "edges": m, "edges_created": created, "users_s": round(t1 - t0, 3), "edges_s": round(t2 - t1, 3),
+            "users_per_sec": round(n / max(t1 - t0, 1e-9), 1), "edges_per_sec": round(m / max(t2 - t1, 1e-9), 1)}
+
+def _drive(op: Operation, w: Workload, uc: str, seed: int, ops: int, concurrency: int,
+           lat: Optional[List[float]]) -> int:
+    # splits `ops` over `concurrency` threads; returns the error count
+    errors = [0]
+    lock = threading.Lock()
+
+    def worker(t: int) -> None:
+        rng = random.Random(f"{seed}:{uc}:{t}")
+        mine: List[float] = []
+        failed = 0
+        for i in range(t, ops, concurrency):
+            t0 = time.perf_counter()
+            try:
+                op(w, rng, i)
+            except Exception:
+                failed += 1
+                continue
+            mine.append((time.perf_counter() - t0) * 1000)
+        with lock:
+            errors[0] += failed
+            if lat is not None:
+                lat.extend(mine)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(worker, range(concurrency)))
+    return errors[0]
+
+def measure(op: Operation, w: Workload, uc: str, ops: int, concurrency: int, warmup: int, seed: int) -> Dict[str, Any]:
+    if warmup:
+        _drive(op, w, uc, seed + 1, warmup, concurrency, None)
+    lat: List[float] = []
+    t0 = time.perf_counter()
+    errors = _drive(op, w, uc, seed, ops, concurrency, lat)
+    elapsed = time.perf_counter() - t0
+    lat.sort()
+    return {
+        "ops": len(lat), "errors": errors, "seconds": round(elapsed, 3),
+        "throughput": round(len(lat) / max(elapsed, 1e-9), 1),
+        "mean_ms": round(sum(lat) / len(lat), 3) if lat else 0.0,
+        "p50_ms": round(percentile(lat, 0.50), 3), "p95_ms": round(percentile(lat, 0.95), 3),
+        "p99_ms": round(percentile(lat, 0.99), 3), "max_ms": round(lat[-1], 3) if lat else 0.0,
+    }
+
+def git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+def metadata(args: argparse.Namespace) -> Dict[str, Any]:
+    meta = {k: v for k, v in vars(args).items() if k not in ("command", "out") and not callable(v)}
+    meta.update(commit=git_commit(), python=platform.python_version(), started=time.strftime("%Y-%m-%dT%H:%M:%S"))
+    return meta
+
+def save(result: Dict[str, Any], path: str) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+        f.write("\n")
+
+def print_result(result: Dict[str, Any]) -> None:
+    load = result.get("load")
+    if load:
+        print(f"load: {load['users']:,} users at {load['users_per_sec']:,.0f}/s, "
+              f"{load['edges']:,} edges at {load['edges_per_sec']:,.0f}/s ({load['edges_created']:,} created)")
+    print(f"{'uc':<6} {'ops':>7} {'err':>5} {'ops/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for uc, r in result["uc"].items():
+        print(f"{uc:<6} {r['ops']:>7} {r['errors']:>5} {r['throughput']:>9,.1f} {r['p50_ms']:>8.2f} "
+              f"{r['p95_ms']:>8.2f} {r['p99_ms']:>8.2f}")
+
+# (metric, higher is better)
+UC_COMPARED = [("throughput", True), ("p50_ms", False), ("p95_ms", False), ("p99_ms", False)]
+LOAD_COMPARED = [("users_per_sec", True), ("edges_per_sec", True)]
+
+def compare(base: Dict[str, Any], new: Dict[str, Any], threshold: float) -> List[Tuple[str, str, float, float, float]]:
+    """
+    Returns (name, metric, base, new, relative change) for every metric that got
+    worse by more than `threshold` (0.1 = 10%). Missing use cases are skipped.
+    """
+    worse = []
+
+    def check(name: str, metric: str, b: float, n: float, higher_better: bool) -> None:
+        if not b:
+            return
+        change = (n - b) / b
+        if (-change if higher_better else change) > threshold:
+            worse.append((name, metric, b, n, change))
+
+    for uc, b in base.get("uc", {}).items():
+        n = new.get("uc", {}).get(uc)
+        if n is None:
+            continue
+        for metric, higher in UC_COMPARED:
+            check(uc, metric, b[metric], n[metric], higher)
+    if base.get("load") and new.get("load"):
+        for metric, higher in LOAD_COMPARED:
+            check("load", metric, base["load"][metric], new["load"][metric], higher)
+    return worse
@@ -0,0 +1,108 @@
+"""
+UC-1..UC-12 operations for the benchmark suite, each one call into the real
+service functions against the synthetic graph (users s1..sN). Every
+operation takes the shared Workload, a per-thread Random and an operation
+number; any exception counts as an error.
+"""
+from __future__ import annotations
+import collections, itertools, random, uuid
+from typing import Callable, Deque, Dict, List, Tuple
+from app.neo4j_client import Neo4jClient
+from app.services import auth_service, graph_service, search_service, user_service
+
+BENCH_PASSWORD = "bench-pass-1"
+
+class Workload:
+    def __init__(self, client: Neo4jClient, users: int, login_accounts: int = 5) -> None:
+        if users < 20:
+            raise ValueError("The benchmark graph needs at least 20 users")
+        self.client = client
+        self.users = users
+        self.run_id = uuid.uuid4().hex[:8]
+        self.logins = [f"bench_login_{k}" for k in range(login_accounts)]
+        self._registered = itertools.count()
+        # UC-5 follows, undone by UC-6 (deque appends/pops are atomic)
+        self.follows: Deque[Tuple[str, str]] = collections.deque()
+
+    def prepare(self) -> None:
+        """Registers the UC-2 accounts; on a reused database they already exist."""
+        for name in self.logins:
+            try:
+                auth_service.register_user(self.client, name, name, f"{name}@example.com", BENCH_PASSWORD)
+            except ValueError:
+                pass
+
+    def user(self, rng: random.Random) -> str:
+        # s1..s9 are too short for is_valid_username
+        return f"s{rng.randint(10, self.users)}"
+
+    def pair(self, rng: random.Random) -> Tuple[str, str]:
+        a = self.user(rng)
+        b = self.user(rng)
+        while b == a:
+            b = self.user(rng)
+        return a, b
+
+def register(w: Workload, rng: random.Random, i: int) -> None:
+    name = f"bench_{w.run_id}_{next(w._registered)}"
+    auth_service.register_user(w.client, name, name, f"{name}@example.com", BENCH_PASSWORD)
+
+def login(w: Workload, rng: random.Random, i: int) -> None:
+    profile, err = auth_service.login_user(w.client, rng.choice(w.logins), BENCH_PASSWORD)
+    if profile is None:
+        raise RuntimeError(err)
+
+def view_profile(w: Workload, rng: random.Random, i: int) -> None:
+    user_service.get_profile(w.client, w.user(rng))
+
+def edit_profile(w: Workload, rng: random.Random, i: int) -> None:
+    user_service.update_profile(w.client, w.user(rng), bio=f"bench {w.run_id} {i}")
+
+def follow(w: Workload, rng: random.Random, i: int) -> None:
+    a, b = w.pair(rng)
+    graph_service.follow_user(w.client, a, b)
+    w.follows.append((a, b))
+
+def unfollow(w: Workload, rng: random.Random, i: int) -> None:
+    try:
+        a, b = w.follows.popleft()
+    except IndexError:
+        a, b = w.pair(rng)
+    graph_service.unfollow_user(w.client, a, b)
+
+def connections(w: Workload, rng: random.Random, i: int) -> None:
+    page = graph_service.list_following if i % 2 == 0 else graph_service.list_followers
+    page(w.client, w.user(rng))
+
+def mutuals(w: Workload, rng: random.Random, i: int) -> None:
+    graph_service.mutual_sample(w.client, *w.pair(rng))
+
+def recommendations(w: Workload, rng: random.Random, i: int) -> None:
+    graph_service.recommend_connections(w.client, w.user(rng))
+
+def search(w: Workload, rng: random.Random, i: int) -> None:
+    search_service.search_users(w.client, w.user(rng))
+
+def popular(w: Workload, rng: random.Random, i: int) -> None:
+    search_service.popular_users(w.client, 10)
+
+def separation(w: Workload, rng: random.Random, i: int) -> None:
+    graph_service.degrees_of_separation(w.client, *w.pair(rng))
+
+Operation = Callable[[Workload, random.Random, int], None]
+
+# run in this order: UC-6 undoes the follows UC-5 made
+USE_CASES: Dict[str, Operation] = {
+    "UC-1": register, "UC-2": login, "UC-3": view_profile, "UC-4": edit_profile,
+    "UC-5": follow, "UC-6": unfollow, "UC-7": connections, "UC-8": mutuals,
+    "UC-9": recommendations, "UC-10": search, "UC-11": popular, "UC-12": separation,
+}
+
+# bound by bcrypt (~0.3 s per hash), so they get their own, smaller op count
+HASHING = ("UC-1", "UC-2")
+
+def select(names: List[str]) -> Dict[str, Operation]:
+    unknown = [n for n in names if n not in USE_CASES]
+    if unknown:
+        raise ValueError(f"Unknown use case(s) {', '.join(unknown)}; choose from {', '.join(USE_CASES)}")
+    return {k: v for k, v in USE_CASES.items() if not names or k in names}
@@ -0,0 +1,67 @@
+"""
+Home-screen throughput (profile + first Following and Followers pages) for N
+concurrent simulated users against the latency stand-in driver: the sync
+services on a thread pool vs the async services with asyncio.gather.
+
+    python -m scripts.bench_async --users 1 10 100 1000 --threads 32
+"""
+from __future__ import annotations
+import argparse, asyncio, statistics, time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple
+from app.neo4j_client import AsyncNeo4jClient, Neo4jClient
+from app.standin import AsyncStandInDriver, StandInDriver
+from app.services import aio, graph_service, user_service
+
+def sync_run(n: int, args) -> Tuple[float, List[float]]:
+    client = Neo4jClient(driver=StandInDriver(args.rtt_ms, server_threads=args.server_threads))
+    lat: List[float] = []
+
+    def simulated_user(i: int) -> None:
+        me = f"user{i + 1:05d}"
+        for _ in range(args.rounds):
+            t0 = time.perf_counter()
+            user_service.get_profile(client, me)
+            graph_service.list_following(client, me)
+            graph_service.list_followers(client, me)
+            lat.append((time.perf_counter() - t0) * 1000)
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=min(n, args.threads)) as pool:
+        list(pool.map(simulated_user, range(n)))
+    return time.perf_counter() - t0, lat
+
+async def async_run(n: int, args) -> Tuple[float, List[float]]:
+    client = AsyncNeo4jClient(driver=AsyncStandInDriver(args.rtt_ms, server_threads=args.server_threads))
+    lat: List[float] = []
+
+    async def simulated_user(i: int) -> None:
+        me = f"user{i + 1:05d}"
+        for _ in range(args.rounds):
+            t0 = time.perf_counter()
+            await aio.home(client, me)
+            lat.append((time.perf_counter() - t0) * 1000)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(simulated_user(i) for i in range(n)))
+    return time.perf_counter() - t0, lat
+
+def main():
+    parser = argparse.ArgumentParser(description="Sync vs async service throughput on the stand-in driver")
+    parser.add_argument("--users", type=int, nargs="+", default=[1, 10, 100, 1000])
+    parser.add_argument("--rounds", type=int, default=5, help="Home screens per simulated user")
+    parser.add_argument("--threads", type=int, default=32, help="Thread cap for the sync run")
+    parser.add_argument("--rtt_ms", type=float, default=2.0)
+    parser.add_argument("--server_threads", type=int, default=64)
+    args = parser.parse_args()
+
+    print(f"{'users':>6} {'sync/s':>9} {'p50 ms':>8} {'async/s':>9} {'p50 ms':>8} {'speedup':>8}")
+    for n in args.users:
+        s_elapsed, s_lat = sync_run(n, args)
+        a_elapsed, a_lat = asyncio.run(async_run(n, args))
+        screens = n * args.rounds
+        print(f"{n:>6} {screens / s_elapsed:>9,.0f} {statistics.median(s_lat):>8.2f} "
+              f"{screens / a_elapsed:>9,.0f} {statistics.median(a_lat):>8.2f} {s_elapsed / a_elapsed:>7.2f}x")
+
+if __name__ == "__main__":
+    main()
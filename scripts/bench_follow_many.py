@@ -0,0 +1,78 @@
+"""
+Bulk UC-5/UC-6: follow_user/unfollow_user one pair per transaction vs
+follow_many/unfollow_many, on the latency stand-in (one round trip per
+statement plus a server cost per pair) or on the in-process graph.
+
+    python -m scripts.bench_follow_many --pairs 100000 --single 2000 --rtt_ms 2
+    python -m scripts.bench_follow_many --backend memory --pairs 500000
+"""
+from __future__ import annotations
+import argparse, random, time
+from typing import Any, Dict, List, Tuple
+from app.data.loader import USER_CYPHER
+from app.memory import MemoryDriver
+from app.neo4j_client import Neo4jClient
+from app.standin import StandInDriver
+from app.services import graph_service as gs
+
+def pairs(users: int, n: int, seed: int) -> List[Tuple[str, str]]:
+    # contact-list shape: each source follows a run of mostly popular accounts
+    rng = random.Random(seed)
+    out = []
+    while len(out) < n:
+        src = rng.randrange(users)
+        for _ in range(rng.randint(1, 50)):
+            dst = min(int(rng.paretovariate(1.1)) - 1, users - 1)
+            if dst != src:
+                out.append((f"user{src}", f"user{dst}"))
+    return out[:n]
+
+def standin_client(args) -> Neo4jClient:
+    pair_cost = args.pair_us / 1_000_000.0
+
+    def respond(cypher: str, params: Dict[str, Any]):
+        if "rows" in params:
+            rows = [(r["src"], d) for r in params["rows"] for d in r["dsts"]]
+        else:
+            rows = [(params["src"], params["dst"])]
+        time.sleep(pair_cost * len(rows))  # server work per pair
+        removed = cypher is gs.UNFOLLOW_CYPHER or cypher is gs.UNFOLLOW_MANY_CYPHER
+        for src, dst in rows:
+            yield {"src": src, "dst": dst, "created": True, "removed": 1, "name": dst, "followerCount": 0 if removed else 1}
+
+    return Neo4jClient(driver=StandInDriver(round_trip_ms=args.rtt_ms, per_row_us=0, responder=respond))
+
+def memory_client(args) -> Neo4jClient:
+    client = Neo4jClient(driver=MemoryDriver())
+    client.write_many(USER_CYPHER, ({"username": f"user{i}", "name": f"User {i}", "email": None, "bio": None}
+                                    for i in range(args.users)), batch_size=10_000)
+    return client
+
+def rate(label: str, n: int, fn) -> None:
+    t0 = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - t0
+    print(f"{label:<34} {n:>9,} pairs {elapsed:8.2f}s {n / elapsed:>12,.0f} pairs/s")
+
+def main():
+    parser = argparse.ArgumentParser(description="Single-pair vs batched follow/unfollow")
+    parser.add_argument("--backend", choices=("standin", "memory"), default="standin")
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--pairs", type=int, default=100_000, help="Pairs for the batched calls")
+    parser.add_argument("--single", type=int, default=2_000, help="Pairs for the one-per-transaction loop")
+    parser.add_argument("--batch_size", type=int, default=5000)
+    parser.add_argument("--rtt_ms", type=float, default=2.0, help="Round trip per statement (standin)")
+    parser.add_argument("--pair_us", type=float, default=10.0, help="Server time per pair (standin)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    client = standin_client(args) if args.backend == "standin" else memory_client(args)
+    single = pairs(args.users, args.single, args.seed)
+    bulk = pairs(args.users, args.pairs, args.seed + 1)
+    rate("follow_user (1 pair / tx)", len(single), lambda: [gs.follow_user(client, a, b) for a, b in single])
+    rate(f"follow_many (batch {args.batch_size})", len(bulk), lambda: gs.follow_many(client, bulk, args.batch_size))
+    rate("unfollow_user (1 pair / tx)", len(single), lambda: [gs.unfollow_user(client, a, b) for a, b in single])
+    rate(f"unfollow_many (batch {args.batch_size})", len(bulk), lambda: gs.unfollow_many(client, bulk, args.batch_size))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Password hashing throughput: hashes/sec (total and per core) of hash_many
+across process-pool sizes, and how long the event loop stalls while N
+concurrent logins verify a password inline vs on the hashing thread pool.
+
+    python -m scripts.bench_hashing --workers 1 2 4 8 --count 64 --rounds 12
+    python -m scripts.bench_hashing --rounds 10 --logins 32
+"""
+from __future__ import annotations
+import argparse, asyncio, os, time
+from typing import Awaitable, Callable, Tuple
+from app.utils import hashing
+
+async def loop_stall(logins: int, verify: Callable[[], Awaitable[bool]]) -> Tuple[float, float]:
+    """Runs `logins` concurrent verifications; returns (seconds, longest gap between 1 ms ticks)."""
+    worst = 0.0
+    done = False
+
+    async def ticker() -> None:
+        nonlocal worst
+        last = time.perf_counter()
+        while not done:
+            await asyncio.sleep(0.001)
+            now = time.perf_counter()
+            worst = max(worst, now - last)
+            last = now
+
+    tick = asyncio.ensure_future(ticker())
+    await asyncio.sleep(0)
+    t0 = time.perf_counter()
+    await asyncio.gather(*(verify() for _ in range(logins)))
+    elapsed = time.perf_counter() - t0
+    done = True
+    await tick
+    return elapsed, worst
+
+async def inline_verify(stored: str, salt: str) -> bool:
+    return hashing.verify_password("secret", stored, salt)
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk and async password hashing")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1])
+    parser.add_argument("--count", type=int, default=64, help="Passwords hashed per pool size")
+    parser.add_argument("--rounds", type=int, default=hashing.bcrypt_rounds(), help="bcrypt cost factor")
+    parser.add_argument("--logins", type=int, default=16, help="Concurrent verifications in the async test")
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    print(f"{cores} core(s), bcrypt cost {args.rounds}")
+    print(f"{'workers':>7} {'hashes/s':>10} {'per core':>9} {'speedup':>8}")
+    base = None
+    for w in sorted(set(args.workers)):
+        t0 = time.perf_counter()
+        n = sum(1 for _ in hashing.hash_many(("secret" for _ in range(args.count)), workers=w, rounds=args.rounds))
+        rate = n / (time.perf_counter() - t0)
+        base = base or rate
+        print(f"{w:>7} {rate:>10.1f} {rate / min(w, cores):>9.1f} {rate / base:>7.2f}x")
+
+    stored, salt = hashing.hash_password("secret", args.rounds)
+    for label, verify in (("inline", lambda: inline_verify(stored, salt)),
+                          ("thread pool", lambda: hashing.verify_password_async("secret", stored, salt))):
+        elapsed, worst = asyncio.run(loop_stall(args.logins, verify))
+        print(f"{args.logins} logins {label:<12} {elapsed:6.2f}s, longest event-loop stall {worst * 1000:8.1f} ms")
+
+if __name__ == "__main__":
+    main()
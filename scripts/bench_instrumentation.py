@@ -0,0 +1,41 @@
+"""
+Per-call overhead of query instrumentation on the latency stand-in driver:
+the same UC-7 page reads with `client.instrumentation` off and on, then the
+collected per-tag stats in the chosen export format.
+
+    python -m scripts.bench_instrumentation --calls 2000 --format prometheus
+"""
+from __future__ import annotations
+import argparse, time
+from app.instrumentation import Instrumentation
+from app.neo4j_client import Neo4jClient
+from app.standin import StandInDriver
+from app.services import graph_service
+
+def run(client: Neo4jClient, calls: int) -> float:
+    t0 = time.perf_counter()
+    for i in range(calls):
+        me = f"user{i % 100:05d}"
+        graph_service.list_followers(client, me)
+        graph_service.list_following(client, me)
+    return (time.perf_counter() - t0) * 1e6 / (2 * calls)
+
+def main():
+    parser = argparse.ArgumentParser(description="Instrumentation overhead on the stand-in driver")
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--rtt_ms", type=float, default=0.0, help="0 isolates the client-side cost")
+    parser.add_argument("--rows", type=int, default=20, help="Rows returned per statement")
+    parser.add_argument("--format", choices=["report", "json", "prometheus"], default="report")
+    args = parser.parse_args()
+
+    client = Neo4jClient(driver=StandInDriver(args.rtt_ms, result_rows=args.rows))
+    run(client, args.calls // 10)  # warm-up
+    off = run(client, args.calls)
+    client.instrumentation = Instrumentation(slow_ms=None)
+    on = run(client, args.calls)
+    print(f"off {off:8.1f} us/query   on {on:8.1f} us/query   overhead {on - off:6.1f} us")
+    ins = client.instrumentation
+    print({"report": ins.report, "json": ins.to_json, "prometheus": ins.to_prometheus}[args.format]())
+
+if __name__ == "__main__":
+    main()
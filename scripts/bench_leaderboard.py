@@ -0,0 +1,69 @@
+"""
+UC-11 read latency: the old full-scan aggregation vs the counter index vs the
+in-process Leaderboard. Needs a running Neo4j; --load first imports a
+power-law synthetic graph (1M users by default).
+
+    python -m scripts.bench_leaderboard --load --users 1000000 --avg_degree 10 --workers 4
+    python -m scripts.bench_leaderboard --repeat 50
+"""
+from __future__ import annotations
+import argparse, statistics, time
+from typing import Callable, List
+from app.neo4j_client import Neo4jClient
+from app.data.loader import import_synthetic
+from app.services import search_service
+from app.services.leaderboard import Leaderboard
+
+# UC-11 as it was before follower counters existed
+FULL_SCAN_CYPHER = """
+MATCH (u:User)
+OPTIONAL MATCH (u)<-[:FOLLOWS]-(:User)
+WITH u, count(*) AS followerCount
+RETURN u.username AS username, u.name AS name, followerCount
+ORDER BY followerCount DESC, username ASC
+LIMIT $limit
+"""
+
+def timed(fn: Callable[[], object], repeat: int) -> List[float]:
+    out = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        out.append((time.perf_counter() - t0) * 1000)
+    return out
+
+def main():
+    parser = argparse.ArgumentParser(description="UC-11 leaderboard benchmark")
+    parser.add_argument("--load", action="store_true", help="import a synthetic power-law graph first")
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--avg_degree", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--limit", type=int, default=15)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--full_scan_repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    client = Neo4jClient()
+    try:
+        if args.load:
+            n, m = import_synthetic(client, args.users, args.avg_degree, args.workers, model="powerlaw")
+            print(f"Loaded {n} users / {m} edges")
+        lb = Leaderboard(client, k=args.limit, persist=False)
+        t0 = time.perf_counter()
+        lb.refresh()
+        seed_ms = (time.perf_counter() - t0) * 1000
+
+        scan = timed(lambda: client.read(FULL_SCAN_CYPHER, {"limit": args.limit}), args.full_scan_repeat)
+        index = timed(lambda: search_service.popular_users(client, args.limit), args.repeat)
+        cached = timed(lambda: lb.top(args.limit), args.repeat)
+        assert [r["username"] for r in lb.top(args.limit)] == [r["username"] for r in search_service.popular_users(client, args.limit)]
+
+        print(f"{'variant':<28} {'median ms':>10} {'max ms':>10}")
+        for label, xs in (("full-scan Cypher", scan), ("followerCount index", index), ("Leaderboard.top", cached)):
+            print(f"{label:<28} {statistics.median(xs):>10.3f} {max(xs):>10.3f}")
+        print(f"Leaderboard seed scan: {seed_ms:.1f} ms")
+    finally:
+        client.close()
+
+if __name__ == "__main__":
+    main()
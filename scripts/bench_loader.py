@@ -0,0 +1,109 @@
+"""
+Edge loading before/after integer uids: FOLLOWS_CYPHER with one
+{src: "s12", dst: "s34"} map per edge vs FOLLOWS_UID_CYPHER with two integer
+lists per batch. Reports Bolt payload bytes per edge (packed with the
+driver's PackStream encoder when it can be imported, else JSON length),
+client-side packing time, and edges/sec on the in-process graph and on the
+latency stand-in (round trip per batch plus a server cost per payload byte).
+
+    python -m scripts.bench_loader --users 100000 --avg_degree 10
+    python -m scripts.bench_loader --rtt_ms 2 --mb_per_s 100 --workers 4
+"""
+from __future__ import annotations
+import argparse, json, time
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+from app.data import synthetic
+from app.data.loader import (FOLLOWS_CYPHER, FOLLOWS_UID_CYPHER, USER_CYPHER, edge_columns, edge_endpoints,
+                             pair_endpoints, synthetic_edge_pairs, synthetic_user_rows)
+from app.bulk import pack_rows
+from app.memory import MemoryDriver
+from app.neo4j_client import Neo4jClient
+from app.standin import StandInDriver
+
+try:
+    from neo4j._codec.packstream.v1 import Packer
+
+    def payload_bytes(params: Dict[str, Any]) -> int:
+        buf = Packer.new_packable_buffer()
+        Packer(buf).pack(params)
+        return len(buf.data)
+    ENCODING = "PackStream"
+except Exception:
+    def payload_bytes(params: Dict[str, Any]) -> int:
+        return len(json.dumps(params, separators=(",", ":")))
+    ENCODING = "JSON"
+
+Variant = Tuple[str, str, Callable[[], Iterable[Any]], Callable[[Any], Any], Callable[[List[Any]], Dict[str, Any]]]
+
+def variants(args) -> List[Variant]:
+    def pairs() -> Iterable[Tuple[int, int]]:
+        return synthetic_edge_pairs(args.users, args.avg_degree, model=args.model, seed=args.seed)
+
+    def maps() -> Iterable[Dict[str, str]]:
+        return ({"src": f"s{a}", "dst": f"s{b}"}
+                for a, b in synthetic.edge_pairs(args.users, args.avg_degree, model=args.model, seed=args.seed))
+
+    return [("username maps", FOLLOWS_CYPHER, maps, edge_endpoints, pack_rows),
+            ("uid columns", FOLLOWS_UID_CYPHER, pairs, pair_endpoints, edge_columns)]
+
+def wire(args, rows: Iterable[Any], pack: Callable[[List[Any]], Dict[str, Any]]) -> Tuple[int, int, float]:
+    # (edges, payload bytes, seconds spent in pack + encode)
+    edges = size = 0
+    spent = 0.0
+    batch: List[Any] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == args.batch_size:
+            t0 = time.perf_counter()
+            size += payload_bytes(pack(batch))
+            spent += time.perf_counter() - t0
+            edges += len(batch)
+            batch = []
+    if batch:
+        t0 = time.perf_counter()
+        size += payload_bytes(pack(batch))
+        spent += time.perf_counter() - t0
+        edges += len(batch)
+    return edges, size, spent
+
+def standin_client(args) -> Neo4jClient:
+    per_byte = 1.0 / (args.mb_per_s * 1_000_000)
+
+    def respond(cypher: str, params: Dict[str, Any]):
+        time.sleep(payload_bytes(params) * per_byte)  # parsing/transfer cost on the server
+        return iter(())
+
+    return Neo4jClient(driver=StandInDriver(round_trip_ms=args.rtt_ms, per_row_us=args.edge_us, responder=respond))
+
+def memory_client(args) -> Neo4jClient:
+    client = Neo4jClient(driver=MemoryDriver())
+    client.write_many(USER_CYPHER, synthetic_user_rows(args.users), batch_size=10_000)
+    return client
+
+def main():
+    parser = argparse.ArgumentParser(description="Username-map vs uid-column edge batches")
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--avg_degree", type=int, default=10)
+    parser.add_argument("--model", choices=("uniform", "powerlaw"), default="uniform")
+    parser.add_argument("--batch_size", type=int, default=10_000)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--rtt_ms", type=float, default=2.0, help="Round trip per batch (standin)")
+    parser.add_argument("--edge_us", type=float, default=2.0, help="Server time per edge (standin)")
+    parser.add_argument("--mb_per_s", type=float, default=100.0, help="Server payload throughput (standin)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"{args.users:,} users, avg degree {args.avg_degree}, batch {args.batch_size:,}, payload as {ENCODING}")
+    print(f"{'':<15} {'bytes/edge':>10} {'pack us/edge':>12} {'memory e/s':>12} {'standin e/s':>12}")
+    for label, cypher, rows, key, pack in variants(args):
+        edges, size, spent = wire(args, rows(), pack)
+        rates = []
+        for client in (memory_client(args), standin_client(args)):
+            t0 = time.perf_counter()
+            m = client.write_many(cypher, rows(), batch_size=args.batch_size, workers=args.workers,
+                                  partition_key=key, pack=pack)
+            rates.append(m / (time.perf_counter() - t0))
+        print(f"{label:<15} {size / edges:>10.1f} {spent / edges * 1e6:>12.2f} {rates[0]:>12,.0f} {rates[1]:>12,.0f}")
+
+if __name__ == "__main__":
+    main()
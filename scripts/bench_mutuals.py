@@ -0,0 +1,73 @@
+"""
+UC-8 latency for a skewed pair: a user following --small accounts vs a hub
+following --follows accounts. Compares the original pattern match with the
+smaller-side expansion, the count-only and sample variants, and the in-memory
+intersection. Needs a running Neo4j; --load creates the bench_mut_* users.
+
+    python -m scripts.bench_mutuals --load --follows 200000 --small 50
+"""
+from __future__ import annotations
+import argparse
+from app.neo4j_client import Neo4jClient
+from app import schema
+from app.data.loader import SCHEMA_WAIT, USER_CYPHER, FOLLOWS_CYPHER
+from app.services import graph_service
+from scripts.bench_pagination import median_ms
+
+HUB = "bench_mut_hub"
+SMALL = "bench_mut_small"
+
+# UC-8 query as it was before the degree-aware rewrite
+PATTERN_CYPHER = """
+MATCH (a:User {username: $u1}), (b:User {username: $u2})
+MATCH (a)-[:FOLLOWS]->(m:User)<-[:FOLLOWS]-(b)
+RETURN DISTINCT m.username AS username, m.name AS name
+ORDER BY username
+LIMIT $limit
+"""
+
+def target_name(i: int) -> str:
+    return f"bench_mut_t{i:07d}"
+
+def load(client: Neo4jClient, follows: int, small: int, workers: int) -> None:
+    schema.ensure(client, wait=SCHEMA_WAIT)
+    users = [{"username": u, "name": u, "email": f"{u}@example.com", "bio": ""} for u in (HUB, SMALL)]
+    client.write_many(USER_CYPHER, users)
+    rows = ({"username": target_name(i), "name": f"Target {i}", "email": f"{target_name(i)}@example.com", "bio": ""}
+            for i in range(follows))
+    client.write_many(USER_CYPHER, rows, batch_size=5000, workers=workers)
+    # every row locks the hub, so its edges go in serially
+    client.write_many(FOLLOWS_CYPHER, ({"src": HUB, "dst": target_name(i)} for i in range(follows)), batch_size=5000)
+    step = max(follows // small, 1)
+    client.write_many(FOLLOWS_CYPHER, ({"src": SMALL, "dst": target_name(i)} for i in range(0, follows, step)))
+
+def main():
+    parser = argparse.ArgumentParser(description="UC-8 mutual connections benchmark")
+    parser.add_argument("--load", action="store_true")
+    parser.add_argument("--follows", type=int, default=200_000)
+    parser.add_argument("--small", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    client = Neo4jClient()
+    try:
+        if args.load:
+            load(client, args.follows, args.small, args.workers)
+        # both argument orders: the old pattern's plan depends on which side is bound first
+        for u1, u2 in ((SMALL, HUB), (HUB, SMALL)):
+            params = {"u1": u1, "u2": u2, "limit": args.limit}
+            print(f"{u1} -> {u2}")
+            print(f"  pattern   {median_ms(lambda: client.read(PATTERN_CYPHER, params), args.repeat):>9.2f} ms")
+            print(f"  smaller   {median_ms(lambda: graph_service.mutual_connections(client, u1, u2, args.limit), args.repeat):>9.2f} ms")
+            print(f"  count     {median_ms(lambda: graph_service.mutual_count(client, u1, u2), args.repeat):>9.2f} ms")
+            print(f"  sample    {median_ms(lambda: graph_service.mutual_sample(client, u1, u2, args.limit), args.repeat):>9.2f} ms")
+        adjacency = {u: graph_service.load_following(client, u) for u in (SMALL, HUB)}
+        in_mem = median_ms(lambda: graph_service.mutual_connections(client, SMALL, HUB, args.limit, adjacency), args.repeat)
+        print(f"in-memory intersection {in_mem:.3f} ms")
+    finally:
+        client.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+UC-7 page latency for a user with many followers: SKIP/LIMIT vs keyset cursors.
+Needs a running Neo4j; --load creates `bench_celeb` with --followers followers.
+
+    python -m scripts.bench_pagination --load --followers 100000
+"""
+from __future__ import annotations
+import argparse, statistics, time
+from app.neo4j_client import Neo4jClient
+from app import schema
+from app.data.loader import SCHEMA_WAIT, USER_CYPHER, FOLLOWS_CYPHER
+from app.services import graph_service
+
+CELEB = "bench_celeb"
+
+# UC-7 followers query as it was before keyset pagination
+SKIP_CYPHER = """
+MATCH (v:User)-[:FOLLOWS]->(:User {username: $u})
+RETURN DISTINCT v.username AS username, v.name AS name
+ORDER BY v.username
+SKIP $skip LIMIT $limit
+"""
+
+def follower_name(i: int) -> str:
+    return f"bench_f{i:07d}"
+
+def load(client: Neo4jClient, followers: int, workers: int) -> None:
+    schema.ensure(client, wait=SCHEMA_WAIT)
+    users = [{"username": CELEB, "name": "Bench Celebrity", "email": f"{CELEB}@example.com", "bio": ""}]
+    client.write_many(USER_CYPHER, users)
+    rows = ({"username": follower_name(i), "name": f"Follower {i}", "email": f"{follower_name(i)}@example.com", "bio": ""}
+            for i in range(followers))
+    client.write_many(USER_CYPHER, rows, batch_size=5000, workers=workers)
+    # every row locks the celebrity, so edges go in serially
+    edges = ({"src": follower_name(i), "dst": CELEB} for i in range(followers))
+    client.write_many(FOLLOWS_CYPHER, edges, batch_size=5000)
+
+def median_ms(fn, repeat: int) -> float:
+    xs = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        xs.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(xs)
+
+def main():
+    parser = argparse.ArgumentParser(description="UC-7 pagination benchmark")
+    parser.add_argument("--load", action="store_true")
+    parser.add_argument("--followers", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    client = Neo4jClient()
+    try:
+        if args.load:
+            load(client, args.followers, args.workers)
+        last_page = max(args.followers // args.limit - 1, 0)
+        pages = sorted({0, 10, 100, 1000, last_page // 2, last_page} & set(range(last_page + 1)))
+        print(f"{'page':>8} {'SKIP ms':>10} {'keyset ms':>10}")
+        for p in pages:
+            skip = p * args.limit
+            skip_ms = median_ms(lambda: client.read(SKIP_CYPHER, {"u": CELEB, "skip": skip, "limit": args.limit}), args.repeat)
+            cursor = graph_service.encode_cursor("a", follower_name(skip - 1)) if skip else None
+            key_ms = median_ms(lambda: graph_service.list_followers(client, CELEB, args.limit, cursor), args.repeat)
+            print(f"{p:>8} {skip_ms:>10.2f} {key_ms:>10.2f}")
+    finally:
+        client.close()
+
+if __name__ == "__main__":
+    main()
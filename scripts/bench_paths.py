@@ -0,0 +1,93 @@
+"""
+UC-12 latency: one-sided BFS (source side only, batched per level) vs the
+bidirectional search of app/services/path_service.py, for random pairs
+bucketed by distance. Runs on the in-process graph directly and through the
+latency stand-in (a round trip per statement, answered by the same graph).
+
+    python -m scripts.bench_paths --users 1000000 --avg_degree 10 --pairs 200
+    python -m scripts.bench_paths --users 200000 --model uniform --rtt_ms 0.5
+"""
+from __future__ import annotations
+import argparse, collections, random, statistics, time
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from app.data import synthetic
+from app.data.loader import USER_CYPHER, synthetic_user_rows
+from app.memory import MemoryDriver, MemoryGraph
+from app.neo4j_client import Neo4jClient
+from app.standin import StandInDriver
+from app.services import path_service as ps
+
+def build(args) -> MemoryGraph:
+    driver = MemoryDriver()
+    Neo4jClient(driver=driver).write_many(USER_CYPHER, synthetic_user_rows(args.users), batch_size=50_000)
+    edges = np.concatenate(list(synthetic.generate_edges(args.users, args.avg_degree, model=args.model, seed=args.seed)))
+    driver.graph.load_edges(edges[:, 0] - 1, edges[:, 1] - 1)  # s<i> is node id i - 1
+    return driver.graph
+
+def one_sided(client: Neo4jClient, src: str, dst: str, max_depth: int, batch_size: int) -> Tuple[Optional[int], int]:
+    # plain BFS from the source, same batched level reads; returns (distance, queries)
+    ends = {r["username"]: r["uid"] for r in client.read(ps.ENDPOINTS_CYPHER, {"usernames": [src, dst]})}
+    target, frontier, seen, queries = ends[dst], [ends[src]], {ends[src]}, 1
+    for depth in range(1, max_depth + 1):
+        nxt: List[int] = []
+        for k in range(0, len(frontier), batch_size):
+            queries += 1
+            for r in client.read(ps.FOLLOWING_LEVEL_CYPHER, {"ids": frontier[k:k + batch_size]}):
+                for v in r["next"]:
+                    if v not in seen:
+                        seen.add(v)
+                        nxt.append(v)
+        if target in seen:
+            return depth, queries
+        frontier = nxt
+    return None, queries
+
+def run(label: str, client: Neo4jClient, pairs: List[Tuple[str, str]], args) -> None:
+    by_distance: Dict[Any, Dict[str, List[float]]] = collections.defaultdict(lambda: collections.defaultdict(list))
+    for src, dst in pairs:
+        t0 = time.perf_counter()
+        r = ps.shortest_paths(client, src, dst, budget=None, max_depth=args.max_depth)
+        bi = time.perf_counter() - t0
+        row = by_distance[r.distance]
+        row["bi"].append(bi * 1000)
+        row["bi_q"].append(r.queries)
+        row["visited"].append(r.visited)
+        if r.distance is not None and r.distance <= args.one_sided_max:
+            t0 = time.perf_counter()
+            d, q = one_sided(client, src, dst, args.max_depth, ps.DEFAULT_LIMITS["batch_size"])
+            row["one"].append((time.perf_counter() - t0) * 1000)
+            row["one_q"].append(q)
+    print(f"\n{label}")
+    print(f"{'distance':>8} {'pairs':>6} {'bidir p50 ms':>13} {'p95 ms':>8} {'queries':>8} {'visited':>9}"
+          f" {'one-sided p50 ms':>17} {'queries':>8}")
+    for d in sorted(by_distance, key=lambda d: (d is None, d or 0)):
+        row = by_distance[d]
+        bi = sorted(row["bi"])
+        one = f"{statistics.median(row['one']):>17.1f} {statistics.median(row['one_q']):>8.0f}" if row["one"] else f"{'-':>17} {'-':>8}"
+        print(f"{str(d):>8} {len(bi):>6} {statistics.median(bi):>13.1f} {bi[int(0.95 * (len(bi) - 1))]:>8.1f}"
+              f" {statistics.median(row['bi_q']):>8.0f} {statistics.median(row['visited']):>9,.0f} {one}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Bidirectional vs one-sided BFS for UC-12")
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--avg_degree", type=int, default=10)
+    parser.add_argument("--model", choices=synthetic.MODELS, default="powerlaw")
+    parser.add_argument("--pairs", type=int, default=200)
+    parser.add_argument("--max_depth", type=int, default=6)
+    parser.add_argument("--one_sided_max", type=int, default=4, help="Run the one-sided BFS up to this distance")
+    parser.add_argument("--rtt_ms", type=float, default=1.0, help="Round trip per statement (standin)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    graph = build(args)
+    print(f"{args.users:,} users, {graph.edges:,} edges ({args.model}) built in {time.perf_counter() - t0:.1f}s")
+    rng = random.Random(args.seed)
+    pairs = [(f"s{rng.randint(10, args.users)}", f"s{rng.randint(10, args.users)}") for _ in range(args.pairs)]
+    run("in-process graph", Neo4jClient(driver=MemoryDriver(graph)), pairs, args)
+    standin = StandInDriver(round_trip_ms=args.rtt_ms, per_row_us=0, responder=graph.execute)
+    run(f"stand-in, {args.rtt_ms} ms round trip", Neo4jClient(driver=standin), pairs, args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+UC-10 typeahead latency: the in-process prefix index against the fulltext
+and CONTAINS-scan statements, over N users with generated first/last names
+and power-law follower counts. Every query is a 1..6 character prefix of a
+random user's username or name, as typed keystroke by keystroke.
+
+    python -m scripts.bench_search --users 1000000 --queries 20000
+    python -m scripts.bench_search --users 100000 --statements    # also time the Cypher paths (memory backend)
+"""
+from __future__ import annotations
+import argparse, random, time
+from typing import Any, Dict, Iterator, List
+import numpy as np
+from app.data.loader import USER_CYPHER
+from app.memory import MemoryDriver
+from app.neo4j_client import Neo4jClient
+from app.services import search_service
+from app.services.search_index import PrefixIndex
+
+FIRST = ["Peter", "Ján", "Mária", "Anna", "Michal", "Zuzana", "Tomáš", "Lucia", "Martin", "Katarína",
+         "Jozef", "Eva", "Lukáš", "Jana", "Marek", "Monika", "Juraj", "Ivana", "Pavol", "Simona"]
+LAST = ["Novák", "Horváth", "Kováč", "Varga", "Tóth", "Nagy", "Baláž", "Szabó", "Molnár", "Lukáč",
+        "Žilinský", "Kráľ", "Šimko", "Polák", "Hudák", "Benko", "Oravec", "Kollár", "Blaho", "Mráz"]
+
+def users(n: int, seed: int) -> Iterator[Dict[str, Any]]:
+    rng = np.random.default_rng(seed)
+    counts = np.minimum(rng.zipf(2.0, n) - 1, 1_000_000)
+    r = random.Random(seed)
+    for i in range(n):
+        yield {"username": f"user{i}", "name": f"{r.choice(FIRST)} {r.choice(LAST)}{r.randint(1, 99)}",
+               "followerCount": int(counts[i])}
+
+def queries(rows: List[Dict[str, Any]], k: int, seed: int) -> List[str]:
+    r = random.Random(seed + 1)
+    out = []
+    for _ in range(k):
+        row = r.choice(rows)
+        text = r.choice((row["username"], row["name"], row["name"].split()[-1]))
+        out.append(text[:r.randint(1, 6)])
+    return out
+
+def timed(fn, qs: List[str]) -> List[float]:
+    lat = []
+    for q in qs:
+        t0 = time.perf_counter()
+        fn(q)
+        lat.append((time.perf_counter() - t0) * 1000)
+    lat.sort()
+    return lat
+
+def show(label: str, lat: List[float]) -> None:
+    pct = lambda q: lat[min(len(lat) - 1, int(q * len(lat)))]
+    print(f"{label:<22} p50 {pct(0.50):8.3f} ms   p99 {pct(0.99):8.3f} ms   max {lat[-1]:8.3f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description="UC-10 prefix index vs Cypher search")
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=20_000)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--statements", action="store_true", help="Also time fulltext and CONTAINS on the memory backend")
+    args = parser.parse_args()
+
+    rows = list(users(args.users, args.seed))
+    qs = queries(rows, args.queries, args.seed)
+    client = Neo4jClient(driver=MemoryDriver())
+    index = PrefixIndex(client)
+    t0 = time.perf_counter()
+    index.load(rows)
+    print(f"built index over {len(index):,} users ({len(index.base.keys):,} keys) in {time.perf_counter() - t0:.1f}s")
+    show("prefix index", timed(lambda q: index.search(q, args.limit), qs))
+
+    if args.statements:
+        client.write_many(USER_CYPHER, ({"username": r["username"], "name": r["name"], "email": None, "bio": None}
+                                         for r in rows), batch_size=10_000)
+        few = qs[:max(args.queries // 100, 20)]
+        show("fulltext (escaped)", timed(lambda q: search_service.search_users(client, q, args.limit), few))
+        show("CONTAINS scan", timed(lambda q: client.read(search_service.SEARCH_CONTAINS_CYPHER,
+                                                          {"q": q, "limit": args.limit}), few))
+    index.close()
+
+if __name__ == "__main__":
+    main()
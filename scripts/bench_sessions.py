@@ -0,0 +1,77 @@
+"""
+Session reuse and result materialisation in Neo4jClient, on the stand-in driver.
+
+  flow    login + home screen (5 queries): one session per query vs unit_of_work()
+  export  a large read: the old list(records) + r.data() copy, read() and read_iter(),
+          with wall time and peak traced allocation
+
+    python -m scripts.bench_sessions --flows 200 --session_ms 0.5 --export_rows 200000
+"""
+from __future__ import annotations
+import argparse, time, tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+from app.neo4j_client import Neo4jClient
+from app.standin import StandInDriver
+from app.services import auth_service, graph_service, search_service, user_service
+
+def flow(client: Neo4jClient, me: str) -> None:
+    auth_service.login_user(client, me, "secret")
+    user_service.get_profile(client, me)
+    graph_service.list_following(client, me)
+    graph_service.list_followers(client, me)
+    search_service.popular_users(client)
+
+def bench_flow(args, shared: bool) -> Tuple[float, int]:
+    driver = StandInDriver(args.rtt_ms, session_ms=args.session_ms)
+    client = Neo4jClient(driver=driver)
+    t0 = time.perf_counter()
+    for i in range(args.flows):
+        me = f"user{i:05d}"
+        if shared:
+            with client.unit_of_work():
+                flow(client, me)
+        else:
+            flow(client, me)
+    return (time.perf_counter() - t0) * 1000 / args.flows, driver.sessions
+
+def legacy_read(client: Neo4jClient, cypher: str) -> List[Dict[str, Any]]:
+    # Neo4jClient.read before: records listed inside the transaction, then copied to dicts
+    with client.driver.session(database=client.database) as session:
+        result = session.execute_read(lambda tx: list(tx.run(cypher)))
+    return [r.data() for r in result]
+
+def measure(fn: Callable[[], int]) -> Tuple[int, float, float]:
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    n = fn()
+    elapsed = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return n, elapsed, peak / (1024 * 1024)
+
+def main():
+    parser = argparse.ArgumentParser(description="Neo4jClient session reuse / streaming benchmark")
+    parser.add_argument("--flows", type=int, default=200)
+    parser.add_argument("--rtt_ms", type=float, default=1.0)
+    parser.add_argument("--session_ms", type=float, default=0.5, help="Modelled cost of a session checkout")
+    parser.add_argument("--export_rows", type=int, default=200_000)
+    args = parser.parse_args()
+
+    per_query, s1 = bench_flow(args, shared=False)
+    per_unit, s2 = bench_flow(args, shared=True)
+    print(f"login + home, {args.flows} flows:")
+    print(f"  session per query  {per_query:7.2f} ms/flow  {s1:>6} sessions")
+    print(f"  unit_of_work       {per_unit:7.2f} ms/flow  {s2:>6} sessions")
+
+    client = Neo4jClient(driver=StandInDriver(args.rtt_ms, per_row_us=0, result_rows=args.export_rows))
+    cypher = "MATCH (u:User) RETURN u.username AS username, u.name AS name"
+    print(f"export of {args.export_rows:,} rows:")
+    for label, fn in (("list + r.data()", lambda: len(legacy_read(client, cypher))),
+                      ("read()", lambda: len(client.read(cypher))),
+                      ("read_iter()", lambda: sum(1 for _ in client.read_iter(cypher)))):
+        n, elapsed, peak = measure(fn)
+        print(f"  {label:<16} {elapsed * 1000:8.1f} ms  peak {peak:7.1f} MiB  ({n:,} rows)")
+    print("client metrics:", client.metrics())
+
+if __name__ == "__main__":
+    main()
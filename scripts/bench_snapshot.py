@@ -0,0 +1,58 @@
+"""
+Cost of opening and reading a graph snapshot (app/data/snapshot.py): open
+time, resident memory after random adjacency reads and after a full degree
+scan, and lookups per second.
+
+    python -m app.data.loader --mode synthetic-snapshot --users 1600000 --avg_degree 19 --model powerlaw
+    python -m scripts.bench_snapshot import/graph.snap --lookups 100000
+"""
+from __future__ import annotations
+import argparse, random, time
+from typing import Optional
+from app.data.snapshot import Snapshot
+
+def rss_mb() -> Optional[float]:
+    # current (not peak) resident set, Linux only
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * 4096 / 2 ** 20
+    except OSError:
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description="Snapshot open/read cost")
+    parser.add_argument("path")
+    parser.add_argument("--lookups", type=int, default=100_000, help="Random users whose followers are read")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    base = rss_mb()
+    t0 = time.perf_counter()
+    snap = Snapshot(args.path)
+    opened = (time.perf_counter() - t0) * 1000
+    print(f"opened {len(snap):,} users / {snap.m:,} edges in {opened:.2f} ms, RSS +{(rss_mb() or 0) - (base or 0):.1f} MiB")
+
+    rng = random.Random(args.seed)
+    ids = [rng.randrange(len(snap)) for _ in range(args.lookups)]
+    t0 = time.perf_counter()
+    seen = 0
+    for i in ids:
+        seen += len(snap.followers(i)) + len(snap.following(i))
+    took = time.perf_counter() - t0
+    print(f"{args.lookups:,} random in+out rows ({seen:,} ids) at {args.lookups / took:,.0f} users/s, "
+          f"RSS +{(rss_mb() or 0) - (base or 0):.1f} MiB")
+
+    t0 = time.perf_counter()
+    key = snap.username(ids[0])
+    for _ in range(10_000):
+        snap.id(key)
+    print(f"username -> id: {(time.perf_counter() - t0) * 1e6 / 10_000:.1f} us")
+
+    t0 = time.perf_counter()
+    top = int(snap.in_degrees().argmax())
+    print(f"full in-degree scan in {(time.perf_counter() - t0) * 1000:.1f} ms (top: {snap.username(top)}), "
+          f"RSS +{(rss_mb() or 0) - (base or 0):.1f} MiB")
+    snap.close()
+
+if __name__ == "__main__":
+    main()
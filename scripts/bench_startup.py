@@ -0,0 +1,89 @@
+"""
+Console startup cost: importing app.main (in a fresh interpreter, against
+`import neo4j` alone as the floor) and the schema work done before the first
+menu. The old startup sent every DDL statement as its own write transaction
+on each launch; schema.ensure() on an up-to-date database sends one read.
+Both run against the in-process graph and through the latency stand-in, where
+every statement costs a round trip and DDL an extra `--ddl_ms` (schema lock
+and commit on the server; a model, not a measurement).
+
+    python -m scripts.bench_startup --rtt_ms 1 --ddl_ms 5
+"""
+from __future__ import annotations
+import argparse, statistics, subprocess, sys, time
+from typing import Any, Callable, Dict, List, Tuple
+from app import schema
+from app.memory import MemoryDriver, MemoryGraph
+from app.neo4j_client import Neo4jClient
+from app.standin import StandInDriver
+
+# what auth_service.create_schema sent before migrations existed
+OLD_STARTUP = [s for m in schema.MIGRATIONS for s in m.statements if "SchemaVersion" not in s]
+
+IMPORT_PROBE = """
+import sys, time
+t0 = time.perf_counter()
+import {module}
+print(time.perf_counter() - t0, "dotenv" in sys.modules)
+"""
+
+def import_time(module: str, runs: int) -> Tuple[float, bool]:
+    # median seconds over fresh interpreters, and whether dotenv got imported
+    times: List[float] = []
+    dotenv = False
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", IMPORT_PROBE.format(module=module)], capture_output=True,
+                             text=True, check=True).stdout.split()
+        times.append(float(out[0]))
+        dotenv = out[1] == "True"
+    return statistics.median(times), dotenv
+
+def old_startup(client: Neo4jClient) -> None:
+    for statement in OLD_STARTUP:
+        client.write(statement)
+
+def timed(fn: Callable[[Neo4jClient], Any], client: Neo4jClient, runs: int) -> float:
+    times: List[float] = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        fn(client)
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times) * 1000
+
+def standin(graph: MemoryGraph, args) -> Tuple[Neo4jClient, StandInDriver]:
+    ddl = args.ddl_ms / 1000.0
+
+    def respond(cypher: str, params: Dict[str, Any]):
+        if cypher.lstrip().upper().startswith("CREATE"):
+            time.sleep(ddl)
+        return graph.execute(cypher, params)
+
+    driver = StandInDriver(round_trip_ms=args.rtt_ms, per_row_us=0, responder=respond)
+    return Neo4jClient(driver=driver), driver
+
+def main():
+    parser = argparse.ArgumentParser(description="Console startup: imports and schema work")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--rtt_ms", type=float, default=1.0, help="Round trip per statement (standin)")
+    parser.add_argument("--ddl_ms", type=float, default=5.0, help="Extra server time per DDL statement (standin)")
+    args = parser.parse_args()
+
+    floor, _ = import_time("neo4j", args.runs // 4 or 1)
+    app_import, dotenv = import_time("app.main", args.runs // 4 or 1)
+    print(f"import neo4j    {floor * 1000:7.1f} ms")
+    print(f"import app.main {app_import * 1000:7.1f} ms  (dotenv imported: {dotenv})")
+
+    graph = MemoryGraph()
+    memory = Neo4jClient(driver=MemoryDriver(graph))
+    first = schema.ensure(memory)
+    print(f"\nfresh database: {first} migration(s) applied")
+    client, driver = standin(graph, args)
+    print(f"{'schema at startup':<26} {'statements':>10} {'memory ms':>10} {'standin ms':>11}")
+    for label, fn in (("DDL every launch (old)", old_startup), ("schema.ensure, current", schema.ensure)):
+        before = driver.statements
+        fn(client)
+        statements = driver.statements - before
+        print(f"{label:<26} {statements:>10} {timed(fn, memory, args.runs):>10.3f} {timed(fn, client, args.runs):>11.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Serial vs parallel `Neo4jClient.write_many` against the latency stand-in driver.
+
+    python -m scripts.bench_write_many --users 50000 --avg_degree 6 --workers 1 2 4 8
+"""
+from __future__ import annotations
+import argparse, random, time
+from typing import Any, Dict, Iterator
+from app.neo4j_client import Neo4jClient
+from app.standin import StandInDriver
+from app.data.loader import edge_endpoints
+
+def user_rows(n: int) -> Iterator[Dict[str, Any]]:
+    for i in range(n):
+        yield {"username": f"s{i+1}", "name": f"Synthetic User {i+1}", "email": f"s{i+1}@example.com", "bio": ""}
+
+def edge_rows(n: int, avg_degree: int, seed: int = 42) -> Iterator[Dict[str, Any]]:
+    rnd = random.Random(seed)
+    for i in range(n):
+        for _ in range(avg_degree):
+            yield {"src": f"s{i+1}", "dst": f"s{rnd.randint(1, n)}"}
+
+def run(workers: int, args) -> Dict[str, float]:
+    driver = StandInDriver(round_trip_ms=args.rtt_ms, per_row_us=args.row_us, server_threads=args.server_threads)
+    client = Neo4jClient(driver=driver)
+    t0 = time.perf_counter()
+    n = client.write_many("UNWIND $rows AS row MERGE ...", user_rows(args.users), batch_size=args.batch_size, workers=workers)
+    t1 = time.perf_counter()
+    m = client.write_many("UNWIND $rows AS row MATCH ... MERGE ...", edge_rows(args.users, args.avg_degree),
+                          batch_size=args.batch_size, workers=workers, partition_key=edge_endpoints)
+    t2 = time.perf_counter()
+    return {"users_per_sec": n / (t1 - t0), "edges_per_sec": m / (t2 - t1), "total_s": t2 - t0,
+            "conflicts": driver.lock_conflicts}
+
+def main():
+    parser = argparse.ArgumentParser(description="write_many serial vs parallel benchmark (stand-in backend)")
+    parser.add_argument("--users", type=int, default=50000)
+    parser.add_argument("--avg_degree", type=int, default=6)
+    parser.add_argument("--batch_size", type=int, default=1000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--rtt_ms", type=float, default=2.0, help="simulated network round trip per batch")
+    parser.add_argument("--row_us", type=float, default=20.0, help="simulated server cost per row")
+    parser.add_argument("--server_threads", type=int, default=8)
+    args = parser.parse_args()
+
+    base = None
+    print(f"{'workers':>7} {'users/s':>10} {'edges/s':>10} {'total s':>8} {'speedup':>8} {'conflicts':>9}")
+    for w in args.workers:
+        r = run(w, args)
+        base = base or r["total_s"]
+        print(f"{w:>7} {r['users_per_sec']:>10,.0f} {r['edges_per_sec']:>10,.0f} {r['total_s']:>8.2f} {base / r['total_s']:>7.2f}x {r['conflicts']:>9}")
+
+if __name__ == "__main__":
+    main()
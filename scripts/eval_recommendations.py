@@ -0,0 +1,45 @@
+"""
+UC-9 bounded vs exact recommendations: overlap@k and latency on a sample of users.
+Needs a running Neo4j with data loaded (e.g. a power-law synthetic graph).
+
+    python -m scripts.eval_recommendations --sample 200 --scorer adamic_adar
+"""
+from __future__ import annotations
+import argparse, statistics, time
+from app.neo4j_client import Neo4jClient
+from app.services import recommendation_service as rs
+
+def main():
+    parser = argparse.ArgumentParser(description="UC-9 bounded vs exact evaluation")
+    parser.add_argument("--sample", type=int, default=100)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--scorer", choices=sorted(rs.SCORERS), default="mutuals")
+    parser.add_argument("--budget", type=float, default=2.0)
+    args = parser.parse_args()
+
+    client = Neo4jClient()
+    try:
+        users = [r["username"] for r in client.read(
+            "MATCH (u:User) WHERE u.followingCount > 0 RETURN u.username AS username ORDER BY rand() LIMIT $n",
+            {"n": args.sample})]
+        overlaps, fast_ms, exact_ms = [], [], []
+        for u in users:
+            t0 = time.perf_counter()
+            approx = rs.recommend(client, u, args.limit, args.scorer, budget=args.budget)
+            t1 = time.perf_counter()
+            exact = rs.recommend(client, u, args.limit, args.scorer, budget=None, exact=True)
+            t2 = time.perf_counter()
+            overlaps.append(rs.overlap_at_k(approx, exact))
+            fast_ms.append((t1 - t0) * 1000)
+            exact_ms.append((t2 - t1) * 1000)
+        if not users:
+            raise SystemExit("No users with follows found.")
+        q = lambda xs, p: sorted(xs)[min(len(xs) - 1, int(p * len(xs)))]
+        print(f"users={len(users)} scorer={args.scorer} overlap@{args.limit}: mean {statistics.mean(overlaps):.3f}, min {min(overlaps):.3f}")
+        print(f"bounded ms: p50 {q(fast_ms, .5):.1f}  p95 {q(fast_ms, .95):.1f}  max {max(fast_ms):.1f}")
+        print(f"exact   ms: p50 {q(exact_ms, .5):.1f}  p95 {q(exact_ms, .95):.1f}  max {max(exact_ms):.1f}")
+    finally:
+        client.close()
+
+if __name__ == "__main__":
+    main()
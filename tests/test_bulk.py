@@ -0,0 +1,27 @@
+from __future__ import annotations
+import random
+from app.bulk import partitioned_batches
+
+def test_partitioned_batches_send_every_row_once_in_its_partition():
+    rng = random.Random(7)
+    rows = [(rng.randrange(1000), rng.randrange(1000)) for _ in range(20_000)]
+    out, buffered = [], 0
+    for parts, chunk in partitioned_batches(rows, 500, 8, lambda r: r, max_buffered=1000):
+        assert len(chunk) <= 500
+        assert all(frozenset((hash(a) % 8, hash(b) % 8)) == parts for a, b in chunk)
+        out.extend(chunk)
+    assert sorted(out) == sorted(rows)
+
+def test_buffer_never_exceeds_cap():
+    read = [0]
+
+    def rows():
+        for i in range(10_000):
+            read[0] += 1
+            yield i, i * 7
+
+    sent = 0
+    for _, chunk in partitioned_batches(rows(), 1000, 8, lambda r: r, max_buffered=300):
+        assert read[0] - sent <= 300  # rows still waiting in buckets when this one left
+        sent += len(chunk)
+    assert sent == read[0] == 10_000
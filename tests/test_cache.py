@@ -0,0 +1,90 @@
+from __future__ import annotations
+import pytest
+from app import cache
+from app.cache import LocalCache, ReadCache, SqliteCache
+from app.data.loader import USER_CYPHER
+from app.memory import MemoryDriver
+from app.neo4j_client import Neo4jClient
+from app.services import graph_service as gs
+
+@pytest.fixture(params=["local", "sqlite"])
+def backend(request, tmp_path):
+    if request.param == "local":
+        yield LocalCache()
+    else:
+        b = SqliteCache(str(tmp_path / "cache.sqlite3"))
+        yield b
+        b.close()
+
+def test_invalidate_drops_tagged_entries(backend):
+    e = backend.epoch()
+    assert backend.set("a", b"1", ["user:ann"], 30, e)
+    assert backend.set("b", b"2", ["user:bob"], 30, e)
+    assert backend.invalidate(["user:ann", "popular"]) == 1
+    assert backend.get("a") is None
+    assert backend.get("b") == b"2"
+
+def test_store_refused_only_if_own_tag_was_invalidated(backend):
+    e = backend.epoch()
+    backend.invalidate(["user:bob"])
+    assert backend.set("a", b"1", ["user:ann"], 30, e)
+    backend.invalidate(["user:ann"])
+    assert not backend.set("a", b"1", ["user:ann"], 30, e)
+    assert backend.set("a", b"1", ["user:ann"], 30, backend.epoch())
+
+def test_clear_refuses_reads_started_before_it(backend):
+    e = backend.epoch()
+    backend.clear()
+    assert not backend.set("a", b"1", ["user:ann"], 30, e)
+
+def test_forgotten_invalidations_refuse_old_reads(backend, monkeypatch):
+    monkeypatch.setattr(cache, "TAG_WINDOW", 10)
+    e = backend.epoch()
+    for i in range(2000):
+        backend.invalidate([f"user:u{i}"])
+    assert not backend.set("a", b"1", ["user:ann"], 30, e)
+    assert backend.set("a", b"1", ["user:ann"], 30, backend.epoch())
+
+def test_sqlite_hits_batch_access_times(tmp_path):
+    b = SqliteCache(str(tmp_path / "cache.sqlite3"), max_entries=2, touch_batch=100)
+    try:
+        for k in ("a", "b"):
+            b.set(k, b"x", [], 30, b.epoch())
+        b.get("a")
+        assert b._touched.keys() == {"a"}
+        b.set("c", b"x", [], 30, b.epoch())  # flushes, then evicts the least recent: b
+        assert b.get("a") == b"x" and b.get("b") is None
+    finally:
+        b.close()
+
+def test_read_cache_invalidates_on_follow_events():
+    rc = ReadCache(LocalCache())
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return [{"username": "bob"}]
+
+    try:
+        rc.read(fetch, "Q", {}, ["followers:bob"])
+        rc.read(fetch, "Q", {}, ["followers:bob"])
+        assert len(calls) == 1
+        rc.on_change(src="ann", dst="bob", name="Bob", followerCount=1)
+        rc.read(fetch, "Q", {}, ["followers:bob"])
+        assert len(calls) == 2
+    finally:
+        rc.close()
+
+def test_client_reads_see_follows_through_the_cache():
+    c = Neo4jClient(driver=MemoryDriver())
+    c.cache = ReadCache(LocalCache())
+    try:
+        c.write(USER_CYPHER, {"rows": [{"username": u, "uid": i} for i, u in enumerate(["ann", "bob", "cat"], 1)]})
+        gs.follow_user(c, "ann", "bob")
+        assert [r["username"] for r in gs.list_followers(c, "bob")[0]] == ["ann"]
+        assert [r["username"] for r in gs.list_followers(c, "bob")[0]] == ["ann"]
+        assert c.cache.hits == 1
+        gs.follow_user(c, "cat", "bob")
+        assert [r["username"] for r in gs.list_followers(c, "bob")[0]] == ["ann", "cat"]
+    finally:
+        c.cache.close()
@@ -0,0 +1,47 @@
+from __future__ import annotations
+from app import events
+from app.data.loader import USER_CYPHER
+from app.memory import MemoryDriver
+from app.neo4j_client import Neo4jClient
+from app.services import graph_service
+from app.services.leaderboard import SAVE_CYPHER, Leaderboard
+from app.services.search_service import POPULAR_CYPHER
+
+def client_with_users(n: int) -> Neo4jClient:
+    c = Neo4jClient(driver=MemoryDriver())
+    c.write(USER_CYPHER, {"rows": [{"username": f"user{i}", "uid": i, "name": f"User {i}"} for i in range(n)]})
+    return c
+
+def test_events_during_a_scan_are_replayed():
+    c = client_with_users(10)
+    board = Leaderboard(c, k=3, margin=0, persist=False)
+    read = c.read
+
+    def slow_read(cypher, params=None):
+        rows = read(cypher, params)
+        if cypher == POPULAR_CYPHER:
+            # committed after the scan read its counts, published before it returns
+            events.publish("followed", src="user1", dst="user7", name="User 7", followerCount=50)
+        return rows
+
+    c.read = slow_read
+    try:
+        assert board.top()[0] == {"username": "user7", "name": "User 7", "followerCount": 50}
+    finally:
+        board.close()
+
+def test_refresh_saves_only_when_the_top_changes():
+    c = client_with_users(10)
+    saves = []
+    write = c.write
+    c.write = lambda cypher, params=None: (saves.append(params) if cypher == SAVE_CYPHER else None) or write(cypher, params)
+    board = Leaderboard(c, k=3)
+    try:
+        board.refresh()
+        board.refresh()
+        assert len(saves) == 1
+        graph_service.follow_user(c, "user1", "user9")
+        board.refresh()
+        assert len(saves) == 2 and saves[-1]["usernames"][0] == "user9"
+    finally:
+        board.close()
@@ -0,0 +1,79 @@
+from __future__ import annotations
+import importlib, pathlib
+from typing import Dict
+from app import schema
+from app.data import snapshot, synthetic
+from app.data.loader import USER_CYPHER, import_synthetic
+from app.data.snapshot import Snapshot
+from app.memory import MemoryDriver, MemoryGraph, from_snapshot
+from app.neo4j_client import Neo4jClient
+from app.services import path_service, search_service, user_service
+from app.services.auth_service import SYNTHETIC_UID_BASE
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent / "app"
+
+def client() -> Neo4jClient:
+    return Neo4jClient(driver=MemoryDriver())
+
+def test_profile_update_reindexes_old_email():
+    c = client()
+    c.write(USER_CYPHER, {"rows": [{"username": "ann", "uid": 1, "name": "Ann", "email": "old@zz.com", "bio": ""}]})
+    assert [u["username"] for u in search_service.search_users(c, "zz")] == ["ann"]
+    user_service.update_profile(c, "ann", email="new@yy.com")
+    assert search_service.search_users(c, "zz") == []
+    assert [u["username"] for u in search_service.search_users(c, "yy")] == ["ann"]
+
+# run against the source database by replicate(), never against the graph itself
+SOURCE_ONLY = {"app.memory.REPLICA_USERS_CYPHER"}
+
+def cypher_constants() -> Dict[str, str]:
+    out: Dict[str, str] = {}
+    for path in sorted(ROOT.rglob("*.py")):
+        name = ".".join(path.relative_to(ROOT.parent).with_suffix("").parts)
+        module = importlib.import_module(name)
+        for key, value in vars(module).items():
+            if key.endswith("_CYPHER") and isinstance(value, str):
+                out.setdefault(value, f"{name}.{key}")
+    return out
+
+def test_every_statement_has_a_handler():
+    graph = MemoryGraph()
+    missing = [name for text, name in cypher_constants().items() if name not in SOURCE_ONLY and not graph.handles(text)]
+    assert missing == []
+
+def test_schema_statements_are_accepted():
+    graph = MemoryGraph()
+    assert all(graph.handles(s) for m in schema.MIGRATIONS for s in m.statements)
+
+def test_snapshot_keeps_uids_for_uc12(tmp_path):
+    path = str(tmp_path / "graph.snap")
+    snapshot.from_synthetic(synthetic.generate_edges(500, 5), 500, path)
+    with Snapshot(path) as snap:
+        graph = from_snapshot(snap)
+        assert graph.uid[:3] == [SYNTHETIC_UID_BASE + 1, SYNTHETIC_UID_BASE + 2, SYNTHETIC_UID_BASE + 3]
+        found = path_service.shortest_paths(Neo4jClient(driver=MemoryDriver(graph)), "s100", "s400", budget=None)
+    assert found.distance is not None and found.paths
+
+def test_schema_ensure_waits_for_indexes_when_current():
+    c = client()
+    sent = []
+    execute = c.driver.graph.execute
+    c.driver.graph.execute = lambda cypher, params: sent.append(cypher) or execute(cypher, params)
+    assert schema.ensure(c) == len(schema.MIGRATIONS)
+    sent.clear()
+    assert schema.ensure(c) == 0
+    assert sent == [schema.VERSION_CYPHER]
+    sent.clear()
+    assert schema.ensure(c, wait=5) == 0
+    assert sent == [schema.VERSION_CYPHER, schema.AWAIT_INDEXES_CYPHER]
+
+def test_import_rekeys_existing_users_and_counts_created_edges():
+    c = client()
+    graph = c.driver.graph
+    schema.ensure(c)
+    # loaded before the uid ranges: synthetic uid i
+    c.write(USER_CYPHER, {"rows": [{"username": f"s{i}", "uid": i} for i in range(1, 51)]})
+    n, m = import_synthetic(c, users=100, avg_degree=4)
+    assert n == 100 and m == graph.edges > 0
+    assert graph.uid[graph.by_username["s7"]] == SYNTHETIC_UID_BASE + 7
+    assert import_synthetic(c, users=100, avg_degree=4) == (100, 0)
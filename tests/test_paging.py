@@ -0,0 +1,65 @@
+from __future__ import annotations
+from typing import List, Optional
+import pytest
+from app.data.loader import USER_CYPHER
+from app.memory import MemoryDriver
+from app.neo4j_client import Neo4jClient
+from app.services import graph_service as gs
+
+FANS = [f"fan{i:02d}" for i in range(23)]
+
+@pytest.fixture
+def client() -> Neo4jClient:
+    c = Neo4jClient(driver=MemoryDriver())
+    names = ["hub"] + FANS
+    c.write(USER_CYPHER, {"rows": [{"username": u, "uid": i + 1, "name": u.title()} for i, u in enumerate(names)]})
+    gs.follow_many(c, [(f, "hub") for f in FANS] + [("hub", f) for f in FANS[::2]])
+    return c
+
+def usernames(rows) -> List[str]:
+    return [r["username"] for r in rows]
+
+def test_cursor_round_trip():
+    for direction in ("a", "b"):
+        assert gs.decode_cursor(gs.encode_cursor(direction, "fan:07")) == (direction, "fan:07")
+
+@pytest.mark.parametrize("cursor", ["not base64!", gs.encode_cursor("a", "x").replace("YT", "ej"), "Yw=="])
+def test_bad_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError):
+        gs.decode_cursor(cursor)
+
+def test_forward_pages_cover_every_follower_once(client):
+    pages: List[List[str]] = []
+    cursor: Optional[str] = None
+    while True:
+        rows, next_cursor, prev_cursor = gs.list_followers(client, "hub", limit=5, cursor=cursor)
+        assert (prev_cursor is None) == (cursor is None)
+        pages.append(usernames(rows))
+        if next_cursor is None:
+            break
+        cursor = next_cursor
+    assert [len(p) for p in pages] == [5, 5, 5, 5, 3]
+    assert sum(pages, []) == FANS
+
+def test_backward_pages_retrace_forward_ones(client):
+    forward, cursor = [], None
+    while True:
+        rows, cursor, _ = gs.list_following(client, "hub", limit=4, cursor=cursor)
+        forward.append(usernames(rows))
+        if cursor is None:
+            break
+    # from the last page, prev cursors walk back over the same pages
+    rows, next_cursor, prev_cursor = gs.list_following(client, "hub", limit=4,
+                                                       cursor=gs.encode_cursor("a", forward[-2][-1]))
+    assert usernames(rows) == forward[-1] and next_cursor is None
+    backward = [usernames(rows)]
+    while prev_cursor is not None:
+        rows, next_cursor, prev_cursor = gs.list_following(client, "hub", limit=4, cursor=prev_cursor)
+        assert next_cursor is not None
+        backward.append(usernames(rows))
+    assert backward[::-1] == forward
+    assert sum(forward, []) == FANS[::2]
+
+def test_page_after_the_last_row_is_empty(client):
+    rows, next_cursor, prev_cursor = gs.list_followers(client, "hub", limit=5, cursor=gs.encode_cursor("a", FANS[-1]))
+    assert rows == [] and next_cursor is None and prev_cursor is None
@@ -0,0 +1,103 @@
+from __future__ import annotations
+import asyncio, random
+from collections import deque
+from typing import Dict, List, Optional, Set, Tuple
+import pytest
+from app.data.loader import USER_CYPHER
+from app.memory import AsyncMemoryDriver, MemoryDriver, MemoryGraph
+from app.neo4j_client import AsyncNeo4jClient, Neo4jClient
+from app.services import aio, graph_service as gs, path_service as ps
+
+USERS = 60
+
+def name(i: int) -> str:
+    return f"usr{i:03d}"
+
+def build(seed: int) -> Tuple[MemoryGraph, Dict[int, Set[int]]]:
+    # sparse random digraph; usr059 has no edges at all
+    rng = random.Random(seed)
+    out: Dict[int, Set[int]] = {i: set() for i in range(USERS)}
+    for _ in range(110):
+        a, b = rng.randrange(USERS - 1), rng.randrange(USERS - 1)
+        if a != b:
+            out[a].add(b)
+    graph = MemoryGraph()
+    c = Neo4jClient(driver=MemoryDriver(graph))
+    c.write(USER_CYPHER, {"rows": [{"username": name(i), "uid": i + 1, "name": name(i).title()} for i in range(USERS)]})
+    gs.follow_many(c, [(name(a), name(b)) for a in out for b in out[a]])
+    return graph, out
+
+def reference(out: Dict[int, Set[int]], src: int, dst: int) -> Tuple[Optional[int], int]:
+    # (distance, number of shortest paths) by plain BFS
+    dist, count = {src: 0}, {src: 1}
+    queue = deque([src])
+    while queue:
+        a = queue.popleft()
+        for b in out[a]:
+            if b not in dist:
+                dist[b] = dist[a] + 1
+                count[b] = 0
+                queue.append(b)
+            if dist[b] == dist[a] + 1:
+                count[b] += count[a]
+    return dist.get(dst), count.get(dst, 0)
+
+def check(found: ps.Separation, out: Dict[int, Set[int]], src: int, dst: int, k: int) -> None:
+    distance, total = reference(out, src, dst)
+    assert found.complete
+    assert found.distance == distance
+    if distance is None:
+        assert found.paths == []
+        return
+    paths: List[List[int]] = [[int(u["username"][3:]) for u in p] for p in found.paths]
+    assert len(paths) == min(k, total)
+    assert len({tuple(p) for p in paths}) == len(paths)
+    for p in paths:
+        assert p[0] == src and p[-1] == dst and len(p) == distance + 1
+        assert all(b in out[a] for a, b in zip(p, p[1:]))
+
+@pytest.mark.parametrize("seed", range(5))
+def test_matches_plain_bfs(seed):
+    graph, out = build(seed)
+    c = Neo4jClient(driver=MemoryDriver(graph))
+    rng = random.Random(seed)
+    for _ in range(40):
+        src, dst = rng.randrange(USERS - 1), rng.randrange(USERS - 1)
+        check(ps.shortest_paths(c, name(src), name(dst), k=3, budget=None, max_depth=USERS), out, src, dst, 3)
+
+def test_async_search_agrees():
+    graph, out = build(11)
+
+    async def run() -> List[ps.Separation]:
+        c = AsyncNeo4jClient(driver=AsyncMemoryDriver(graph))
+        return [await aio.degrees_of_separation(c, name(a), name(b), k=2, budget=None, max_depth=USERS)
+                for a, b in pairs]
+
+    pairs = [(a, b) for a in range(0, USERS - 1, 7) for b in range(3, USERS - 1, 11)]
+    for (a, b), found in zip(pairs, asyncio.run(run())):
+        check(found, out, a, b, 2)
+
+def test_no_path():
+    graph, out = build(3)
+    c = Neo4jClient(driver=MemoryDriver(graph))
+    isolated = name(USERS - 1)
+    for src, dst in ((name(0), isolated), (isolated, name(0))):
+        found = ps.shortest_paths(c, src, dst, budget=None)
+        assert found.distance is None and found.paths == [] and found.complete
+
+def test_same_user_and_unknown_user():
+    graph, _ = build(4)
+    c = Neo4jClient(driver=MemoryDriver(graph))
+    same = ps.shortest_paths(c, name(5), name(5), budget=None)
+    assert same.distance == 0 and [[u["username"] for u in p] for p in same.paths] == [[name(5)]]
+    missing = ps.shortest_paths(c, name(5), "nobody", budget=None)
+    assert missing.distance is None and missing.complete
+
+def test_depth_limit_reports_incomplete():
+    graph = MemoryGraph()
+    c = Neo4jClient(driver=MemoryDriver(graph))
+    c.write(USER_CYPHER, {"rows": [{"username": name(i), "uid": i + 1} for i in range(6)]})
+    gs.follow_many(c, [(name(i), name(i + 1)) for i in range(5)])
+    assert ps.shortest_paths(c, name(0), name(5), budget=None).distance == 5
+    capped = ps.shortest_paths(c, name(0), name(5), budget=None, max_depth=3)
+    assert capped.distance is None and not capped.complete
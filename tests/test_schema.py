@@ -0,0 +1,74 @@
+from __future__ import annotations
+import pytest
+from app import schema
+from app.data.loader import USER_CYPHER
+from app.memory import MemoryDriver
+from app.neo4j_client import Neo4jClient
+from app.services.auth_service import REGISTERED_UID_BASE, SYNTHETIC_UID_BASE
+
+def client() -> Neo4jClient:
+    return Neo4jClient(driver=MemoryDriver())
+
+def uids(c: Neo4jClient):
+    graph = c.driver.graph
+    return {u: graph.uid[i] for u, i in graph.by_username.items()}
+
+def test_versions_are_contiguous():
+    assert [m.version for m in schema.MIGRATIONS] == list(range(1, len(schema.MIGRATIONS) + 1))
+    assert schema.LATEST == schema.MIGRATIONS[-1].version
+
+def test_migrate_runs_pending_steps_in_order_once():
+    c = client()
+    log = []
+    applied = schema.migrate(c, log=log.append)
+    assert [m.version for m in applied] == [m.version for m in schema.MIGRATIONS]
+    assert [line.split()[1] for line in log] == [str(m.version) for m in schema.MIGRATIONS]
+    assert schema.current_version(c) == schema.LATEST
+    assert schema.ensure(c) == 0
+    assert [m.version for m in schema.migrate(c, version=schema.LATEST - 2)] == [schema.LATEST - 1, schema.LATEST]
+    assert schema.current_version(c) == schema.LATEST
+
+def test_recorded_version_never_moves_back():
+    c = client()
+    schema.ensure(c)
+    c.write(schema.RECORD_CYPHER, {"version": 2, "name": "late writer"})
+    assert schema.current_version(c) == schema.LATEST
+
+def test_failed_step_is_retried_on_the_next_run(monkeypatch):
+    c = client()
+    calls = []
+
+    def flaky(_):
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("connection lost")
+
+    steps = schema.MIGRATIONS + [schema.Migration(schema.LATEST + 1, "flaky", run=flaky)]
+    monkeypatch.setattr(schema, "MIGRATIONS", steps)
+    monkeypatch.setattr(schema, "LATEST", steps[-1].version)
+    with pytest.raises(RuntimeError):
+        schema.ensure(c)
+    assert schema.current_version(c) == steps[-2].version
+    assert schema.ensure(c) == 1 and len(calls) == 2
+    assert schema.current_version(c) == steps[-1].version
+
+def test_backfill_derives_imported_uids_and_draws_the_rest():
+    c = client()
+    c.write(USER_CYPHER, {"rows": [{"username": u} for u in ("u1234", "s42", "alice", "bob", "u0", "s12x")]})
+    assert schema.backfill_uids(c, batch_size=2) == 6
+    got = uids(c)
+    assert got["u1234"] == 1234
+    assert got["s42"] == SYNTHETIC_UID_BASE + 42
+    drawn = [got[u] for u in ("alice", "bob", "s12x", "u0")]
+    assert len(set(drawn)) == 4 and min(drawn) >= REGISTERED_UID_BASE
+    assert schema.backfill_uids(c, batch_size=2) == 0
+    assert uids(c) == got
+
+def test_backfill_rekeys_users_on_old_uids():
+    c = client()
+    # an earlier backfill put u7 on a sequence uid; s7 was loaded with uid 7
+    c.write(USER_CYPHER, {"rows": [{"username": "u7", "uid": REGISTERED_UID_BASE + 3}, {"username": "s7", "uid": 7},
+                                   {"username": "carol", "uid": REGISTERED_UID_BASE + 4}]})
+    assert schema.backfill_uids(c, batch_size=1) == 2
+    assert uids(c) == {"u7": 7, "s7": SYNTHETIC_UID_BASE + 7, "carol": REGISTERED_UID_BASE + 4}
+    assert c.driver.graph.by_uid[7] == c.driver.graph.by_username["u7"]
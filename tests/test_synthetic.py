@@ -0,0 +1,32 @@
+from __future__ import annotations
+import numpy as np
+import pytest
+from app.data import synthetic
+
+def edges(*args, **kwargs) -> np.ndarray:
+    return np.concatenate(list(synthetic.generate_edges(*args, **kwargs)))
+
+@pytest.mark.parametrize("model", synthetic.MODELS)
+def test_exact_distinct_edges(model):
+    e = edges(2000, 8, model=model, block=512)
+    assert len(e) == 2000 * 8
+    assert len(set(map(tuple, e.tolist()))) == len(e)
+    assert (e[:, 0] != e[:, 1]).all()
+    assert e.min() >= 1 and e.max() <= 2000
+
+@pytest.mark.parametrize("users, avg_degree, communities", [(100, 10, 20), (50, 49, 10), (7, 6, 3)])
+def test_sbm_blocks_smaller_than_degree(users, avg_degree, communities):
+    # with mixing 0 the edges a block cannot hold must still leave it
+    e = edges(users, avg_degree, model="sbm", communities=communities, mixing=0.0)
+    assert len(set(map(tuple, e.tolist()))) == len(e) == users * min(avg_degree, users - 1)
+
+def test_sbm_keeps_edges_in_block_when_they_fit():
+    e = edges(1000, 5, model="sbm", communities=10, mixing=0.0) - 1
+    assert ((e[:, 0] * 10 // 1000) == (e[:, 1] * 10 // 1000)).all()
+
+@pytest.mark.parametrize("gamma", [1.0, 0.5, -2.0, float("nan")])
+def test_gamma_must_exceed_one(gamma):
+    with pytest.raises(ValueError):
+        synthetic.out_degrees(100, 5, model="powerlaw", gamma=gamma)
+    with pytest.raises(ValueError):
+        synthetic.EdgeSampler(100, model="powerlaw", gamma=gamma)